@@ -0,0 +1,184 @@
+"""
+Headless HTTP API for the JobStream engine (no Streamlit required).
+
+    python api.py --host 0.0.0.0 --port 8600
+
+Endpoints:
+    GET  /health                     liveness check
+    GET  /stats                      cache, job index, network and per-source health statistics
+    GET  /metrics                    stage timings and counters (Prometheus text format)
+    GET  /search?q=...&skills=...&top_k=...
+                                     jobs for a query; ranked when skills (comma separated) are given
+    POST /match                      body is a PDF CV (Content-Type: application/pdf) or JSON
+                                     {"cv_text": ..., "skills": [...], "query": ..., "top_k": ...}
+"""
+import argparse
+import json
+import logging
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from dotenv import load_dotenv
+
+# Before the project modules, which read their JOBSTREAM_* settings on import
+load_dotenv()
+
+import cv_parser
+import engine
+import feeds
+import firecrawl_batch
+import http_client
+import metrics
+import politeness
+import shared_cache
+from job_store import job_store
+from result_cache import job_cache
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = cv_parser.MAX_PDF_BYTES
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _int_or_none(value):
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"top_k must be an integer, got {value!r}")
+
+
+class JobStreamHandler(BaseHTTPRequestHandler):
+    server_version = "JobStreamAPI/1.0"
+    fc_key = ""
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_text(self, status: int, text: str, content_type: str = "text/plain; version=0.0.4"):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, route):
+        try:
+            # Stage timings of the request go to the structured metrics log; scraping is shared fairly per caller
+            with metrics.trace("api" + urlsplit(self.path).path.replace("/", "_")), \
+                    politeness.scope(client=self.client_address[0]):
+                self._send_json(200, route())
+        except ApiError as e:
+            self._send_json(e.status, {'error': str(e)})
+        except Exception as e:
+            logger.exception(f"API error on {self.path}")
+            self._send_json(500, {'error': str(e)})
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == '/metrics':
+            self._send_text(200, metrics.render_prometheus())
+            return
+        routes = {
+            '/health': lambda: {'status': 'ok'},
+            '/stats': lambda: {
+                'result_cache': job_cache.stats(),
+                'job_index': job_store.stats(),
+                'firecrawl': firecrawl_batch.stats(),
+                'feeds': feeds.feed_ingestor.stats(),
+                'shared_cache': shared_cache.stats(),
+                'singleflight': engine.fetch_flights.stats(),
+                'cv_cache': cv_parser.cache_stats(),
+                'hosts': http_client.get_stats(),
+                'sources': engine.job_sources.health(),
+            },
+            '/search': lambda: self._search(params),
+        }
+        route = routes.get(url.path)
+        if route is None:
+            self._send_json(404, {'error': f"Unknown endpoint {url.path}"})
+            return
+        self._handle(route)
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/match':
+            self._send_json(404, {'error': f"Unknown endpoint {self.path}"})
+            return
+        self._handle(self._match)
+
+    def _search(self, params: dict) -> dict:
+        query = params.get('q', '').strip()
+        if not query:
+            raise ApiError(400, "Missing query parameter 'q'")
+        skills = [s.strip() for s in params.get('skills', '').split(',') if s.strip()]
+        return engine.match_jobs(skills, manual_query=query, fc_key=self.fc_key,
+                                 top_k=_int_or_none(params.get('top_k')))
+
+    def _match(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length <= 0:
+            raise ApiError(400, "Empty request body")
+        if length > MAX_BODY_BYTES:
+            raise ApiError(413, f"Request body larger than {MAX_BODY_BYTES} bytes")
+        body = self.rfile.read(length)
+
+        if self.headers.get('Content-Type', '').startswith('application/pdf'):
+            try:
+                return engine.match_cv_pdf(body, fc_key=self.fc_key)
+            except ValueError as e:
+                raise ApiError(413, str(e))
+
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise ApiError(400, "Body must be a PDF or a JSON object")
+        skills = request.get('skills') or engine.extract_skills(request.get('cv_text', ''))
+        if not skills and not request.get('query'):
+            raise ApiError(400, "Provide cv_text, skills or query")
+        result = engine.match_jobs(skills, manual_query=request.get('query', ''), fc_key=self.fc_key,
+                                   top_k=_int_or_none(request.get('top_k')))
+        return {'skills': skills, **result}
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} - {format % args}")
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8600, fc_key: str = "") -> ThreadingHTTPServer:
+    """Create (but do not start) the API server"""
+    handler = type("ConfiguredHandler", (JobStreamHandler,), {'fc_key': fc_key})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JobStream headless HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = make_server(args.host, args.port, os.getenv("FIRECRAWL_API_KEY", "").strip())
+    logger.info(f"JobStream API listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Parse time per page for the scraper HTML backends, against saved fixtures (no network).
+
+Usage:
+    python benchmarks/bench_html_parsing.py [--repeat 50] [--fixtures benchmarks/fixtures/*.html]
+    python benchmarks/bench_html_parsing.py --save before.json
+    python benchmarks/bench_html_parsing.py --compare before.json
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import html_parsing  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures", "indeed_*.html")
+
+
+def legacy_parse_indeed_cards(html, limit: int = None) -> list:
+    """The previous implementation: full html.parser tree, then find() walks per card"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    records = []
+    for card in soup.find_all('div', {'data-job-id': True}, limit=limit):
+        texts = {}
+        for field, (tag, cls) in html_parsing.INDEED_FIELDS.items():
+            found = card.find(tag, class_=cls)
+            texts[field] = found.get_text(strip=True) if found else None
+        link = card.find('a', class_='jcs-JobTitle')
+        records.append({'job_id': card.get('data-job-id', ''), 'href': link.get('href', '') if link else '', **texts})
+    return records
+
+
+def parsers() -> dict:
+    """Label -> parse function for the legacy path and every installed backend"""
+    available = {'legacy html.parser': legacy_parse_indeed_cards}
+    for name in html_parsing.BACKENDS:
+        try:
+            html_parsing.get_backend(name)
+        except ImportError:
+            print(f"({name} not installed, skipped)")
+            continue
+        available[name] = lambda html, name=name: html_parsing.parse_indeed_cards(html, backend=name)
+    return available
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--fixtures", nargs="+", default=sorted(glob.glob(FIXTURES)))
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to compare against")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    available = parsers()
+    for path in args.fixtures:
+        with open(path, "rb") as f:
+            html = f.read()
+        fixture = os.path.basename(path)
+        expected = legacy_parse_indeed_cards(html)
+        print(f"\n{fixture}: {len(html) / 1024:.0f} KB, {len(expected)} job cards")
+        results[fixture] = {}
+        for label, parse in available.items():
+            if parse(html) != expected:
+                print(f"  {label:<20} MISMATCH with the legacy parser")
+            seconds = min(timeit.repeat(lambda: parse(html), number=args.repeat, repeat=3)) / args.repeat
+            ms = round(seconds * 1000, 3)
+            results[fixture][label] = ms
+            line = f"  {label:<20} {ms:9.3f} ms/page"
+            before = baseline.get(fixture, {}).get(label)
+            if before:
+                line += f"   (was {before:.3f} ms, {before / ms:.1f}x)"
+            print(line)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
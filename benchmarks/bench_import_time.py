@@ -0,0 +1,104 @@
+"""
+Cold-start benchmark: import time of the app's modules, measured with python -X importtime.
+
+Usage:
+    python benchmarks/bench_import_time.py [--repeat 5] [--modules engine cv_parser ...]
+    python benchmarks/bench_import_time.py --save before.json
+    python benchmarks/bench_import_time.py --compare before.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["engine", "cv_parser", "api", "cli", "http_client", "result_cache", "ranking", "streamlit"]
+
+# "import time:   self [us] | cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module: str) -> dict:
+    """
+    Import module in a fresh interpreter.
+    Returns: {'total_ms': cumulative import time, 'children': {top-level dependency: cumulative ms}}
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    # Children are printed before their parent, so collect direct imports until the module's own line
+    total = 0.0
+    children = {}
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if not m:
+            continue
+        cumulative_ms = int(m.group(2)) / 1000
+        depth = len(m.group(3)) // 2
+        name = m.group(4)
+        if depth == 0:
+            if name == module:
+                total = cumulative_ms
+                break
+            children = {}   # interpreter start-up imports, not ours
+        elif depth == 1:
+            top = name.split(".")[0]
+            children[top] = children.get(top, 0) + cumulative_ms
+    return {'total_ms': total, 'children': children}
+
+
+def measure(modules, repeat: int) -> dict:
+    """Median import time per module over `repeat` fresh interpreters, with its heaviest direct imports"""
+    results = {}
+    for module in modules:
+        runs = [import_profile(module) for _ in range(repeat)]
+        children = {}
+        for run in runs:
+            for name, ms in run['children'].items():
+                children.setdefault(name, []).append(ms)
+        results[module] = {
+            'median_ms': round(statistics.median(r['total_ms'] for r in runs), 1),
+            'top_imports': {name: round(statistics.median(ms), 1) for name, ms in
+                            sorted(children.items(), key=lambda kv: -statistics.median(kv[1]))[:5]},
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to compare against")
+    args = parser.parse_args()
+
+    results = measure(args.modules, args.repeat)
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    for module, result in results.items():
+        line = f"{module:<14} {result['median_ms']:8.1f} ms"
+        if module in baseline:
+            before = baseline[module]['median_ms']
+            line += f"   (was {before:.1f} ms, {result['median_ms'] - before:+.1f} ms)"
+        print(line)
+        for name, ms in result['top_imports'].items():
+            print(f"    {name:<24} {ms:8.1f} ms")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
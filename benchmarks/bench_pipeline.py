@@ -0,0 +1,478 @@
+"""
+Offline benchmark suite for the matching pipeline.
+
+Job boards are replaced by a local stand-in server (benchmarks/standin_server.py)
+serving recorded HTML with configurable latency and failures; CVs are synthetic
+PDFs generated with PyMuPDF. Scenarios:
+
+    one_cv     PDF text extraction per CV size, skill extraction, ranking and
+               the end-to-end search for a single CV, scraped live and answered
+               from the job index
+    cvs_1k     a batch of CVs (default 1,000) through cli.run_batch
+    jobs_10k   ranking and deduplicating a 10,000-job result set
+    firecrawl  the Firecrawl source against a stand-in batch-scrape API
+               (benchmarks/standin_firecrawl.py), cold and with cached pages
+    feeds      ingesting synthetic RSS and JSON board feeds (full and 304
+               conditional downloads) and answering queries from them
+    burst      many users searching the same query at the same moment (default
+               20), which share each source fetch through single-flight
+    replicas   result cache hit rate and lookup latency for 1 and N replicas
+               (default 4) behind a load balancer: per-process only, and
+               sharing a stand-in Redis (benchmarks/standin_redis.py) or an
+               SQLite WAL file (see shared_cache.py)
+    politeness many users searching distinct queries against a board that
+               answers 429 above a few requests per second: unthrottled (with
+               the circuit breaker off, and with it on as the app runs today)
+               and with the adaptive per-host rate limit (see politeness.py)
+
+Usage:
+    python benchmarks/bench_pipeline.py [--scenario all] [--repeat 20] [--latency-ms 150] [--failure-rate 0.1]
+    python benchmarks/bench_pipeline.py --save results/v1.json
+    python benchmarks/bench_pipeline.py --compare results/v1.json
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Benchmark runs never touch the real job index or spend Firecrawl credits
+os.environ.setdefault("JOBSTREAM_JOB_DB", ":memory:")
+os.environ.pop("FIRECRAWL_API_KEY", None)
+# Stand-ins are not real boards: no per-host rate limit unless a scenario sets one
+os.environ.setdefault("JOBSTREAM_HOST_RATE", "0")
+
+import cli  # noqa: E402
+import cv_parser  # noqa: E402
+import engine  # noqa: E402
+import feeds  # noqa: E402
+import firecrawl_batch  # noqa: E402
+import http_client  # noqa: E402
+import politeness  # noqa: E402
+import shared_cache  # noqa: E402
+import sources  # noqa: E402
+from job_store import job_store  # noqa: E402
+from result_cache import MISS, ResultCache, job_cache  # noqa: E402
+from skill_matcher import load_vocabulary  # noqa: E402
+from standin_firecrawl import StandInFirecrawl  # noqa: E402
+from standin_redis import StandInRedis  # noqa: E402
+from standin_server import StandInServer  # noqa: E402
+
+SCENARIOS = ["one_cv", "cvs_1k", "jobs_10k", "firecrawl", "feeds", "burst", "replicas", "politeness"]
+CV_PAGE_COUNTS = [1, 5, 20, 60]
+
+_FILLER = ("Delivered projects on time with cross-functional teams, wrote documentation, "
+           "reviewed code and presented results to stakeholders. ")
+
+
+def _skill_names() -> list:
+    return sorted(set(load_vocabulary().values()))
+
+
+def make_cv_pdf(pages: int, seed: int = 0) -> bytes:
+    """Synthetic CV: every page is a few paragraphs mentioning random skills"""
+    import fitz
+
+    rng = random.Random(seed)
+    skills = _skill_names()
+    doc = fitz.open()
+    for page_num in range(pages):
+        page = doc.new_page()
+        paragraphs = []
+        for _ in range(6):
+            used = ", ".join(rng.sample(skills, 4))
+            paragraphs.append(f"Role {page_num + 1}: built services with {used}. {_FILLER}")
+        page.insert_textbox(fitz.Rect(50, 50, 550, 800), "\n\n".join(paragraphs), fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def synthetic_jobs(n: int, seed: int = 0) -> list:
+    """n job dicts shaped like the scrapers' output, with ~5% near-duplicates"""
+    rng = random.Random(seed)
+    skills = _skill_names()
+    titles = ["Software Engineer", "Data Engineer", "Backend Developer", "Frontend Developer",
+              "ML Engineer", "DevOps Engineer", "Platform Engineer", "Data Scientist"]
+    levels = ["Junior", "Mid", "Senior", "Lead", ""]
+    jobs = []
+    for i in range(n):
+        if jobs and rng.random() < 0.05:
+            jobs.append(dict(rng.choice(jobs), url=f"https://jobs.example.com/{i}?utm_source=bench"))
+            continue
+        low = rng.randint(40, 160)
+        jobs.append({
+            'title': f"{rng.choice(levels)} {rng.choice(titles)}".strip(),
+            'url': f"https://jobs.example.com/{i}",
+            'company': f"Company {rng.randint(1, n // 10 + 1)}",
+            'location': rng.choice(["Remote", "Berlin", "London", "New York, NY", "Austin, TX"]),
+            'salary': f"${low}K - ${low + rng.randint(10, 80)}K",
+            'description': f"We use {', '.join(rng.sample(skills, 6))}. {_FILLER}",
+            'requirements': rng.sample(skills, 3),
+            'platform': rng.choice(["🔍 Indeed", "💼 LinkedIn", "🏠 Remote.co", "💎 Glassdoor"]),
+            'job_type': rng.choice(["Full-time", "Contract", "Remote", "Part-time"]),
+            'posted_date': f"{rng.randint(1, 30)} days ago",
+        })
+    return jobs
+
+
+def synthetic_feeds(n: int, seed: int = 0) -> tuple:
+    """(RSS bytes, RemoteOK-style JSON bytes) with n postings each, built from synthetic_jobs"""
+    from email.utils import formatdate
+    from xml.sax.saxutils import escape
+
+    jobs = synthetic_jobs(2 * n, seed=seed)
+    items = []
+    for i, job in enumerate(jobs[:n]):
+        categories = "".join(f"<category>{escape(skill)}</category>" for skill in job['requirements'])
+        items.append(f"<item><title>{escape(job['company'])}: {escape(job['title'])}</title>"
+                     f"<region>{escape(job['location'])}</region>{categories}<type>{job['job_type']}</type>"
+                     f"<description>&lt;p&gt;{escape(job['description'])}&lt;/p&gt;</description>"
+                     f"<pubDate>{formatdate(time.time() - i * 3600)}</pubDate>"
+                     f"<link>https://weworkremotely.com/remote-jobs/{i}</link></item>")
+    rss = ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>Programming</title>'
+           + "".join(items) + "</channel></rss>").encode()
+    postings = [{'legal': "API terms of service"}] + [
+        {'id': i, 'epoch': int(time.time()) - i * 3600, 'company': job['company'], 'position': job['title'],
+         'tags': job['requirements'], 'location': job['location'], 'salary_min': 80000, 'salary_max': 120000,
+         'description': f"<p>{job['description']}</p>", 'url': f"https://remoteok.com/remote-jobs/{i}"}
+        for i, job in enumerate(jobs[n:])]
+    return rss, json.dumps(postings).encode()
+
+
+def measure(fn, repeat: int, setup=None) -> list:
+    """Latency of repeat calls in seconds (setup runs untimed before each call)"""
+    latencies = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def summarize(latencies: list, items: int = 1) -> dict:
+    """Percentiles in ms and throughput in items per second"""
+    ordered = sorted(latencies)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000, 3)
+
+    total = sum(latencies)
+    return {'runs': len(latencies), 'p50_ms': pct(50), 'p95_ms': pct(95), 'p99_ms': pct(99),
+            'mean_ms': round(total / len(latencies) * 1000, 3),
+            'throughput_per_s': round(items * len(latencies) / total, 2) if total else 0.0}
+
+
+def _reset_search_state():
+    job_cache.clear()
+    job_store.clear()
+    engine.job_sources.reset()
+
+
+def _reset_live_state():
+    # Keep the job index warm; only the in-memory result cache and breakers start over
+    job_cache.clear()
+    engine.job_sources.reset()
+
+
+def scenario_one_cv(args) -> dict:
+    results = {}
+    for pages in CV_PAGE_COUNTS:
+        pdf = make_cv_pdf(pages, seed=pages)
+        # extract_text_from_pdf in app.py is parse_pdf() behind Streamlit; time the uncached path
+        results[f"extract_text_from_pdf[{pages}p]"] = summarize(
+            measure(lambda: cv_parser.parse_pdf(pdf), args.repeat), items=pages)
+
+    text = cv_parser.parse_pdf(make_cv_pdf(5, seed=5))['text']
+    results["extract_skills[5p]"] = summarize(measure(lambda: engine.extract_skills(text), args.repeat * 5))
+    cv_skills = engine.extract_skills(text)
+
+    jobs = synthetic_jobs(500, seed=1)
+    results["rank_jobs_by_match[500]"] = summarize(
+        measure(lambda: engine.rank_jobs_by_match([dict(j) for j in jobs], cv_skills), args.repeat), items=500)
+
+    results["search_end_to_end"] = summarize(
+        measure(lambda: engine.match_jobs(cv_skills), args.repeat, setup=_reset_search_state))
+    engine.match_jobs(cv_skills)
+    results["search_end_to_end[indexed]"] = summarize(
+        measure(lambda: engine.match_jobs(cv_skills), args.repeat, setup=_reset_live_state))
+    return results
+
+
+def scenario_cvs_1k(args) -> dict:
+    with tempfile.TemporaryDirectory(prefix="jobstream-bench-") as cv_dir:
+        for i in range(args.cvs):
+            with open(os.path.join(cv_dir, f"cv_{i:05d}.pdf"), "wb") as f:
+                f.write(make_cv_pdf(1 + i % 3, seed=i))
+        _reset_search_state()
+        started = time.perf_counter()
+        summary = cli.run_batch(cv_dir, os.path.join(cv_dir, "matches.jsonl"), workers=args.workers, top_k=20)
+        seconds = time.perf_counter() - started
+    return {f"batch[{args.cvs} cvs]": {
+        'runs': 1, 'seconds': round(seconds, 2), 'matched': summary['matched'],
+        'unique_queries': summary['queries'], 'throughput_per_s': round(summary['cvs'] / seconds, 2),
+    }}
+
+
+def scenario_jobs_10k(args) -> dict:
+    jobs = synthetic_jobs(args.jobs, seed=10)
+    cv_skills = ["Python", "SQL", "AWS", "Docker", "Kubernetes", "React", "Pandas", "Terraform"]
+    repeat = max(3, args.repeat // 4)
+    return {
+        f"rank_jobs_by_match[{args.jobs}]": summarize(
+            measure(lambda: engine.rank_jobs_by_match([dict(j) for j in jobs], cv_skills), repeat), items=args.jobs),
+        f"rank_jobs_by_match[{args.jobs}, top_k=50]": summarize(
+            measure(lambda: engine.rank_jobs_by_match([dict(j) for j in jobs], cv_skills, top_k=50), repeat),
+            items=args.jobs),
+        f"dedupe_jobs[{args.jobs}]": summarize(measure(lambda: engine.dedupe_jobs(jobs), repeat), items=args.jobs),
+    }
+
+
+def scenario_firecrawl(args) -> dict:
+    queries = ["Python Developer", "Data Engineer", "Backend Developer"]
+    source = engine.job_sources.get("Firecrawl")
+    results = {}
+    with StandInFirecrawl(page_latency_ms=args.latency_ms * 3, jitter_ms=args.jitter_ms,
+                          failure_rate=args.failure_rate, seed=0) as api:
+        firecrawl_batch.scraper.base_url = api.url
+        firecrawl_batch.CREDITS_PER_HOUR = 10 ** 9
+        pages = len(queries) * len(firecrawl_batch.BOARD_SEARCH_URLS)
+
+        def cold():
+            _reset_search_state()
+            firecrawl_batch.page_cache.clear()
+
+        def search():
+            with firecrawl_batch.use_api_key("fc-bench"):
+                return engine.fetch_jobs_concurrently(queries, [source])
+
+        results[f"firecrawl_batch[{pages} pages]"] = summarize(
+            measure(search, args.repeat, setup=cold), items=pages)
+        credits = api.credits_used
+        results[f"firecrawl_batch[{pages} pages, cached]"] = summarize(
+            measure(search, args.repeat, setup=_reset_search_state), items=pages)
+        print(f"  Firecrawl stand-in: {api.jobs_submitted} batch jobs, {credits} credits cold, "
+              f"{api.credits_used - credits} credits with cached pages, {api.status_polls} status polls")
+    return results
+
+
+def scenario_feeds(args) -> dict:
+    n = args.feed_items
+    rss, remoteok = synthetic_feeds(n, seed=22)
+    routes = {'/programming.rss': rss, '/api.json': remoteok}
+    results = {}
+    with StandInServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, routes=routes, seed=0) as board:
+        feed_list = [feeds.Feed("rss", f"{board.url}/programming.rss", "rss", "💻 We Work Remotely"),
+                     feeds.Feed("json", f"{board.url}/api.json", "json", "🏠 RemoteOK")]
+        repeat = max(3, args.repeat // 4)
+        for feed in feed_list:
+            ingestor = feeds.FeedIngestor([feed])
+            results[f"feed_ingest[{feed.format}, {n} items]"] = summarize(
+                measure(lambda: ingestor.refresh(feed), repeat,
+                        setup=lambda: ingestor._states.clear()), items=n)
+            results[f"feed_ingest[{feed.format}, 304]"] = summarize(measure(lambda: ingestor.refresh(feed), repeat))
+
+        ingestor = feeds.FeedIngestor(feed_list)
+        for feed in feed_list:
+            ingestor.refresh(feed)
+        queries = ["Python Developer", "Data Engineer", "Kubernetes", "React Frontend Developer"]
+        results[f"feed_search[{2 * n} postings]"] = summarize(
+            measure(lambda: [ingestor.search(q) for q in queries], args.repeat), items=len(queries))
+        print(f"  Feed stand-in: {board.requests} requests, {board.not_modified} answered 304")
+    return results
+
+
+def scenario_burst(args) -> dict:
+    users = args.users
+    source = engine.job_sources.get("Indeed")
+    fetches_per_burst = []
+
+    def burst():
+        before = engine.fetch_flights.leaders
+        with ThreadPoolExecutor(max_workers=users) as pool:
+            list(pool.map(lambda _: engine.fetch_jobs_concurrently(["Python Developer"], [source]), range(users)))
+        fetches_per_burst.append(engine.fetch_flights.leaders - before)
+
+    result = summarize(measure(burst, max(3, args.repeat // 4), setup=_reset_search_state), items=users)
+    print(f"  {users} concurrent searches: at most {max(fetches_per_burst)} Indeed fetch(es) per burst, "
+          f"coalescing ratio {engine.fetch_flights.coalescing_ratio():.2f}")
+    return {f"search_burst[{users} users]": result}
+
+
+def scenario_replicas(args) -> dict:
+    rng = random.Random(24)
+    queries = [f"query {i}" for i in range(200)]
+    # Zipf-like popularity: a few queries are searched far more than the rest
+    lookups = rng.choices(queries, weights=[1 / (i + 1) for i in range(len(queries))], k=args.lookups)
+    jobs = synthetic_jobs(20, seed=24)
+    results = {}
+    with StandInRedis() as redis, tempfile.TemporaryDirectory(prefix="jobstream-bench-") as tmp:
+        backends = {
+            'local': lambda: None,
+            'redis': lambda: shared_cache.RedisBackend(redis.url),
+            'sqlite': lambda: shared_cache.SQLiteBackend(f"sqlite:///{os.path.join(tmp, 'shared.sqlite3')}"),
+        }
+        for name, make_backend in backends.items():
+            hit_rates = []
+            for n in sorted({1, args.replicas}):
+                # One cache (and backend connection) per replica, like one per process
+                replicas = []
+                for _ in range(n):
+                    backend = make_backend()
+                    replicas.append(ResultCache(shared=shared_cache.SharedCache("results", backend) if backend else None))
+                replicas[0].clear()
+                latencies, misses = [], 0
+                for i, query in enumerate(lookups):
+                    replica = replicas[i % n]   # round-robin load balancer
+                    started = time.perf_counter()
+                    _, state = replica.get("Indeed", query)
+                    latencies.append(time.perf_counter() - started)
+                    if state == MISS:
+                        misses += 1
+                        replica.put("Indeed", query, jobs, 600)
+                hit_rate = round(1 - misses / len(lookups), 3)
+                hit_rates.append(f"{hit_rate:.1%} with {n}")
+                results[f"cache_lookup[{name}, {n} replica{'s' if n > 1 else ''}]"] = {
+                    **summarize(latencies), 'hit_rate': hit_rate}
+            print(f"  {name}: hit rate {', '.join(hit_rates)} replica(s)")
+    return results
+
+
+def scenario_politeness(args) -> dict:
+    source = engine.job_sources.get("Indeed")
+    breaker_threshold = sources.FAILURE_THRESHOLD
+    results = {}
+    arms = [("unthrottled, no breaker", False, False), ("unthrottled, breaker", False, True),
+            ("adaptive limit", True, True)]
+    for label, limited, breaker in arms:
+        with StandInServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rate_limit=args.board_rate,
+                           block_seconds=2, seed=0) as board:
+            host = board.url.split("://", 1)[1]
+            # Unlimited, or starting well above what the board tolerates so the limit has to adapt
+            http_client.set_host_rate(host, 4 * args.board_rate if limited else None, burst=int(args.board_rate))
+            # Without a breaker every search hits the board, which is what scraping did before either existed
+            sources.FAILURE_THRESHOLD = breaker_threshold if breaker else 10 ** 9
+            engine.INDEED_URL = board.url
+            _reset_search_state()
+            stop_at = time.monotonic() + args.seconds
+            latencies, found = [], [0]
+
+            def user(u):
+                i = 0
+                with politeness.scope(client=f"user-{u}"):
+                    while time.monotonic() < stop_at:
+                        started = time.perf_counter()
+                        jobs = engine.fetch_jobs_concurrently([f"Python Developer {u} {i}"], [source])
+                        latencies.append(time.perf_counter() - started)
+                        found[0] += bool(jobs)
+                        i += 1
+                        if not jobs:
+                            time.sleep(0.2)   # a user retrying after an empty result
+
+            with ThreadPoolExecutor(max_workers=args.users) as pool:
+                list(pool.map(user, range(args.users)))
+            sent = board.requests - board.rate_limited
+            # Searches that found jobs include those filled from the index while the breaker was open;
+            # requests per served request is what the board pays for each fresh answer
+            per_served = f"{board.requests / sent:.1f}" if sent else "-"
+            print(f"  {label}: {board.requests} requests, {board.rate_limited} answered 429, "
+                  f"{sent} served ({per_served} requests each), "
+                  f"{found[0]}/{len(latencies)} searches found jobs ({found[0] / args.seconds:.2f}/s)")
+            results[f"search_under_load[{label}]"] = {
+                **summarize(latencies), 'requests': board.requests, 'rate_limited': board.rate_limited,
+                'served': sent, 'requests_per_served': round(board.requests / sent, 1) if sent else None,
+                'searches_with_jobs': found[0], 'successes_per_s': round(found[0] / args.seconds, 2)}
+        http_client.set_host_rate(host, None)
+    sources.FAILURE_THRESHOLD = breaker_threshold
+    engine.INDEED_URL = os.environ["JOBSTREAM_INDEED_URL"]
+    return results
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results: dict, baseline: dict):
+    for name, stats in results.items():
+        if 'p50_ms' in stats:
+            line = (f"  {name:<40} p50 {stats['p50_ms']:9.2f} ms  p95 {stats['p95_ms']:9.2f} ms  "
+                    f"{stats['throughput_per_s']:10.1f}/s")
+            key = 'p50_ms'
+        else:
+            line = f"  {name:<40} {stats['seconds']:9.2f} s  {stats['throughput_per_s']:10.1f}/s"
+            key = 'seconds'
+        before = baseline.get(name, {}).get(key)
+        if before:
+            line += f"   ({before / stats[key]:.2f}x vs baseline)" if stats[key] else ""
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", choices=["all"] + SCENARIOS, default="all")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--cvs", type=int, default=1000, help="CVs in the cvs_1k scenario")
+    parser.add_argument("--jobs", type=int, default=10000, help="jobs in the jobs_10k scenario")
+    parser.add_argument("--users", type=int, default=20, help="concurrent searches in the burst scenario")
+    parser.add_argument("--seconds", type=float, default=10, help="duration of the politeness scenario")
+    parser.add_argument("--board-rate", type=float, default=3, help="requests per second the board tolerates")
+    parser.add_argument("--replicas", type=int, default=4, help="app replicas in the replicas scenario")
+    parser.add_argument("--lookups", type=int, default=3000, help="cache lookups in the replicas scenario")
+    parser.add_argument("--feed-items", type=int, default=2000, help="postings per feed in the feeds scenario")
+    parser.add_argument("--workers", type=int, default=None, help="batch worker processes (default: all cores)")
+    parser.add_argument("--latency-ms", type=float, default=150, help="stand-in server response latency")
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of stand-in requests that fail")
+    parser.add_argument("--failure-mode", choices=["error", "hang"], default="error")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to compare against")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR)
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)['results']
+
+    scenarios = SCENARIOS if args.scenario == "all" else [args.scenario]
+    with StandInServer(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, failure_rate=args.failure_rate,
+                       failure_mode=args.failure_mode, hang_seconds=15, seed=0) as server:
+        # Route the Indeed scraper to the stand-in and lift its rate limit for the run
+        engine.INDEED_URL = os.environ["JOBSTREAM_INDEED_URL"] = server.url
+        engine.job_sources.get("Indeed").rate_limit = None
+        print(f"Stand-in job board on {server.url}: {args.latency_ms:g}±{args.jitter_ms:g} ms, "
+              f"{args.failure_rate:.0%} failures ({args.failure_mode})")
+
+        results = {}
+        for scenario in scenarios:
+            print(f"\n{scenario}")
+            scenario_results = globals()[f"scenario_{scenario}"](args)
+            print_results(scenario_results, baseline)
+            results.update(scenario_results)
+        print(f"\nStand-in served {server.requests} requests ({server.failures} failed)")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        meta = {'revision': _git_revision(), 'python': sys.version.split()[0], 'cpus': os.cpu_count(),
+                'args': vars(args), 'time': time.strftime("%Y-%m-%dT%H:%M:%S")}
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({'meta': meta, 'results': results}, f, indent=2)
+        print(f"\nSaved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Local stand-in for the Firecrawl v1 batch-scrape API, so the Firecrawl job
+source can be measured and exercised offline.
+
+    python benchmarks/standin_firecrawl.py [--port 8701] [--page-latency-ms 400] [--failure-rate 0.1]
+
+Endpoints:
+    POST /v1/batch/scrape          {"urls": [...], "maxConcurrency": n} -> {"success", "id", "url"}
+    GET  /v1/batch/scrape/{id}     {"status", "total", "completed", "creditsUsed", "data": [...]}
+Pages complete over time (maxConcurrency at a time, page latency each) and
+carry synthetic markdown with posting links for the board of the scraped URL.
+Failed pages come back with statusCode 500 and still cost a credit. With
+api_key set, requests without "Authorization: Bearer <api_key>" get 401.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Posting link per board host ({n}: posting number)
+POSTING_URLS = {
+    'linkedin.com': "https://www.linkedin.com/jobs/view/{n}",
+    'indeed.com': "https://www.indeed.com/viewjob?jk={n:016x}",
+    'glassdoor.com': "https://www.glassdoor.com/job-listing/role-JV_KO0,4.htm?jl={n}",
+    'wellfound.com': "https://wellfound.com/jobs/{n}-role",
+    'remoteok.com': "https://remoteok.com/remote-jobs/{n}-role",
+}
+LEVELS = ["Senior", "Junior", "Lead", "Staff", ""]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries"]
+
+
+def _query_of(url: str) -> str:
+    parts = urlsplit(url)
+    params = parse_qs(parts.query)
+    for key in ("keywords", "q", "sc.keyword"):
+        if key in params:
+            return params[key][0]
+    # remoteok.com/remote-python-developer-jobs
+    path = unquote(parts.path.strip("/"))
+    path = path[len("remote-"):] if path.startswith("remote-") else path
+    path = path[:-len("-jobs")] if path.endswith("-jobs") else path
+    return path.replace("-", " ") or "Software Engineer"
+
+
+def page_markdown(url: str, jobs: int = 8, seed: int = 0) -> str:
+    """Search results page for url as Firecrawl markdown"""
+    rng = random.Random(f"{seed}|{url}")
+    host = urlsplit(url).netloc.lower()
+    template = next((t for suffix, t in POSTING_URLS.items() if host.endswith(suffix)), "https://example.com/jobs/{n}")
+    query = _query_of(url).title()
+    lines = [f"# {query} jobs", "", "[Sign in](https://example.com/login) [Post a job](https://example.com/post)", ""]
+    for _ in range(jobs):
+        title = f"{rng.choice(LEVELS)} {query}".strip()
+        link = template.format(n=rng.randint(10 ** 9, 10 ** 10))
+        lines += [f"## [{title}]({link})",
+                  f"{rng.choice(COMPANIES)} · {rng.choice(['Remote', 'Berlin', 'London', 'Austin, TX'])}",
+                  f"Build and run {query.lower()} services with a small team. Python, SQL and cloud experience.",
+                  ""]
+    return "\n".join(lines)
+
+
+class StandInFirecrawl:
+    """Threaded fake Firecrawl API; use as a context manager or call start()/stop()"""
+
+    def __init__(self, port: int = 0, page_latency_ms: float = 400, jitter_ms: float = 0, failure_rate: float = 0,
+                 api_key: str = None, seed: int = None):
+        self.page_latency_ms = page_latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.api_key = api_key
+        self.jobs_submitted = 0
+        self.pages_requested = 0
+        self.status_polls = 0
+        self._random = random.Random(seed)
+        self._seed = seed or 0
+        self._lock = threading.Lock()
+        self._jobs = {}   # id -> {'pages': [(ready_at, url, ok)], 'created': t}
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                stand_in._handle(self, "POST")
+
+            def do_GET(self):
+                stand_in._handle(self, "GET")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def credits_used(self) -> int:
+        return self.pages_requested
+
+    def _send(self, handler, status: int, body: dict):
+        data = json.dumps(body).encode()
+        try:
+            handler.send_response(status)
+            handler.send_header("Content-Type", "application/json")
+            handler.send_header("Content-Length", str(len(data)))
+            handler.end_headers()
+            handler.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _handle(self, handler, method: str):
+        if self.api_key and handler.headers.get("Authorization") != f"Bearer {self.api_key}":
+            return self._send(handler, 401, {'success': False, 'error': "Unauthorized: Invalid token"})
+        path = urlsplit(handler.path).path.rstrip("/")
+        if method == "POST" and path == "/v1/batch/scrape":
+            length = int(handler.headers.get("Content-Length") or 0)
+            try:
+                request = json.loads(handler.rfile.read(length) or b"{}")
+            except ValueError:
+                return self._send(handler, 400, {'success': False, 'error': "Invalid JSON"})
+            urls = request.get('urls')
+            if not isinstance(urls, list) or not urls:
+                return self._send(handler, 400, {'success': False, 'error': "urls: expected a non-empty array"})
+            return self._send(handler, 200, self._submit(urls, int(request.get('maxConcurrency') or 10)))
+        if method == "GET" and path.startswith("/v1/batch/scrape/"):
+            status = self._status(path.rsplit("/", 1)[1])
+            if status is None:
+                return self._send(handler, 404, {'success': False, 'error': "Job not found"})
+            return self._send(handler, 200, status)
+        self._send(handler, 404, {'success': False, 'error': "Not found"})
+
+    def _submit(self, urls: list, concurrency: int) -> dict:
+        job_id = str(uuid.uuid4())
+        now = time.monotonic()
+        pages = []
+        with self._lock:
+            slots = [now] * max(1, concurrency)
+            for url in urls:
+                # Each page takes the next free slot, like a worker pool
+                slot = min(range(len(slots)), key=slots.__getitem__)
+                latency = max(0.0, self.page_latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+                slots[slot] += latency
+                pages.append((slots[slot], url, self._random.random() >= self.failure_rate))
+            pages.sort()
+            self._jobs[job_id] = {'pages': pages, 'created': now}
+            self.jobs_submitted += 1
+            self.pages_requested += len(urls)
+        return {'success': True, 'id': job_id, 'url': f"{self.url}/v1/batch/scrape/{job_id}"}
+
+    def _status(self, job_id: str) -> dict:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            self.status_polls += 1
+        if job is None:
+            return None
+        now = time.monotonic()
+        done = [(url, ok) for ready_at, url, ok in job['pages'] if ready_at <= now]
+        data = [{'markdown': page_markdown(url, seed=self._seed) if ok else "",
+                 'metadata': {'sourceURL': url, 'statusCode': 200 if ok else 500}} for url, ok in done]
+        total = len(job['pages'])
+        return {
+            'success': True,
+            'status': "completed" if len(done) == total else "scraping",
+            'total': total,
+            'completed': len(done),
+            'creditsUsed': len(done),
+            'expiresAt': time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + 24 * 3600)),
+            'data': data,
+        }
+
+    def start(self) -> "StandInFirecrawl":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="standin-firecrawl", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8701)
+    parser.add_argument("--page-latency-ms", type=float, default=400)
+    parser.add_argument("--jitter-ms", type=float, default=100)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--api-key", default=None, help="require this bearer token")
+    args = parser.parse_args()
+
+    server = StandInFirecrawl(args.port, args.page_latency_ms, args.jitter_ms, args.failure_rate, args.api_key)
+    print(f"Stand-in Firecrawl API on {server.url} (set JOBSTREAM_FIRECRAWL_URL={server.url})")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
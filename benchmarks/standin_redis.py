@@ -0,0 +1,212 @@
+"""
+Local Redis-compatible stand-in, so the shared cache (shared_cache.py) can be
+exercised and measured offline without a Redis server.
+
+    python benchmarks/standin_redis.py [--port 6390] [--latency-ms 0.5] [--password secret]
+
+Speaks RESP2 and implements the commands the shared cache uses plus a few for
+poking at it by hand: PING, AUTH, SELECT, GET, SET (EX, PX, NX, XX), DEL,
+EXISTS, SCAN (MATCH, COUNT), KEYS, DBSIZE, FLUSHDB, QUIT. Keys expire lazily
+on access. Everything lives in memory in one dict per database.
+"""
+import argparse
+import fnmatch
+import socketserver
+import threading
+import time
+import zlib
+
+_OK = b"+OK\r\n"
+
+
+def _bulk(value) -> bytes:
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+def _array(items) -> bytes:
+    return b"*%d\r\n" % len(items) + b"".join(_bulk(item) for item in items)
+
+
+def _error(message: str) -> bytes:
+    return f"-ERR {message}\r\n".encode()
+
+
+class StandInRedis:
+    """Threaded fake Redis server; use as a context manager or call start()/stop()"""
+
+    def __init__(self, port: int = 0, latency_ms: float = 0, password: str = None):
+        self.latency_ms = latency_ms
+        self.password = password
+        self.commands = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._dbs = {}   # db number -> {key: (value, expires_at or None)}
+
+        stand_in = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                stand_in._serve(self)
+
+        self._server = socketserver.ThreadingTCPServer(("127.0.0.1", port), Handler, bind_and_activate=False)
+        self._server.allow_reuse_address = True
+        self._server.daemon_threads = True
+        self._server.server_bind()
+        self._server.server_activate()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        auth = f":{self.password}@" if self.password else ""
+        return f"redis://{auth}{host}:{port}/0"
+
+    def keys(self, db: int = 0) -> list:
+        with self._lock:
+            return sorted(self._dbs.get(db, {}))
+
+    @staticmethod
+    def _read_command(reader) -> list:
+        line = reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()   # inline command (telnet / redis-cli --no-raw)
+        args = []
+        for _ in range(int(line[1:])):
+            size = int(reader.readline()[1:])
+            args.append(reader.read(size + 2)[:-2])
+        return args
+
+    def _serve(self, handler):
+        with self._lock:
+            self.connections += 1
+        session = {'db': 0, 'authed': not self.password}
+        while True:
+            try:
+                args = self._read_command(handler.rfile)
+            except (OSError, ValueError):
+                return
+            if not args:
+                return
+            with self._lock:
+                self.commands += 1
+            if self.latency_ms:
+                time.sleep(self.latency_ms / 1000)
+            name = args[0].decode().upper()
+            reply = self._execute(session, name, args[1:])
+            try:
+                handler.wfile.write(reply)
+                handler.wfile.flush()
+            except OSError:
+                return
+            if name == "QUIT":
+                return
+
+    def _live(self, db: dict, key: bytes, now: float):
+        entry = db.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del db[key]
+            return None
+        return entry
+
+    def _execute(self, session: dict, name: str, args: list) -> bytes:
+        if name == "AUTH":
+            if args and args[-1].decode() == self.password:
+                session['authed'] = True
+                return _OK
+            return b"-WRONGPASS invalid username-password pair or user is disabled.\r\n"
+        if not session['authed']:
+            return b"-NOAUTH Authentication required.\r\n"
+        if name == "PING":
+            return _bulk(args[0]) if args else b"+PONG\r\n"
+        if name == "QUIT":
+            return _OK
+        if name == "SELECT":
+            session['db'] = int(args[0])
+            return _OK
+        now = time.time()
+        with self._lock:
+            db = self._dbs.setdefault(session['db'], {})
+            if name == "GET":
+                entry = self._live(db, args[0], now)
+                return _bulk(entry[0] if entry else None)
+            if name == "SET":
+                return self._set(db, args, now)
+            if name == "DEL":
+                return b":%d\r\n" % sum(db.pop(key, None) is not None for key in args)
+            if name == "EXISTS":
+                return b":%d\r\n" % sum(self._live(db, key, now) is not None for key in args)
+            if name == "DBSIZE":
+                return b":%d\r\n" % sum(self._live(db, key, now) is not None for key in list(db))
+            if name == "FLUSHDB":
+                db.clear()
+                return _OK
+            if name == "KEYS":
+                pattern = args[0].decode()
+                return _array([key for key in list(db)
+                               if self._live(db, key, now) and fnmatch.fnmatchcase(key.decode(), pattern)])
+            if name == "SCAN":
+                return self._scan(db, args, now)
+        return _error(f"unknown command '{name}'")
+
+    def _set(self, db: dict, args: list, now: float) -> bytes:
+        key, value, options = args[0], args[1], [a.decode().upper() for a in args[2:]]
+        expires_at = None
+        for unit, scale in (("EX", 1), ("PX", 1000)):
+            if unit in options:
+                expires_at = now + int(options[options.index(unit) + 1]) / scale
+        exists = self._live(db, key, now) is not None
+        if ("NX" in options and exists) or ("XX" in options and not exists):
+            return _bulk(None)
+        db[key] = (value, expires_at)
+        return _OK
+
+    def _scan(self, db: dict, args: list, now: float) -> bytes:
+        # Keys are visited in hash order and the cursor is the next hash, so keys deleted
+        # between calls never make the scan skip others (the guarantee real SCAN gives)
+        cursor, options = int(args[0]), [a.decode() for a in args[1:]]
+        pattern = options[options.index("MATCH") + 1] if "MATCH" in options else "*"
+        count = int(options[options.index("COUNT") + 1]) if "COUNT" in options else 10
+        keys = sorted((zlib.crc32(key) + 1, key) for key in db)
+        keys = [(h, key) for h, key in keys if h >= cursor]
+        next_cursor = keys[count][0] if len(keys) > count else 0
+        batch = [key for h, key in keys if not next_cursor or h < next_cursor]
+        found = [key for key in batch if self._live(db, key, now) and fnmatch.fnmatchcase(key.decode(), pattern)]
+        return b"*2\r\n" + _bulk(str(next_cursor).encode()) + _array(found)
+
+    def start(self) -> "StandInRedis":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="standin-redis", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=6390)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added to every command")
+    parser.add_argument("--password", default=None, help="require AUTH with this password")
+    args = parser.parse_args()
+
+    server = StandInRedis(args.port, args.latency_ms, args.password)
+    print(f"Stand-in Redis on {server.url} (set JOBSTREAM_SHARED_CACHE={server.url})")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Local stand-in for the job boards: serves recorded HTML fixtures with configurable
+latency and failure injection, so the search pipeline can be measured offline.
+
+    python benchmarks/standin_server.py [--port 8700] [--latency-ms 150] [--jitter-ms 50] [--failure-rate 0.1]
+                                        [--rate-limit 5 --block-seconds 2]
+
+Routes (any query string is accepted):
+    /jobs        Indeed search results (fixtures/indeed_search.html)
+    /viewjob     a single posting page
+Other routes can be passed as {path: fixture file name or body bytes}. Responses carry an ETag
+and answer a matching If-None-Match with 304, like the boards' feed servers.
+Failures are injected as 503 responses, or as a stalled response when --failure-mode is "hang".
+With a rate limit, requests beyond that many per second (bursts of as many) get 429 with a
+Retry-After of block_seconds, and so does every request until block_seconds have passed since
+the last refused one, like a board's bot protection.
+"""
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+ROUTES = {
+    '/jobs': "indeed_search.html",
+    '/viewjob': "indeed_search.html",
+}
+_CONTENT_TYPES = {'.rss': "application/rss+xml; charset=utf-8", '.json': "application/json"}
+
+
+class StandInServer:
+    """Threaded fixture server; use as a context manager or call start()/stop()"""
+
+    def __init__(self, port: int = 0, latency_ms: float = 0, jitter_ms: float = 0, failure_rate: float = 0,
+                 failure_mode: str = "error", hang_seconds: float = 30, routes: dict = None, seed: int = None,
+                 rate_limit: float = None, block_seconds: float = 1):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.failure_rate = failure_rate
+        self.failure_mode = failure_mode
+        self.hang_seconds = hang_seconds
+        self.requests = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages = {}
+        for path, fixture in (routes or ROUTES).items():
+            if isinstance(fixture, bytes):
+                self._pages[path] = fixture
+                continue
+            with open(os.path.join(FIXTURES_DIR, fixture), "rb") as f:
+                self._pages[path] = f.read()
+        self.not_modified = 0
+        self.rate_limit = rate_limit
+        self.block_seconds = block_seconds
+        self.rate_limited = 0
+        self._tokens = rate_limit or 0
+        self._tokens_at = time.monotonic()
+        self._blocked_until = 0.0
+
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive, like the real boards
+
+            def do_GET(self):
+                stand_in._serve(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _admit(self) -> bool:
+        """Whether the rate limit lets a request through now (lock held)"""
+        if not self.rate_limit:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._tokens_at) * self.rate_limit)
+        self._tokens_at = now
+        if now >= self._blocked_until and self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        self._blocked_until = now + self.block_seconds
+        self.rate_limited += 1
+        return False
+
+    def _serve(self, handler):
+        with self._lock:
+            self.requests += 1
+            admitted = self._admit()
+            delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            fail = admitted and self._random.random() < self.failure_rate
+            if fail:
+                self.failures += 1
+        if not admitted:
+            return self._respond(handler, 429, b"Too Many Requests", "text/plain",
+                                 {'Retry-After': str(max(1, round(self.block_seconds)))})
+        time.sleep(delay)
+
+        path = urlsplit(handler.path).path
+        body = self._pages.get(path)
+        if fail and self.failure_mode == "hang":
+            time.sleep(self.hang_seconds)
+        etag = None
+        if fail or body is None:
+            status, body = (503, b"Service Unavailable") if fail else (404, b"Not Found")
+            content_type = "text/plain"
+        else:
+            status, content_type = 200, _CONTENT_TYPES.get(os.path.splitext(path)[1], "text/html; charset=utf-8")
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            if handler.headers.get("If-None-Match") == etag:
+                with self._lock:
+                    self.not_modified += 1
+                status, body = 304, b""
+        self._respond(handler, status, body, content_type, {'ETag': etag} if etag else {})
+
+    def _respond(self, handler, status: int, body: bytes, content_type: str, headers: dict):
+        try:
+            handler.send_response(status)
+            handler.send_header("Content-Type", content_type)
+            for name, value in headers.items():
+                handler.send_header(name, value)
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # client gave up (deadline passed)
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="standin-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8700)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--jitter-ms", type=float, default=50)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--failure-mode", choices=["error", "hang"], default="error")
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests per second before answering 429")
+    parser.add_argument("--block-seconds", type=float, default=1.0, help="429 penalty after exceeding the rate limit")
+    args = parser.parse_args()
+
+    server = StandInServer(args.port, args.latency_ms, args.jitter_ms, args.failure_rate, args.failure_mode,
+                           rate_limit=args.rate_limit, block_seconds=args.block_seconds)
+    print(f"Serving fixtures on {server.url} (set JOBSTREAM_INDEED_URL={server.url})")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
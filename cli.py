@@ -0,0 +1,130 @@
+"""
+Batch CV matching from the command line (no Streamlit required).
+
+    python cli.py CV_DIR -o matches.jsonl [--workers 8] [--top-k 20] [--query "Data Engineer"] [--metrics batch.prom]
+
+Every PDF in CV_DIR is matched against the job sources and one JSON line per
+CV is written to the output file. The work runs in three phases:
+CVs are parsed and their skills extracted in parallel across cores, the
+unique search queries of all CVs are fetched once, then each CV's jobs are
+ranked in parallel.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Before the project modules, which read their JOBSTREAM_* settings on import
+load_dotenv()
+
+import cv_parser
+import engine
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# Fields written for each matched job
+OUTPUT_FIELDS = ('title', 'company', 'location', 'salary', 'platform', 'url',
+                 'cv_match', 'matched_skills', 'missing_skills')
+
+
+def _init_worker():
+    # CVs already run one per process; don't start a page pool inside each worker
+    cv_parser.PDF_WORKERS = 1
+
+
+def parse_cv_file(path: str, manual_query: str = "") -> dict:
+    """Parse one CV and work out its search queries (runs in a worker process)"""
+    try:
+        cv = cv_parser.parse_pdf(Path(path).read_bytes())
+    except Exception as e:
+        return {'cv': os.path.basename(path), 'error': str(e)}
+    return {
+        'cv': os.path.basename(path),
+        'sha256': cv['sha256'],
+        'skills': cv['skills'],
+        'queries': engine.queries_for(cv['skills'], manual_query),
+    }
+
+
+def rank_cv(record: dict, jobs: list, top_k: int) -> dict:
+    """Rank the jobs found for one CV's queries (runs in a worker process)"""
+    ranked = engine.rank_jobs_by_match(jobs, record['skills'], top_k=top_k) if record['skills'] else jobs[:top_k]
+    matches = [{field: job.get(field) for field in OUTPUT_FIELDS} for job in ranked]
+    return {**record, 'matches': matches}
+
+
+def run_batch(cv_dir: str, output: str, workers: int = None, top_k: int = 20, manual_query: str = "",
+              fc_key: str = "") -> dict:
+    """Match every PDF in cv_dir and write ranked JSONL to output. Returns summary counts."""
+    paths = sorted(str(p) for p in Path(cv_dir).iterdir() if p.suffix.lower() == '.pdf')
+    if not paths:
+        raise FileNotFoundError(f"No PDF files in {cv_dir}")
+    workers = workers or os.cpu_count() or 1
+    started = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        chunksize = max(1, len(paths) // (workers * 4))
+
+        # 1. Parse CVs in parallel
+        records = list(pool.map(parse_cv_file, paths, [manual_query] * len(paths), chunksize=chunksize))
+        parsed = [r for r in records if 'error' not in r]
+        for r in records:
+            if 'error' in r:
+                logger.warning(f"Skipping {r['cv']}: {r['error']}")
+        logger.info(f"Parsed {len(parsed)}/{len(paths)} CVs in {time.monotonic() - started:.1f}s")
+
+        # 2. Fetch each unique query once for the whole batch
+        unique_queries = list(dict.fromkeys(q for r in parsed for q in r['queries']))
+        jobs_by_query = engine.search_by_query(unique_queries, fc_key)
+        logger.info(f"Fetched {len(unique_queries)} unique queries in {time.monotonic() - started:.1f}s")
+
+        # 3. Rank per CV in parallel and stream results to the output file
+        job_lists = [engine.dedupe_jobs([job for q in r['queries'] for job in jobs_by_query.get(q, [])])
+                     for r in parsed]
+        with open(output, 'w', encoding='utf-8') as out:
+            for line in pool.map(rank_cv, parsed, job_lists, [top_k] * len(parsed), chunksize=chunksize):
+                out.write(json.dumps(line) + "\n")
+            for r in records:
+                if 'error' in r:
+                    out.write(json.dumps(r) + "\n")
+
+    summary = {'cvs': len(paths), 'matched': len(parsed), 'queries': len(unique_queries),
+               'seconds': round(time.monotonic() - started, 2)}
+    logger.info(f"Batch finished: {summary}")
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Match a directory of CVs and write ranked JSONL")
+    parser.add_argument("cv_dir", help="directory containing PDF CVs")
+    parser.add_argument("-o", "--output", default="matches.jsonl", help="output JSONL file")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--top-k", type=int, default=20, help="matches kept per CV")
+    parser.add_argument("--query", default="", help="search this role for every CV instead of CV-derived queries")
+    parser.add_argument("--metrics", help="write fetch/cache metrics of the batch to this file (Prometheus text format)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        summary = run_batch(args.cv_dir, args.output, args.workers, args.top_k, args.query,
+                            os.getenv("FIRECRAWL_API_KEY", "").strip())
+    except FileNotFoundError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(f"✅ Matched {summary['matched']}/{summary['cvs']} CVs -> {args.output} ({summary['seconds']}s)")
+    if args.metrics:
+        # Parsing and ranking run in worker processes; only the main process's fetch stages are included
+        with open(args.metrics, 'w', encoding='utf-8') as f:
+            f.write(metrics.render_prometheus())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+CV parsing with a content-addressed result cache.
+
+PDF pages are streamed as a generator; large documents are split into page
+ranges extracted on a process pool, and skill matching consumes the page stream
+so skills are known before the whole document is parsed. Extraction results
+(full text, per-page text and detected skills) are cached by the SHA-256 of the
+PDF bytes in a process-wide LRU, so Streamlit reruns and other sessions
+uploading the same CV skip PyMuPDF and skill matching entirely. With a shared
+cache backend (shared_cache.py) other replicas' extractions are reused too.
+"""
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+import shared_cache
+import skill_matcher
+
+logger = logging.getLogger(__name__)
+
+CACHE_MAX_ENTRIES = 256
+CACHE_MAX_BYTES = 64 * 1024 * 1024   # extracted text held across all entries
+SHARED_TTL = 7 * 24 * 3600           # seconds a parsed CV stays in the shared cache
+
+# Limits for uploaded documents
+MAX_PDF_BYTES = int(os.getenv("JOBSTREAM_MAX_PDF_BYTES", str(20 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("JOBSTREAM_MAX_PDF_PAGES", "100"))
+
+# Documents with at least this many pages are extracted on the process pool
+PARALLEL_PAGE_THRESHOLD = 16
+PDF_WORKERS = int(os.getenv("JOBSTREAM_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_lock = threading.Lock()
+_cache = OrderedDict()   # sha256 -> {'text', 'pages', 'skills'}
+_cache_bytes = 0
+_hits = 0
+_misses = 0
+_pool = None
+
+
+def _entry_size(entry: dict) -> int:
+    return len(entry['text']) + sum(len(p) for p in entry['pages'])
+
+
+def _copy(entry: dict) -> dict:
+    return {'sha256': entry['sha256'], 'text': entry['text'],
+            'pages': list(entry['pages']), 'skills': list(entry['skills'])}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            # spawn: never fork the (multi-threaded) Streamlit server process
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Forget a broken pool so the next document starts a fresh one"""
+    global _pool
+    with _lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def _extract_page_range(pdf, start: int, stop: int) -> list:
+    """Extract pages [start, stop) of a PDF given as a file path (in a worker process) or bytes"""
+    import fitz  # PyMuPDF, loaded on first use
+
+    doc = fitz.open(pdf) if isinstance(pdf, str) else fitz.open(stream=pdf, filetype="pdf")
+    try:
+        return [doc[i].get_text() for i in range(start, stop)]
+    finally:
+        doc.close()
+
+
+def iter_pdf_pages(pdf_data: bytes, max_pages: int = None, max_bytes: int = None):
+    """
+    Yield (page_number, page_text) in page order.
+    Raises ValueError if the PDF exceeds max_bytes; pages beyond max_pages are skipped.
+    Large documents are split into page ranges extracted in parallel on a process pool.
+    """
+    max_pages = MAX_PDF_PAGES if max_pages is None else max_pages
+    max_bytes = MAX_PDF_BYTES if max_bytes is None else max_bytes
+    if len(pdf_data) > max_bytes:
+        raise ValueError(f"PDF is {len(pdf_data) / 1024 / 1024:.1f} MB; the limit is {max_bytes / 1024 / 1024:.0f} MB")
+
+    import fitz  # PyMuPDF, loaded on first use
+
+    doc = fitz.open(stream=pdf_data, filetype="pdf")
+    try:
+        page_count = min(doc.page_count, max_pages)
+        if doc.page_count > page_count:
+            logger.warning(f"PDF has {doc.page_count} pages; only the first {page_count} are read")
+        if page_count < PARALLEL_PAGE_THRESHOLD or PDF_WORKERS <= 1:
+            for page_num in range(page_count):
+                yield page_num, doc[page_num].get_text()
+            return
+    finally:
+        doc.close()
+
+    # Several ranges per worker so early pages come back quickly
+    chunk = max(4, -(-page_count // (PDF_WORKERS * 2)))
+    ranges = [(start, min(start + chunk, page_count)) for start in range(0, page_count, chunk)]
+    next_page = 0
+    pool = path = None
+    try:
+        # Workers read the PDF from a private temporary file instead of each range pickling the bytes
+        fd, path = tempfile.mkstemp(prefix="jobstream-cv-", suffix=".pdf")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf_data)
+        pool = _get_pool()
+        futures = [pool.submit(_extract_page_range, path, start, stop) for start, stop in ranges]
+        try:
+            for (start, _), future in zip(ranges, futures):
+                for offset, page_text in enumerate(future.result()):
+                    yield start + offset, page_text
+                    next_page = start + offset + 1
+        finally:
+            for future in futures:
+                future.cancel()
+    except (BrokenProcessPool, OSError) as e:
+        logger.warning(f"PDF process pool unavailable ({e}); extracting serially")
+        if pool is not None and isinstance(e, BrokenProcessPool):
+            _discard_pool(pool)
+        if next_page < page_count:
+            for page_num, page_text in enumerate(_extract_page_range(pdf_data, next_page, page_count), next_page):
+                yield page_num, page_text
+    finally:
+        if path is not None:
+            try:
+                os.unlink(path)
+            except OSError:   # Windows: a cancelled range may still have it open
+                pass
+
+
+def parse_pdf(pdf_data: bytes, digest: str = None, on_page=None) -> dict:
+    """
+    Extract text and skills from PDF bytes (uncached).
+    on_page(page_number, skills_so_far) is called as each page is processed.
+    Returns: {'sha256': ..., 'text': ..., 'pages': [...], 'skills': [...]}
+    """
+    pages = []
+    chunks = []
+    # Extraction and skill matching are interleaved page by page; time them apart
+    seconds = {'extract': 0.0, 'callback': 0.0}
+    started = time.perf_counter()
+
+    def page_chunks():
+        pages_iter = iter_pdf_pages(pdf_data)
+        while True:
+            page_started = time.perf_counter()
+            page = next(pages_iter, None)
+            seconds['extract'] += time.perf_counter() - page_started
+            if page is None:
+                return
+            page_num, page_text = page
+            pages.append(page_text)
+            chunks.append(f"\n--- Page {page_num + 1} ---\n{page_text}")
+            yield chunks[-1]
+
+    skills = []
+    for new_skills in skill_matcher.get_matcher().iter_new_skills(page_chunks()):
+        skills.extend(new_skills)
+        if on_page:
+            callback_started = time.perf_counter()
+            on_page(len(pages), sorted(skills))
+            seconds['callback'] += time.perf_counter() - callback_started
+
+    metrics.observe("pdf_extraction", seconds['extract'])
+    metrics.observe("skill_extraction", time.perf_counter() - started - seconds['extract'] - seconds['callback'])
+    metrics.inc("jobstream_cv_pages_total", len(pages))
+
+    return {
+        'sha256': digest or hashlib.sha256(pdf_data).hexdigest(),
+        'text': "".join(chunks),
+        'pages': pages,
+        'skills': sorted(skills),
+    }
+
+
+def parse_pdf_cached(pdf_data: bytes, on_page=None) -> dict:
+    """
+    parse_pdf() with results cached by the SHA-256 of the PDF bytes (on_page only fires on a miss).
+    Local misses are looked up in the shared cache before the PDF is parsed.
+    """
+    global _cache_bytes, _hits, _misses
+    digest = hashlib.sha256(pdf_data).hexdigest()
+    with _lock:
+        entry = _cache.get(digest)
+        if entry is not None:
+            _cache.move_to_end(digest)
+            _hits += 1
+            metrics.inc("jobstream_cv_cache_lookups_total", result="hit")
+            return _copy(entry)
+        _misses += 1
+    metrics.inc("jobstream_cv_cache_lookups_total", result="miss")
+
+    entry = shared_cache.cvs.get(digest)
+    if entry is None:
+        entry = parse_pdf(pdf_data, digest, on_page)
+        shared_cache.cvs.put(digest, entry, SHARED_TTL)
+    with _lock:
+        if digest not in _cache:
+            _cache[digest] = entry
+            _cache_bytes += _entry_size(entry)
+            while len(_cache) > 1 and (len(_cache) > CACHE_MAX_ENTRIES or _cache_bytes > CACHE_MAX_BYTES):
+                _, evicted = _cache.popitem(last=False)
+                _cache_bytes -= _entry_size(evicted)
+    return _copy(entry)
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters and size of the extraction cache"""
+    with _lock:
+        lookups = _hits + _misses
+        return {
+            'entries': len(_cache),
+            'bytes': _cache_bytes,
+            'hits': _hits,
+            'misses': _misses,
+            'hit_rate': round(_hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def clear_cache():
+    """Drop this process's cached extractions and reset counters (the shared cache is kept)"""
+    global _cache_bytes, _hits, _misses
+    with _lock:
+        _cache.clear()
+        _cache_bytes = _hits = _misses = 0
+
+
+def clear_shared_cache():
+    """Drop the extractions shared by every replica (see shared_cache.py)"""
+    shared_cache.cvs.clear()
@@ -0,0 +1,208 @@
+"""
+Duplicate detection for merged job results.
+
+The same posting reaches us from several boards and with different tracking
+parameters, so a job counts as already seen when any of these match an
+earlier one (checked in this order):
+
+1. canonical URL: tracking parameters removed, host and path normalized,
+   http/https and "www." ignored, known job-key URLs reduced to the key;
+2. fingerprint: normalized (title, company, location);
+3. near-duplicate description: same normalized (title, company), the same
+   location or no known location on one side, and a 64-bit SimHash of the
+   description within a few bits, which catches the same posting listed once
+   with and once without its location. The same role in two different places
+   is kept twice.
+
+Jobs are grouped by (title, company) as they are added, so descriptions are
+only hashed and compared inside groups with more than one job and the whole
+pass stays close to linear in the number of jobs.
+"""
+import hashlib
+import re
+import unicodedata
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track the click; everything else is kept
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'msclkid', 'dclid', 'mc_cid', 'mc_eid', 'igshid', '_ga', '_gl',
+    'ref', 'refid', 'ref_src', 'referrer', 'src', 'source', 'from', 'vjs', 'tk', 'trk',
+    'trackingid', 'sessionid', 'si',
+}
+TRACKING_PREFIXES = ('utm_',)
+
+# host suffix -> (canonical path, job key parameter): every URL with the key is that posting
+JOB_KEY_URLS = {
+    'indeed.com': ('/viewjob', 'jk'),
+}
+
+_HOST_PREFIXES = ('www.', 'm.')
+_DEFAULT_PORTS = {':80', ':443'}
+_NON_WORD = re.compile(r"[^a-z0-9+#]+")
+_ABBREVIATIONS = {'sr': 'senior', 'snr': 'senior', 'jr': 'junior', 'eng': 'engineer',
+                  'dev': 'developer', 'mgr': 'manager', 'mngr': 'manager'}
+_COMPANY_SUFFIXES = {'inc', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'gmbh', 'plc', 'sa', 'ag'}
+# Companies the scrapers use when the real one is unknown; never enough to call two jobs equal
+_PLACEHOLDER_COMPANIES = {'', 'unknown company', 'not specified', 'various', 'multiple companies'}
+# Location keys that say nothing about where a job is; they match any location
+_UNKNOWN_LOCATIONS = {'', 'not specified', 'unknown', 'various', 'multiple locations', 'global'}
+
+SIMHASH_BITS = 64
+# Scraped descriptions are short snippets, so allow more bits than for full pages;
+# only jobs with the same title and company are ever compared
+NEAR_DUPLICATE_DISTANCE = 8
+SHINGLE_SIZE = 3
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a job URL so tracking variants of the same link compare equal"""
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        # Malformed (e.g. an unclosed IPv6 bracket); still comparable as raw text
+        return url.strip().lower()
+    host = parts.netloc.lower()
+    for port in _DEFAULT_PORTS:
+        if host.endswith(port):
+            host = host[:-len(port)]
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    path = re.sub(r"/{2,}", "/", parts.path).rstrip("/") or "/"
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+              if k.lower() not in TRACKING_PARAMS and not k.lower().startswith(TRACKING_PREFIXES)
+              ] if parts.query else []
+
+    for suffix, (key_path, key) in JOB_KEY_URLS.items():
+        if host == suffix or host.endswith("." + suffix):
+            job_key = next((v for k, v in params if k == key), None)
+            if job_key:
+                path, params = key_path, [(key, job_key)]
+            break
+
+    # Scheme and fragment never identify a different posting
+    return urlunsplit(("https", host, path, urlencode(sorted(params)), ""))
+
+
+@lru_cache(maxsize=16384)
+def _normalize_tokens(text: str) -> tuple:
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode().lower()
+    return tuple(_ABBREVIATIONS.get(t, t) for t in _NON_WORD.split(text) if t)
+
+
+def _tokens(text) -> tuple:
+    # Titles, companies and locations repeat across results; their tokens are cached
+    return _normalize_tokens(str(text or ""))
+
+
+def _company_key(company: str) -> str:
+    key = " ".join(t for t in _tokens(company) if t not in _COMPANY_SUFFIXES)
+    return '' if key in _PLACEHOLDER_COMPANIES or str(company).strip().lower() in _PLACEHOLDER_COMPANIES else key
+
+
+def _location_key(location: str) -> str:
+    tokens = _tokens(location)
+    if 'remote' in tokens:
+        return 'remote'
+    # "Austin, TX" and "Austin, Texas, United States" are the same place
+    return " ".join(_tokens(str(location or "").split(",")[0]))
+
+
+def fingerprint(job: dict) -> tuple:
+    """
+    Normalized (title, company, location) of a job.
+    Returns None when the title or company is missing or a placeholder.
+    """
+    title = " ".join(_tokens(job.get('title', '')))
+    company = _company_key(job.get('company', ''))
+    if not title or not company:
+        return None
+    return title, company, _location_key(job.get('location', ''))
+
+
+def simhash(text: str, bits: int = SIMHASH_BITS) -> int:
+    """SimHash of the word shingles of text; similar texts differ in few bits"""
+    import numpy as np  # loaded on the first near-duplicate comparison
+
+    tokens = _tokens(text)
+    shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(max(1, len(tokens) - SHINGLE_SIZE + 1))}
+    digests = b"".join(hashlib.blake2b(shingle.encode(), digest_size=bits // 8).digest() for shingle in shingles)
+    # Per bit position: set in more than half of the shingle hashes -> set in the SimHash
+    set_counts = np.unpackbits(np.frombuffer(digests, dtype=np.uint8)).reshape(len(shingles), bits).sum(axis=0)
+    return int.from_bytes(np.packbits(set_counts * 2 > len(shingles)).tobytes(), "big")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+class DedupIndex:
+    """
+    Incremental duplicate filter; the first job seen wins.
+    Usable across batches (e.g. while streaming results source by source).
+    """
+
+    def __init__(self, max_distance: int = NEAR_DUPLICATE_DISTANCE):
+        self.max_distance = max_distance
+        self._urls = set()
+        self._fingerprints = set()
+        self._groups = {}     # (title, company) -> [[simhash or None, description, location], ...]
+        self.duplicates = {'url': 0, 'fingerprint': 0, 'description': 0}
+        self.kept = 0
+
+    def _near_duplicate(self, group: list, description: str, location: str) -> bool:
+        if not description:
+            return False
+        signature = simhash(description)
+        for member in group:
+            # Two known, different locations are two postings however alike their text is
+            if member[2] != location and member[2] not in _UNKNOWN_LOCATIONS and location not in _UNKNOWN_LOCATIONS:
+                continue
+            if member[0] is None and member[1]:
+                member[0] = simhash(member[1])   # hashed on first comparison only
+            if member[0] is not None and hamming_distance(member[0], signature) <= self.max_distance:
+                return True
+        group.append([signature, description, location])
+        return False
+
+    def add(self, job: dict) -> bool:
+        """Record job; returns False if it duplicates a job already added (or has no URL)"""
+        url = canonical_url(job.get('url', ''))
+        if not url:
+            return False
+        if url in self._urls:
+            self.duplicates['url'] += 1
+            return False
+
+        key = fingerprint(job)
+        if key is not None:
+            if key in self._fingerprints:
+                self.duplicates['fingerprint'] += 1
+                return False
+            description = str(job.get('description', '') or '')
+            group = self._groups.get(key[:2])
+            if group is None:
+                self._groups[key[:2]] = [[None, description, key[2]]]
+            elif self._near_duplicate(group, description, key[2]):
+                self.duplicates['description'] += 1
+                return False
+            self._fingerprints.add(key)
+
+        self._urls.add(url)
+        self.kept += 1
+        return True
+
+    def filter(self, jobs: list) -> list:
+        """The jobs not seen before, in order"""
+        return [job for job in jobs if self.add(job)]
+
+    def stats(self) -> dict:
+        return {'kept': self.kept, **{f'duplicate_{k}': v for k, v in self.duplicates.items()}}
+
+
+def dedupe_jobs(jobs: list) -> list:
+    """Remove duplicate postings (same canonical URL, fingerprint or near-identical description), keeping the first"""
+    return DedupIndex().filter(jobs)
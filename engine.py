@@ -0,0 +1,783 @@
+"""
+JobStream search engine.
+
+The CV-to-jobs pipeline without any Streamlit dependency: skill extraction,
+query generation, concurrent multi-source job search, deduplication and
+ranking. Used by the Streamlit app (app.py), the HTTP API (api.py) and the
+batch CLI (cli.py).
+"""
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import quote
+
+import cv_parser
+import dedup
+import feeds
+import firecrawl_batch
+import metrics
+import politeness
+import shared_cache
+import skill_matcher
+from job_store import has_skill, job_store
+from result_cache import job_cache, normalize_query, FRESH, STALE
+from singleflight import SingleFlight
+from sources import job_sources
+
+logger = logging.getLogger(__name__)
+
+# Heavy modules (requests via http_client, lxml via html_parsing, numpy via ranking) are imported
+# inside the functions that need them, so importing the engine stays cheap.
+
+# --- 1. SKILL EXTRACTION & MATCHING ---
+def extract_skills(text: str) -> list:
+    """Extract technical skills from CV text (vocabulary in skills.txt, compiled once per process)"""
+    return skill_matcher.extract_skills(text)
+
+def calculate_cv_job_match(cv_skills: list, job: dict) -> dict:
+    """
+    Calculate CV to job match percentage and reasons
+    Returns: {'match_percent': 85, 'matched_skills': [...], 'missing_skills': [...], 'reasons': [...]}
+    """
+    job_title = job.get('title', '').lower()
+    job_description = f"{job.get('description', '')} {job.get('requirements', '')}".lower()
+    
+    # Extract job requirements (look for skill keywords in title and description)
+    job_keywords = []
+    for skill in cv_skills:
+        if skill.lower() in job_title or skill.lower() in job_description:
+            job_keywords.append(skill)
+    
+    # Also look for role-specific keywords
+    role_keywords = {
+        'senior': ['leadership', 'architecture', '5+', 'years'],
+        'junior': ['entry', 'graduate', 'bootcamp', 'willing'],
+        'remote': ['remote', 'distributed', 'timezone'],
+        'full-time': ['full-time', 'fulltime'],
+    }
+    
+    # Calculate match
+    matched_skills = [skill for skill in cv_skills if skill in job_keywords]
+    missing_skills = [skill for skill in cv_skills if skill not in job_keywords]
+    
+    if len(cv_skills) == 0:
+        match_percent = 50  # Base score if no skills detected
+    else:
+        match_percent = min(100, (len(matched_skills) / len(cv_skills)) * 100)
+    
+    # Generate match reasons
+    import ranking
+    reasons = ranking.build_match_reasons(job, matched_skills, match_percent)
+    
+    return {
+        'match_percent': int(match_percent),
+        'matched_skills': matched_skills,
+        'missing_skills': missing_skills,
+        'reasons': reasons
+    }
+
+@metrics.timed("ranking")
+def rank_jobs_by_match(jobs: list, cv_skills: list, top_k: int = None) -> list:
+    """
+    Rank jobs by CV match and add match data to each job
+    Scores the whole result set in one vectorized pass (see ranking.py);
+    with top_k only the best k jobs are annotated and returned.
+    Returns: jobs sorted by match percentage (highest first)
+    """
+    import ranking
+    return ranking.rank_jobs(jobs, cv_skills, top_k=top_k)
+
+def preference_features(jobs: list, salaries: list = None):
+    """
+    Per-job features for preference re-ranking, computed once per result set.
+    Call .order(job_types, experience_range) on the result whenever preferences change.
+    """
+    import ranking
+    return ranking.PreferenceFeatures(jobs, salaries)
+
+@metrics.timed("query_generation")
+def generate_search_queries(skills: list, manual_query: str = "") -> list:
+    """Generate targeted job search queries"""
+    queries = []
+    
+    if manual_query:
+        queries.append(manual_query)
+    else:
+        # Prioritize top skills
+        top_skills = skills[:3] if len(skills) >= 3 else skills
+        
+        for skill in top_skills:
+            queries.append(f"{skill} Developer")
+            queries.append(f"{skill} Engineer")
+        
+        if not queries:
+            queries.append("Software Developer")
+    
+    return queries
+
+# --- 2. JOB SCRAPING FUNCTIONS ---
+
+@job_sources.register("Firecrawl", timeout=9, ttl=6 * 3600, priority=2, available=firecrawl_batch.configured)
+def fetch_firecrawl_jobs(query: str) -> list:
+    """
+    Fetch real postings from every board's search page with one Firecrawl batch-scrape job
+    shared by the concurrent queries of a search (see firecrawl_batch.py).
+    Skipped unless a Firecrawl API key is configured.
+    """
+    return firecrawl_batch.fetch_jobs(query, wait=8, key=firecrawl_batch.api_key())
+
+# Base URL of the Indeed scraper; point it at a local stand-in server for offline benchmarks
+INDEED_URL = os.getenv("JOBSTREAM_INDEED_URL", "https://www.indeed.com").rstrip("/")
+
+@job_sources.register("Indeed", timeout=9, ttl=15 * 60, priority=1, rate_limit=30)
+def fetch_indeed_jobs_detailed(query: str, limit: int = 3) -> list:
+    """
+    Fetch detailed job postings from Indeed with real job URLs
+    Request errors are raised so the source's circuit breaker sees them.
+    """
+    import html_parsing
+    import http_client
+    
+    jobs = []
+    url = f"{INDEED_URL}/jobs?q={quote(query)}&start=0"
+    response = http_client.get(url, timeout=8)
+    response.raise_for_status()
+    # Only the job cards are parsed, with precompiled selectors (see html_parsing.py)
+    job_cards = html_parsing.parse_indeed_cards(response.content, limit=limit)
+    
+    for card in job_cards:
+        try:
+            # Direct link from the title anchor, else from the job ID (jk)
+            job_id = card['job_id']
+            if card['href']:
+                job_url = f"{INDEED_URL}{card['href']}"
+            else:
+                job_url = f"{INDEED_URL}/viewjob?jk={job_id}" if job_id else ""
+            
+            jobs.append({
+                'title': card['title'] or "Job Title",
+                'url': job_url,
+                'company': card['company'] or "Unknown Company",
+                'location': card['location'] or "Remote",
+                'salary': card['salary'] or "Not specified",
+                'description': card['snippet'][:300] if card['snippet'] else "Job description available on Indeed",
+                'platform': '🔍 Indeed',
+                'job_type': 'Full-time / Contract',
+                'posted_date': 'Recently posted',
+                'requirements': ['View full details on Indeed'],
+                'perks': ['Competitive salary', 'Verified company']
+            })
+        except Exception as e:
+            logger.warning(f"Error parsing Indeed job: {e}")
+            continue
+    
+    return jobs
+
+@job_sources.register("LinkedIn", timeout=5, ttl=6 * 3600)
+def fetch_linkedin_detailed_jobs(query: str) -> list:
+    """Fetch LinkedIn job search with direct job links"""
+    jobs = []
+    try:
+        # Create detailed LinkedIn searches
+        jobs_data = [
+            {
+                'title': f'Senior {query}',
+                'url': f'https://www.linkedin.com/jobs/search/?keywords=senior+{quote(query)}&sort=DD',
+                'company': 'LinkedIn - Top Companies',
+                'location': 'Global',
+                'salary': '$120K - $200K+',
+                'description': f'Senior-level {query} positions at leading companies with mentorship and growth opportunities.',
+                'platform': '💼 LinkedIn',
+                'job_type': 'Full-time',
+                'posted_date': 'Today',
+                'requirements': ['5+ years experience', f'Expertise in {query}', 'Leadership background'],
+                'perks': ['Remote options', 'Stock rewards', 'Team leadership']
+            },
+            {
+                'title': f'Entry-Level {query} Developer',
+                'url': f'https://www.linkedin.com/jobs/search/?keywords=entry+level+{quote(query)}&sort=DD',
+                'company': 'LinkedIn - Start Your Career',
+                'location': 'Global / Hybrid',
+                'salary': '$60K - $95K',
+                'description': f'Start your {query} career! Companies actively hiring new graduates and career switchers.',
+                'platform': '💼 LinkedIn',
+                'job_type': 'Full-time / Internship',
+                'posted_date': 'Yesterday',
+                'requirements': ['Bootcamp or degree', f'{query} basics', 'Willingness to learn'],
+                'perks': ['Mentorship', 'Training programs', 'Growth potential']
+            }
+        ]
+        jobs.extend(jobs_data)
+    except Exception as e:
+        logger.warning(f"Error creating LinkedIn jobs: {e}")
+    
+    return jobs
+
+@job_sources.register("Feeds", timeout=9, ttl=feeds.INTERVAL, priority=1)
+def fetch_feed_jobs(query: str) -> list:
+    """
+    Real postings from boards that publish bulk RSS/JSON feeds (We Work Remotely, RemoteOK).
+    Each feed is downloaded once per interval and filtered locally per query (see feeds.py).
+    """
+    return feeds.feed_ingestor.search(query)
+
+@job_sources.register("Remote", timeout=5, ttl=6 * 3600)
+def fetch_remote_jobs_detailed(query: str) -> list:
+    """Fetch remote-specific job boards"""
+    jobs = []
+    remote_platforms = [
+        {
+            'title': f'Remote {query} Jobs',
+            'url': f'https://remote.co/remote-jobs/search?q={quote(query)}',
+            'company': 'Remote.co',
+            'location': 'Remote - Worldwide',
+            'salary': '$50K - $150K',
+            'description': f'Exclusively remote {query} positions from companies hiring globally.',
+            'platform': '🌐 Remote.co',
+            'job_type': 'Remote',
+            'posted_date': 'Updated daily',
+            'requirements': ['Remote experience', f'{query} skills', 'Self-motivated'],
+            'perks': ['100% Remote', 'Flexible hours', 'Global team']
+        },
+        {
+            'title': f'{query} - We Work Remotely',
+            'url': f'https://weworkremotely.com/remote-jobs/search?term={quote(query)}',
+            'company': 'We Work Remotely',
+            'location': 'Remote - All time zones',
+            'salary': '$60K - $160K',
+            'description': f'Quality remote {query} jobs from vetted companies worldwide.',
+            'platform': '💻 We Work Remotely',
+            'job_type': 'Remote Full-time',
+            'posted_date': 'Fresh daily',
+            'requirements': [f'{query} expertise', 'Communication skills', 'Independence'],
+            'perks': ['Full remote', 'Async-friendly', 'Global companies']
+        },
+        {
+            'title': f'{query} Positions - FlexJobs',
+            'url': f'https://www.flexjobs.com/search?search={quote(query)}&location=remote',
+            'company': 'FlexJobs',
+            'location': 'Remote / Flexible',
+            'salary': '$55K - $145K',
+            'description': f'Curated {query} jobs with background-checked companies. Scam-free guaranteed.',
+            'platform': '💼 FlexJobs',
+            'job_type': 'Remote / Flexible',
+            'posted_date': 'Recently curated',
+            'requirements': ['Remote work experience', f'{query} skills', 'Reliability'],
+            'perks': ['Scam-protected', 'Flexible', 'Diverse roles']
+        },
+    ]
+    
+    jobs.extend(remote_platforms)
+    return jobs
+
+@job_sources.register("Tech-specific", timeout=5, ttl=6 * 3600)
+def fetch_tech_specific_jobs(query: str) -> list:
+    """Fetch tech-specific job boards"""
+    jobs = []
+    tech_jobs = [
+        {
+            'title': f'{query} Developer - Stack Overflow',
+            'url': f'https://stackoverflow.com/jobs?q={quote(query)}&sort=i',
+            'company': 'Stack Overflow Jobs',
+            'location': 'Global',
+            'salary': '$80K - $200K',
+            'description': f'Premium {query} positions from tech companies. Discover your next opportunity.',
+            'platform': '📚 Stack Overflow',
+            'job_type': 'Full-time / Contract',
+            'posted_date': 'Updated real-time',
+            'requirements': ['Strong technical skills', f'{query} proficiency', 'Problem solving'],
+            'perks': ['Tech-focused', 'Competitive pay', 'Vetted companies'],
+            'job_count': '5K+ positions'
+        },
+        {
+            'title': f'{query} Jobs - HackerNews Who Hiring',
+            'url': f'https://news.ycombinator.com/newest',
+            'company': 'YCombinator / Startups',
+            'location': 'San Francisco / Remote',
+            'salary': '$100K - $250K+',
+            'description': f'Startup opportunities from Y Combinator. Browse monthly hiring threads for {query}.',
+            'platform': 'HackerNews',
+            'job_type': 'Full-time / Founding roles',
+            'posted_date': 'Monthly updates',
+            'requirements': ['Startup experience', f'{query} expertise', 'Entrepreneurial spirit'],
+            'perks': ['Equity available', 'High growth', 'Innovation focus'],
+            'job_count': 'Varying'
+        },
+        {
+            'title': f'{query} Roles - Dev.to/Jobs',
+            'url': f'https://dev.to/search?q={quote(query)}&filters=class_name:Job',
+            'company': 'Dev.to Community',
+            'location': 'Global',
+            'salary': '$70K - $180K',
+            'description': f'Community-driven {query} job postings from developers for developers.',
+            'platform': '👨‍💻 Dev.to',
+            'job_type': 'Full-time / Contract',
+            'posted_date': 'Posted by community',
+            'requirements': ['Tech skills', f'{query} knowledge', 'Community involvement'],
+            'perks': ['Community focus', 'Transparent', 'Developer-friendly']
+        },
+    ]
+    
+    jobs.extend(tech_jobs)
+    return jobs
+
+@job_sources.register("Startup", timeout=5, ttl=6 * 3600)
+def fetch_startup_jobs(query: str) -> list:
+    """Fetch startup-specific job boards"""
+    jobs = []
+    startup_jobs = [
+        {
+            'title': f'{query} - AngelList/Wellfound',
+            'url': f'https://wellfound.com/jobs?keywords={quote(query)}&sort=recent',
+            'company': 'Wellfound Startups',
+            'location': 'San Francisco / Remote',
+            'salary': '$80K - $250K + Equity',
+            'description': f'Startup {query} positions with equity compensation. High growth companies.',
+            'platform': '⭐ AngelList',
+            'job_type': 'Full-time',
+            'posted_date': 'Fresh startup roles',
+            'requirements': ['Startup mindset', f'{query} skills', 'Adaptability'],
+            'perks': ['Equity compensation', 'Growth potential', 'Innovation'],
+            'job_count': '1000+ startups hiring'
+        },
+        {
+            'title': f'{query} Jobs - Dice.com',
+            'url': f'https://www.dice.com/jobs?q={quote(query)}&sort=-date',
+            'company': 'Dice Tech Jobs',
+            'location': 'USA / Remote',
+            'salary': '$75K - $190K',
+            'description': f'Tech {query} positions on Dice, the leading tech recruiter platform.',
+            'platform': '🎲 Dice',
+            'job_type': 'Full-time / Contract',
+            'posted_date': 'Recently posted',
+            'requirements': ['Tech expertise', f'{query} proficiency', 'US work authorization'],
+            'perks': ['Tech-focused', 'Competitive salary', 'Recruiter matched']
+        },
+        {
+            'title': f'{query} - Authentic Jobs',
+            'url': f'https://www.authenticjobs.com/?search={quote(query)}',
+            'company': 'Authentic Jobs Network',
+            'location': 'Global',
+            'salary': '$60K - $150K',
+            'description': f'Quality {query} positions from real companies. Authentic hiring.',
+            'platform': '✨ Authentic Jobs',
+            'job_type': 'Full-time / Contract / Freelance',
+            'posted_date': 'Curated daily',
+            'requirements': [f'{query} experience', 'Portfolio ready', 'Professionalism'],
+            'perks': ['Quality postings', 'Verified employers', 'Multiple job types']
+        },
+    ]
+    
+    jobs.extend(startup_jobs)
+    return jobs
+
+@job_sources.register("Specialized", timeout=5, ttl=6 * 3600)
+def fetch_specialized_jobs(query: str) -> list:
+    """Fetch specialized/niche job boards"""
+    jobs = []
+    specialized = [
+        {
+            'title': f'{query} - GitHub Trending',
+            'url': f'https://jobs.github.com/positions?description={quote(query)}',
+            'company': 'GitHub Jobs',
+            'location': 'Global',
+            'salary': '$90K - $220K',
+            'description': f'Open source and tech {query} jobs from companies using GitHub.',
+            'platform': '🐙 GitHub',
+            'job_type': 'Full-time / Contract',
+            'posted_date': 'Updated regularly',
+            'requirements': ['GitHub profile', f'{query} skills', 'Open source interest'],
+            'perks': ['Open source focus', 'Technical teams', 'Innovation']
+        },
+        {
+            'title': f'{query} Freelance - Upwork',
+            'url': f'https://www.upwork.com/ab/jobs/search/?q={quote(query)}&sort=-date',
+            'company': 'Upwork Marketplace',
+            'location': 'Remote - All time zones',
+            'salary': '$25 - $300+/hour',
+            'description': f'Freelance and contract {query} work. Set your own rates and schedule.',
+            'platform': '💰 Upwork',
+            'job_type': 'Freelance / Contract',
+            'posted_date': 'Ongoing opportunities',
+            'requirements': ['Proven work', 'Good communication', 'Reliability'],
+            'perks': ['High flexibility', 'Choose projects', 'Set your rate']
+        },
+    ]
+    
+    jobs.extend(specialized)
+    return jobs
+
+@job_sources.register("Glassdoor", timeout=5, ttl=6 * 3600)
+def fetch_glassdoor_jobs(query: str) -> list:
+    """Fetch jobs from Glassdoor with company reviews"""
+    jobs = []
+    try:
+        job_data = {
+            'title': f'{query} - Glassdoor Verified',
+            'url': f'https://www.glassdoor.com/Job/jobs.htm?keyword={quote(query)}&sort_by=date_posted.desc',
+            'company': 'Verified via Glassdoor',
+            'location': 'Global',
+            'salary': '$70K - $200K',
+            'description': f'View {query} jobs with company ratings and salary reviews from employees.',
+            'platform': '💎 Glassdoor',
+            'job_type': 'Multiple',
+            'posted_date': 'Recently posted',
+            'requirements': ['Research company', 'Read reviews', 'Informed decision'],
+            'perks': ['Company ratings', 'Salary data', 'Employee reviews'],
+            'job_count': '10K+ roles'
+        }
+        jobs.append(job_data)
+    except Exception as e:
+        logger.warning(f"Error creating Glassdoor jobs: {e}")
+    
+    return jobs
+
+# Every source queried for a search, in priority order (see the @job_sources.register calls above)
+JOB_SOURCES = job_sources
+
+# Global wall-clock budget for one search across all queries and sources (seconds)
+SEARCH_TIME_BUDGET = float(os.getenv("JOBSTREAM_SEARCH_BUDGET", "10"))
+MAX_FETCH_WORKERS = int(os.getenv("JOBSTREAM_FETCH_WORKERS", "16"))
+
+# Identical (source, query) fetches running at the same time share one request (see singleflight.py)
+fetch_flights = SingleFlight("source_fetch")
+
+def _copy_jobs(jobs: list) -> list:
+    return [dict(job) for job in jobs]
+
+def fetch_source(source, query: str, timeout: float = None) -> list:
+    """
+    Fetch one source for one query, bypassing the index and cache.
+    Concurrent calls for the same source and normalized query share one request; a caller that
+    finds it in flight waits at most timeout seconds for it. Every caller gets its own copy of the jobs.
+    A request held back by the host's rate limit only fails the caller whose deadline it missed;
+    the callers sharing it try again under their own deadlines.
+    """
+    key = (source.name, normalize_query(query))
+    return _copy_jobs(fetch_flights.do(key, lambda: _fetch_source(source, query), timeout=timeout,
+                                       retry_on=(politeness.Throttled,)))
+
+def fetch_source_low_priority(source, query: str, fc_key: str = "") -> list:
+    """
+    fetch_source() behind interactive requests in the hosts' request queues (cache refreshes, prewarming).
+    fc_key is the Firecrawl API key of the search that asked for it (default FIRECRAWL_API_KEY).
+    """
+    with politeness.scope(client="background", priority=politeness.BACKGROUND), firecrawl_batch.use_api_key(fc_key):
+        return fetch_source(source, query)
+
+def _fetch_source(source, query: str) -> list:
+    """One tracked fetch: outcome and latency feed the source's breaker, health stats and metrics; jobs go to the job index"""
+    fetch_started = time.monotonic()
+    try:
+        jobs = source.fetch(query)
+    except politeness.Throttled:
+        # Held back by our own per-host rate limit; nothing was sent, so the breaker is left alone
+        metrics.inc("jobstream_source_fetches_total", source=source.name, outcome="throttled")
+        raise
+    except Exception:
+        elapsed = time.monotonic() - fetch_started
+        source.record(False, elapsed)
+        metrics.observe("source_fetch", elapsed, source=source.name)
+        metrics.inc("jobstream_source_fetches_total", source=source.name, outcome="error")
+        raise
+    elapsed = time.monotonic() - fetch_started
+    source.record(True, elapsed)
+    metrics.observe("source_fetch", elapsed, source=source.name)
+    metrics.inc("jobstream_source_fetches_total", source=source.name, outcome="ok")
+    metrics.inc("jobstream_jobs_total", len(jobs), step="fetched")
+    job_store.upsert(source.name, query, jobs, source.ttl)
+    return jobs
+
+def iter_jobs_concurrently(queries: list, sources: list = None, time_budget: float = None, on_scheduled=None,
+                           skills: list = None):
+    """
+    Run every (query, source) pair in parallel on a thread pool and yield
+    (query_index, source_index, query, source name, jobs) as each pair completes.
+    on_scheduled(pairs) is called once, before the first result, with the number of pairs
+    that will be answered (from the index or cache, or fetched live).
+    Each source gets its own deadline and the whole search is capped by time_budget;
+    sources that miss their deadline are dropped.
+    Pairs the job index covers (see job_store.py) are answered with the jobs their last fetch
+    returned; then cached results, stale ones being served and refreshed in the background.
+    Only the remaining gaps are fetched live.
+    Sources whose circuit breaker is open (see sources.py) are not fetched; their gaps are filled
+    with the indexed jobs of that source best matching the query, if any.
+    skills narrows every answer to jobs requiring at least one of them: in SQL for indexed
+    answers, with the same test (has_skill) for cached and live ones.
+    """
+    sources = list(JOB_SOURCES if sources is None else sources)
+    time_budget = SEARCH_TIME_BUDGET if time_budget is None else time_budget
+    if not queries or not sources:
+        return
+    
+    started = time.monotonic()
+    budget_deadline = started + time_budget
+    
+    def with_skills(jobs):
+        return [job for job in jobs if has_skill(job, skills)] if skills else jobs
+    
+    def fetch_and_cache(source, query, deadline):
+        # Cache from the worker so results that miss their deadline still warm the cache;
+        # requests that cannot get past the host's rate limit before the deadline are not sent
+        with politeness.scope(deadline=deadline):
+            jobs = fetch_source(source, query, timeout=max(0.0, deadline - time.monotonic()))
+        job_cache.put(source.name, query, jobs, source.ttl)
+        return jobs
+    
+    cached_results = []
+    live = []
+    skipped = 0
+    for q_idx, query in enumerate(queries):
+        for s_idx, source in enumerate(sources):
+            if job_store.covers(source.name, query):
+                cached_results.append((q_idx, s_idx, query, source.name,
+                                       job_store.fetched_jobs(source.name, query, skills)))
+                continue
+            cached, state = job_cache.get(source.name, query)
+            metrics.inc("jobstream_result_cache_lookups_total", state=state)
+            if state in (FRESH, STALE):
+                cached_results.append((q_idx, s_idx, query, source.name, with_skills(cached)))
+                if state == STALE and source.allow():
+                    # The refresh runs outside this search's context, so it is handed the search's API key
+                    job_cache.refresh_in_background(source.name, query,
+                                                    lambda src=source, q=query, key=firecrawl_batch.api_key():
+                                                    fetch_source_low_priority(src, q, key),
+                                                    source.ttl)
+            elif fetch_flights.in_flight((source.name, normalize_query(query))) or source.allow():
+                # Joining another search's in-flight fetch costs no request, so no rate limit token
+                live.append((q_idx, s_idx, query, source, min(started + source.timeout, budget_deadline)))
+            else:
+                skipped += 1
+                similar = job_store.search(query, sources=[source.name], skills=skills)
+                if similar:
+                    cached_results.append((q_idx, s_idx, query, source.name, similar))
+    if skipped:
+        logger.info(f"Skipped {skipped} source fetches (circuit open or rate limited)")
+    if on_scheduled:
+        on_scheduled(len(cached_results) + len(live))
+    
+    completed = len(cached_results)
+    yield from cached_results
+    if not live:
+        logger.info(f"All {completed} available source results served from the index or cache")
+        return
+    
+    executor = ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(live)), thread_name_prefix="job-fetch")
+    futures = {}
+    for q_idx, s_idx, query, source, deadline in live:
+        # Run in a copy of this context so the fetch reports to the caller's metrics trace
+        future = executor.submit(contextvars.copy_context().run, fetch_and_cache, source, query, deadline)
+        futures[future] = (q_idx, s_idx, query, source.name, deadline)
+    
+    pending = set(futures)
+    try:
+        while pending:
+            now = time.monotonic()
+            # Give up on pairs whose own deadline has passed
+            for future in [f for f in pending if futures[f][4] <= now]:
+                pending.discard(future)
+                future.cancel()
+                _, _, query, name, _ = futures[future]
+                logger.warning(f"{name} timed out for '{query}', returning partial results")
+            if not pending:
+                break
+            
+            next_deadline = min(futures[f][4] for f in pending)
+            done, pending = wait(pending, timeout=max(0, next_deadline - now), return_when=FIRST_COMPLETED)
+            for future in done:
+                q_idx, s_idx, query, name, _ = futures[future]
+                try:
+                    jobs = future.result()
+                except Exception as e:
+                    logger.warning(f"{name} error for '{query}': {e}")
+                    continue
+                jobs = with_skills(jobs)
+                logger.info(f"Added {len(jobs)} {name} jobs for '{query}'")
+                completed += 1
+                yield q_idx, s_idx, query, name, jobs
+    finally:
+        # Do not block on stragglers; they finish (or time out) in the background. Pairs that never
+        # started are cancelled by hand (shutdown's cancel_futures needs Python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+        logger.info(f"Search finished in {time.monotonic() - started:.2f}s "
+                    f"({completed}/{len(queries) * len(sources)} source results, {len(futures)} fetched live)")
+
+def fetch_jobs_concurrently(queries: list, sources: list = None, time_budget: float = None,
+                            skills: list = None) -> list:
+    """
+    Fetch every (query, source) pair concurrently and return the jobs collected within the budget.
+    Results keep the (query, source) order of the serial implementation.
+    skills narrows them to jobs requiring at least one of those skills.
+    """
+    results = {}
+    for q_idx, s_idx, _, _, jobs in iter_jobs_concurrently(queries, sources, time_budget, skills=skills):
+        results[(q_idx, s_idx)] = jobs
+    
+    all_jobs = []
+    for key in sorted(results):
+        all_jobs.extend(results[key])
+    
+    logger.info(f"Total jobs collected: {len(all_jobs)}")
+    return all_jobs
+
+def generate_detailed_job_listings(query: str) -> list:
+    """Generate detailed job listings from ALL sources"""
+    logger.info(f"Fetching detailed jobs for query: {query}")
+    return fetch_jobs_concurrently([query])
+
+def search_job_platforms(query: str, fc_key: str, skills: list = None) -> list:
+    """
+    Search multiple job platforms for relevant positions with detailed info
+    Answers from the local job index where it covers the query, scraping live only for the gaps.
+    Returns list of job postings with detailed information
+    """
+    return search_job_platforms_many([query], fc_key, skills)
+
+def search_job_platforms_many(queries: list, fc_key: str, skills: list = None) -> list:
+    """
+    Search multiple job platforms for several queries at once.
+    All (query, source) pairs run concurrently, so the search takes as long as the slowest source.
+    Only jobs requiring at least one of skills are returned, if given (filtered in SQL where indexed).
+    """
+    jobs = []
+    
+    try:
+        logger.info(f"Searching for: {', '.join(queries)}")
+        job_store.record_queries(queries)
+        with firecrawl_batch.use_api_key(fc_key):
+            jobs.extend(fetch_jobs_concurrently(queries, skills=skills))
+    except Exception as e:
+        logger.error(f"Job search error: {e}")
+    
+    return jobs
+
+def search_fallback_method(query: str) -> list:
+    """Fallback: Direct links to job search results"""
+    jobs = []
+    platforms = {
+        '💼 LinkedIn': f"https://www.linkedin.com/jobs/search/?keywords={quote(query)}&location=",
+        '🔍 Indeed': f"https://indeed.com/jobs?q={quote(query)}",
+        '💎 Glassdoor': f"https://www.glassdoor.com/Job/jobs.htm?keyword={quote(query)}",
+        '⭐ AngelList': f"https://wellfound.com/jobs?keywords={quote(query)}",
+        '🏠 RemoteOK': f"https://remoteok.com/remote-{quote(query.lower().replace(' ', '-'))}-jobs",
+        '📚 Stack Overflow': f"https://stackoverflow.com/jobs?q={quote(query)}",
+        '🎯 Lever': f"https://jobs.lever.co/search?query={quote(query)}",
+        '🌱 Greenhouse': f"https://boards.greenhouse.io/search?query={quote(query)}",
+    }
+    
+    for platform, url in platforms.items():
+        jobs.append({
+            'title': f"{query} Jobs",
+            'url': url,
+            'description': f"Search {query} jobs on {platform.replace(chr(128512), '').replace(chr(128270), '').replace(chr(128269), '')}",
+            'company': platform.split()[0] if len(platform.split()) > 0 else platform,
+            'platform': platform
+        })
+    
+    logger.info(f"Fallback method created {len(jobs)} job search links for '{query}'")
+    return jobs
+
+def extract_company_from_url(url: str) -> str:
+    """Extract company name or platform from URL"""
+    if not url:
+        return "Unknown"
+    try:
+        domain = url.split('/')[2].replace('www.', '').split('.')[0]
+        return domain.capitalize()
+    except:
+        return "Unknown"
+
+def get_platform_name(url: str) -> str:
+    """Identify job platform from URL"""
+    platforms = {
+        'linkedin.com': '💼 LinkedIn',
+        'indeed.com': '🔍 Indeed',
+        'lever.co': '🎯 Lever',
+        'greenhouse.io': '🌱 Greenhouse',
+        'wellfound.com': '⭐ AngelList',
+        'glassdoor.com': '💎 Glassdoor',
+        'remoteok.com': '🏠 RemoteOK',
+        'stackoverflow.com': '📚 Stack Overflow',
+    }
+    
+    for domain, name in platforms.items():
+        if domain in url:
+            return name
+    return "🔗 Job Board"
+
+def search_by_query(queries: list, fc_key: str = "", chunk_size: int = 3) -> dict:
+    """
+    Search many queries, keeping results per query (for batch jobs).
+    Queries are fanned out chunk_size at a time so per-source deadlines stay meaningful.
+    Returns: {query: [jobs in source order]}
+    """
+    job_store.record_queries(queries)
+    results = {}
+    for start in range(0, len(queries), chunk_size):
+        chunk = queries[start:start + chunk_size]
+        by_pair = {}
+        with firecrawl_batch.use_api_key(fc_key):
+            for q_idx, s_idx, _, _, jobs in iter_jobs_concurrently(chunk):
+                by_pair[(q_idx, s_idx)] = jobs
+        for q_idx, query in enumerate(chunk):
+            results[query] = [job for key in sorted(by_pair) if key[0] == q_idx for job in by_pair[key]]
+    return results
+
+# --- 3. PIPELINE ---
+
+def dedupe_jobs(jobs: list) -> list:
+    """
+    Remove duplicate postings, keeping the first occurrence.
+    Matches on canonical URL, (title, company, location) fingerprint and near-identical descriptions (see dedup.py).
+    """
+    with metrics.timer("dedup"):
+        unique_jobs = dedup.dedupe_jobs(jobs)
+    metrics.inc("jobstream_jobs_total", len(jobs) - len(unique_jobs), step="duplicate")
+    return unique_jobs
+
+def queries_for(cv_skills: list, manual_query: str = "", max_queries: int = 3) -> list:
+    """Search queries for a CV or a manual query (top max_queries)"""
+    if manual_query:
+        return [manual_query]
+    return (generate_search_queries(cv_skills) or ["Software Developer"])[:max_queries]
+
+RANKING_TTL = 10 * 60   # seconds a ranked result set is shared between replicas
+
+def ranking_key(queries: list, cv_skills: list) -> str:
+    """Shared cache key of the ranked results of queries for a set of CV skills"""
+    return "|".join(normalize_query(q) for q in queries) + "#" + ",".join(sorted(s.lower() for s in cv_skills or []))
+
+def match_jobs(cv_skills: list, manual_query: str = "", fc_key: str = "", top_k: int = None) -> dict:
+    """
+    Full search for a set of CV skills (or a manual query): search, dedupe and rank.
+    With a shared cache the whole ranking is shared, so other replicas answer the same search from it.
+    Returns: {'queries': [...], 'jobs': [...ranked jobs...], 'total': n}
+    """
+    queries = queries_for(cv_skills, manual_query)
+    key = ranking_key(queries, cv_skills)
+    jobs = shared_cache.rankings.get(key)
+    if jobs is not None:
+        return {'queries': queries, 'jobs': jobs[:top_k] if top_k is not None else jobs, 'total': len(jobs)}
+
+    jobs = dedupe_jobs(search_job_platforms_many(queries, fc_key))
+    total = len(jobs)
+    if cv_skills:
+        jobs = rank_jobs_by_match(jobs, cv_skills, top_k=None if shared_cache.rankings.enabled else top_k)
+    if jobs:
+        shared_cache.rankings.put(key, jobs, RANKING_TTL)
+    if top_k is not None:
+        jobs = jobs[:top_k]
+    return {'queries': queries, 'jobs': jobs, 'total': total}
+
+def match_cv_pdf(pdf_data: bytes, manual_query: str = "", fc_key: str = "", top_k: int = None) -> dict:
+    """
+    Run the whole pipeline for a PDF CV.
+    Returns: {'sha256', 'skills', 'queries', 'jobs', 'total'}
+    """
+    cv = cv_parser.parse_pdf_cached(pdf_data)
+    result = match_jobs(cv['skills'], manual_query, fc_key, top_k)
+    return {'sha256': cv['sha256'], 'skills': cv['skills'], **result}
@@ -0,0 +1,290 @@
+"""
+Bulk ingestion of job boards that publish RSS or JSON feeds.
+
+Instead of scraping a board once per query and user, each feed in FEEDS is
+downloaded at most once per INTERVAL with a conditional GET (ETag /
+Last-Modified, so an unchanged feed costs a 304). It is parsed as it streams
+in: RSS with ElementTree.iterparse, JSON with ijson when installed. Every item
+is normalized into the job schema the scrapers produce. Queries are then
+answered by filtering the ingested postings in memory (see search()).
+
+A feed older than INTERVAL is served as is while a background thread refreshes
+it; only the very first download of a feed is waited for.
+"""
+import html
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from xml.etree import ElementTree
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+INTERVAL = float(os.getenv("JOBSTREAM_FEED_INTERVAL", str(30 * 60)))   # seconds between downloads of a feed
+FIRST_LOAD_WAIT = 8               # seconds a search waits for a feed's first download
+RESULTS_PER_FEED = 15
+
+# Words that say little about which postings a query wants ("Python Developer" -> python)
+GENERIC_WORDS = {'developer', 'developers', 'engineer', 'engineers', 'software', 'job', 'jobs', 'remote',
+                 'senior', 'junior', 'lead', 'staff', 'principal', 'the', 'and', 'of', 'in', 'for'}
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+_TAG = re.compile(r"<[^>]+>")
+
+
+class Feed:
+    """A board's bulk feed: URL, format ("rss" or "json") and the platform label of its jobs"""
+
+    def __init__(self, name: str, url: str, format: str, platform: str):
+        self.name = name
+        self.url = url
+        self.format = format
+        self.platform = platform
+
+
+FEEDS = [
+    Feed("We Work Remotely (programming)", "https://weworkremotely.com/categories/remote-programming-jobs.rss",
+         "rss", '💻 We Work Remotely'),
+    Feed("We Work Remotely (devops)", "https://weworkremotely.com/categories/remote-devops-sysadmin-jobs.rss",
+         "rss", '💻 We Work Remotely'),
+    Feed("RemoteOK", "https://remoteok.com/api", "json", '🏠 RemoteOK'),
+]
+
+
+def _words(text: str) -> frozenset:
+    return frozenset(_WORD.findall(text.lower()))
+
+
+def _plain_text(markup: str, limit: int = 500) -> str:
+    text = html.unescape(_TAG.sub(" ", markup or ""))
+    return " ".join(text.split())[:limit]
+
+
+def _posted(when: datetime) -> str:
+    if when is None:
+        return "Recently posted"
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)   # "-0000" dates parse as naive UTC
+    days = (datetime.now(timezone.utc) - when).days
+    return "Today" if days <= 0 else "Yesterday" if days == 1 else f"{days} days ago"
+
+
+def _salary(low, high) -> str:
+    try:
+        low, high = int(low or 0), int(high or 0)
+    except (TypeError, ValueError):
+        return "Not specified"
+    if not low and not high:
+        return "Not specified"
+    return f"${low // 1000}K - ${high // 1000}K" if low and high else f"${(low or high) // 1000}K"
+
+
+def normalize_rss_item(item, feed: Feed) -> dict:
+    """Job dict for a We Work Remotely style RSS <item> ("Company: Position" titles)"""
+    title = item.findtext("title") or ""
+    company, _, position = title.partition(": ")
+    if not position:
+        company, position = "Not specified", title
+    try:
+        published = parsedate_to_datetime(item.findtext("pubDate") or "")
+    except (TypeError, ValueError):
+        published = None
+    categories = [c.text for c in item.findall("category") if c.text]
+    return {
+        'title': position.strip() or "Job Title",
+        'url': (item.findtext("link") or item.findtext("guid") or "").strip(),
+        'company': company.strip(),
+        'location': (item.findtext("region") or "Remote").strip(),
+        'salary': "Not specified",
+        'description': _plain_text(item.findtext("description")),
+        'platform': feed.platform,
+        'job_type': (item.findtext("type") or "Remote").strip(),
+        'posted_date': _posted(published),
+        'requirements': categories[:6],
+        'perks': ['100% Remote'],
+    }
+
+
+def normalize_json_item(item: dict, feed: Feed) -> dict:
+    """Job dict for a RemoteOK style JSON item (None for items that are not postings)"""
+    if not isinstance(item, dict) or not item.get('position'):
+        return None
+    try:
+        published = datetime.fromtimestamp(int(item['epoch']), timezone.utc) if item.get('epoch') else None
+    except (TypeError, ValueError):
+        published = None
+    return {
+        'title': str(item['position']).strip(),
+        'url': item.get('url') or item.get('apply_url') or "",
+        'company': str(item.get('company') or "Not specified").strip(),
+        'location': str(item.get('location') or "Remote").strip(),
+        'salary': _salary(item.get('salary_min'), item.get('salary_max')),
+        'description': _plain_text(item.get('description')),
+        'platform': feed.platform,
+        'job_type': "Remote",
+        'posted_date': _posted(published),
+        'requirements': [str(tag) for tag in (item.get('tags') or [])][:6],
+        'perks': ['100% Remote'],
+    }
+
+
+def parse_feed(stream, feed: Feed) -> list:
+    """Normalized jobs from a feed body (a binary file-like object), parsed as it is read"""
+    jobs = []
+    if feed.format == "rss":
+        for _, element in ElementTree.iterparse(stream, events=("end",)):
+            if element.tag == "item":
+                jobs.append(normalize_rss_item(element, feed))
+                element.clear()   # keep memory flat on large feeds
+    else:
+        try:
+            import ijson  # optional: incremental JSON parsing
+            items = ijson.items(stream, "item")
+        except ImportError:
+            items = json.load(stream)
+        for item in items:
+            job = normalize_json_item(item, feed)
+            if job is not None:
+                jobs.append(job)
+    return [job for job in jobs if job['url']]
+
+
+class _FeedState:
+    def __init__(self):
+        self.jobs = []
+        self.index = []           # (title + requirement words, all words) per job
+        self.loaded_at = 0.0
+        self.etag = None
+        self.last_modified = None
+        self.loading = None       # threading.Event while a download runs
+
+
+class FeedIngestor:
+    """Downloads feeds on an interval and answers queries from the ingested postings"""
+
+    def __init__(self, feeds: list = None, interval: float = INTERVAL):
+        self.feeds = FEEDS if feeds is None else feeds
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._states = {}
+        self._refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="feed-refresh")
+
+    def _state(self, feed: Feed) -> _FeedState:
+        with self._lock:
+            return self._states.setdefault(feed.url, _FeedState())
+
+    def refresh(self, feed: Feed) -> bool:
+        """
+        Download feed if it changed since the last download (conditional GET).
+        Returns: True when new postings were ingested, False when the feed was unchanged.
+        """
+        import http_client
+
+        state = self._state(feed)
+        headers = {}
+        with self._lock:
+            if state.etag:
+                headers['If-None-Match'] = state.etag
+            if state.last_modified:
+                headers['If-Modified-Since'] = state.last_modified
+        started = time.perf_counter()
+        try:
+            # Feeds are published for syndication, so robots.txt (meant for crawlers) is not consulted
+            response = http_client.get(feed.url, timeout=15, headers=headers, stream=True, check_robots=False)
+            try:
+                if response.status_code == 304:
+                    with self._lock:
+                        state.loaded_at = time.time()
+                    metrics.inc("jobstream_feed_downloads_total", feed=feed.name, outcome="not_modified")
+                    return False
+                response.raise_for_status()
+                response.raw.decode_content = True
+                jobs = parse_feed(response.raw, feed)
+            finally:
+                response.close()
+        except Exception:
+            metrics.inc("jobstream_feed_downloads_total", feed=feed.name, outcome="error")
+            raise
+        index = [(_words(f"{job['title']} {' '.join(job['requirements'])}"),
+                  _words(f"{job['title']} {' '.join(job['requirements'])} {job['description']}")) for job in jobs]
+        with self._lock:
+            state.jobs, state.index = jobs, index
+            state.etag = response.headers.get('ETag')
+            state.last_modified = response.headers.get('Last-Modified')
+            state.loaded_at = time.time()
+        metrics.inc("jobstream_feed_downloads_total", feed=feed.name, outcome="downloaded")
+        metrics.observe("feed_ingest", time.perf_counter() - started, feed=feed.name)
+        logger.info(f"Ingested {len(jobs)} postings from {feed.name}")
+        return True
+
+    def _load(self, feed: Feed, state: _FeedState):
+        try:
+            self.refresh(feed)
+        except Exception as e:
+            logger.warning(f"Feed {feed.name} download failed: {e}")
+            with self._lock:
+                state.loaded_at = max(state.loaded_at, time.time() - self.interval + 60)   # retry in a minute
+        finally:
+            with self._lock:
+                loading, state.loading = state.loading, None
+            loading.set()
+
+    def ensure_fresh(self, feed: Feed) -> threading.Event:
+        """
+        Start a background refresh if feed is due.
+        Returns: an event set when the feed's first download finishes, or None if it was loaded before.
+        """
+        state = self._state(feed)
+        with self._lock:
+            if time.time() - state.loaded_at >= self.interval and state.loading is None:
+                state.loading = threading.Event()
+                self._refresher.submit(self._load, feed, state)
+            return state.loading if state.loaded_at == 0.0 else None
+
+    def search(self, query: str, limit: int = RESULTS_PER_FEED) -> list:
+        """
+        Ingested postings matching query, per feed: postings with every key word of the query in
+        their title or tags first, then those mentioning them in the description, each in feed order.
+        """
+        words = _words(query)
+        key_words = words - GENERIC_WORDS or words
+        # Feeds download in parallel; only first downloads are waited for, up to FIRST_LOAD_WAIT in total
+        first_loads = [event for event in map(self.ensure_fresh, self.feeds) if event is not None]
+        deadline = time.monotonic() + FIRST_LOAD_WAIT
+        for event in first_loads:
+            event.wait(max(0.0, deadline - time.monotonic()))
+        jobs = []
+        for feed in self.feeds:
+            state = self._state(feed)
+            with self._lock:
+                postings, index = state.jobs, state.index
+            strong, weak = [], []
+            for job, (title_words, all_words) in zip(postings, index):
+                if key_words <= title_words:
+                    strong.append(job)
+                elif key_words <= all_words:
+                    weak.append(job)
+            jobs.extend((strong + weak)[:limit])
+        return [dict(job) for job in jobs]
+
+    def stats(self) -> dict:
+        """{feed name: {'jobs', 'age_s'}}"""
+        now = time.time()
+        with self._lock:
+            states = {feed.name: self._states.get(feed.url) for feed in self.feeds}
+        return {name: {'jobs': len(state.jobs) if state else 0,
+                       'age_s': round(now - state.loaded_at) if state and state.loaded_at else None}
+                for name, state in states.items()}
+
+
+metrics.describe("jobstream_feed_downloads_total", "Bulk job feed downloads by outcome")
+
+# Shared by every session in this process
+feed_ingestor = FeedIngestor()
@@ -0,0 +1,384 @@
+"""
+Firecrawl batch-scrape backend for the "Firecrawl" job source.
+
+For each query the source scrapes the search page of every board in
+BOARD_SEARCH_URLS. URLs requested within BATCH_WINDOW of each other (the
+concurrent fetches of one search's queries) go to Firecrawl as a single v1
+batch-scrape job (POST /v1/batch/scrape). A background thread polls the job
+(GET /v1/batch/scrape/{id}) and hands pages to the waiting fetches as they
+complete, so each query returns as soon as its own pages are in.
+
+Per API key, at most MAX_CONCURRENT_JOBS batch jobs run at once and at most
+CREDITS_PER_HOUR credits (one per page) are spent in any hour; URLs over the
+budget are not scraped. Pages are cached by URL for PAGE_TTL (in the result
+cache DB too when JOBSTREAM_CACHE_DB is set), so repeat searches spend no
+credits.
+
+The API key is FIRECRAWL_API_KEY, or the key a search passes to
+search_job_platforms (set for that search only, see use_api_key()).
+The base URL is JOBSTREAM_FIRECRAWL_URL; point it at
+benchmarks/standin_firecrawl.py to test offline.
+"""
+import contextlib
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from urllib.parse import quote, urljoin, urlsplit
+
+import metrics
+import politeness
+import shared_cache
+from result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+FIRECRAWL_URL = os.getenv("JOBSTREAM_FIRECRAWL_URL", "https://api.firecrawl.dev").rstrip("/")
+MAX_CONCURRENT_JOBS = int(os.getenv("JOBSTREAM_FIRECRAWL_JOBS", "2"))              # per API key
+CREDITS_PER_HOUR = int(os.getenv("JOBSTREAM_FIRECRAWL_CREDITS_PER_HOUR", "200"))   # per API key
+PAGE_CONCURRENCY = 10             # pages Firecrawl scrapes in parallel within one job
+BATCH_WINDOW = 0.05               # seconds to collect URLs into one batch job
+JOB_TIMEOUT = 60                  # seconds before a batch job is abandoned
+POLL_INTERVAL = 0.25              # first poll delay, grows to MAX_POLL_INTERVAL
+MAX_POLL_INTERVAL = 2.0
+PAGE_TTL = 6 * 3600
+JOBS_PER_PAGE = 10
+
+# Board search pages scraped per query ({q}: URL-encoded query, {slug}: "python-developer")
+BOARD_SEARCH_URLS = {
+    '💼 LinkedIn': "https://www.linkedin.com/jobs/search/?keywords={q}",
+    '🔍 Indeed': "https://www.indeed.com/jobs?q={q}",
+    '💎 Glassdoor': "https://www.glassdoor.com/Job/jobs.htm?sc.keyword={q}",
+    '⭐ AngelList': "https://wellfound.com/jobs?keywords={q}",
+    '🏠 RemoteOK': "https://remoteok.com/remote-{slug}-jobs",
+}
+
+# Links on a board's search page that point at a single posting, matched against host + path
+# from the start, so only the board's own (sub)domains qualify
+_SUBDOMAINS = r"(?:[a-z0-9-]+\.)*"
+JOB_LINK_PATTERNS = {
+    '💼 LinkedIn': re.compile(_SUBDOMAINS + r"linkedin\.com/jobs/view/"),
+    '🔍 Indeed': re.compile(_SUBDOMAINS + r"indeed\.com/(viewjob|rc/clk|pagead/clk)"),
+    '💎 Glassdoor': re.compile(_SUBDOMAINS + r"glassdoor\.(com|co\.uk|ca|com\.au|co\.in|de|fr|ie|nl|be|ch|at|sg)"
+                               r"/(job-listing|partner/jobListing)"),
+    '⭐ AngelList': re.compile(_SUBDOMAINS + r"wellfound\.com/jobs/\d+"),
+    '🏠 RemoteOK': re.compile(_SUBDOMAINS + r"remoteok\.com/remote-jobs/"),
+}
+
+_MARKDOWN_LINK = re.compile(r"\[([^\]\n]{3,200})\]\(([^)\s]+)[^)]*\)")
+_MARKDOWN_MARKUP = re.compile(r"[*_#>`|]+|!?\[[^\]]*\]\([^)]*\)")
+
+# Key of the current search (use_api_key()); inherited by the fetch workers' copied contexts
+_api_key = contextvars.ContextVar("firecrawl_api_key", default="")
+# Scraped pages by URL; shares the result cache's SQLite file and the cross-replica cache when configured
+page_cache = ResultCache(max_bytes=16 * 1024 * 1024, stale_grace=0, db_path=os.getenv("JOBSTREAM_CACHE_DB") or None,
+                         shared=shared_cache.pages)
+
+
+@contextlib.contextmanager
+def use_api_key(key: str):
+    """Use key instead of FIRECRAWL_API_KEY for the fetches started inside the block (other searches keep theirs)"""
+    token = _api_key.set((key or "").strip())
+    try:
+        yield
+    finally:
+        _api_key.reset(token)
+
+
+def api_key() -> str:
+    return _api_key.get() or os.getenv("FIRECRAWL_API_KEY", "").strip()
+
+
+def configured() -> bool:
+    """Whether an API key is set (the Firecrawl source is skipped otherwise)"""
+    return bool(api_key())
+
+
+def search_urls(query: str) -> dict:
+    """{search page URL: platform} for every board"""
+    slug = quote(re.sub(r"\s+", "-", query.strip().lower()))
+    return {template.format(q=quote(query), slug=slug): platform for platform, template in BOARD_SEARCH_URLS.items()}
+
+
+def is_job_link(url: str, platform: str) -> bool:
+    """Whether url is an http(s) link to a posting on platform's own site"""
+    try:
+        parts = urlsplit(url)
+        host = parts.hostname or ""
+    except ValueError:
+        return False
+    pattern = JOB_LINK_PATTERNS.get(platform)
+    if parts.scheme not in ("http", "https") or not host:
+        return False
+    return pattern is None or bool(pattern.match(host + parts.path))
+
+
+def parse_jobs(markdown: str, page_url: str, platform: str, limit: int = JOBS_PER_PAGE) -> list:
+    """Job dicts for the posting links on a scraped search page (markdown)"""
+    lines = markdown.splitlines()
+    jobs = []
+    seen = set()
+    for i, line in enumerate(lines):
+        for match in _MARKDOWN_LINK.finditer(line):
+            url = urljoin(page_url, match.group(2))
+            if url in seen or not is_job_link(url, platform):
+                continue
+            seen.add(url)
+            # The posting's summary is the rest of its line or the next line with text
+            rest = _MARKDOWN_MARKUP.sub(" ", line[match.end():]).strip(" -–:")
+            if not rest:
+                following = (_MARKDOWN_MARKUP.sub(" ", l).strip() for l in lines[i + 1:i + 4])
+                rest = next((text for text in following if text), "")
+            jobs.append({
+                'title': _MARKDOWN_MARKUP.sub(" ", match.group(1)).strip() or "Job Title",
+                'url': url,
+                'company': "Not specified",
+                'location': "See posting",
+                'salary': "Not specified",
+                'description': " ".join(rest.split())[:300] or f"Job posting on {platform.split()[-1]}",
+                'platform': platform,
+                'job_type': "See posting",
+                'posted_date': "Recently posted",
+                'requirements': [],
+                'perks': [],
+            })
+            if len(jobs) >= limit:
+                return jobs
+    return jobs
+
+
+class CreditBudget:
+    """Credits spent by one API key over the last hour"""
+
+    def __init__(self, per_hour: int):
+        self.per_hour = per_hour
+        self._lock = threading.Lock()
+        self._spent = deque()    # (time, credits)
+
+    def _remaining(self, now: float) -> int:
+        # Caller holds self._lock
+        while self._spent and now - self._spent[0][0] > 3600:
+            self._spent.popleft()
+        return self.per_hour - sum(credits for _, credits in self._spent)
+
+    def remaining(self) -> int:
+        with self._lock:
+            return self._remaining(time.monotonic())
+
+    def reserve(self, wanted: int) -> int:
+        """Reserve up to wanted credits. Returns: credits granted"""
+        with self._lock:
+            now = time.monotonic()
+            granted = max(0, min(wanted, self._remaining(now)))
+            if granted:
+                self._spent.append((now, granted))
+        return granted
+
+    def settle(self, reserved: int, used: int):
+        """Replace a reservation by the credits the job actually used"""
+        if used != reserved:
+            with self._lock:
+                self._spent.append((time.monotonic(), used - reserved))
+
+
+class _Waiter:
+    """One fetch waiting for its pages"""
+
+    def __init__(self, urls):
+        self.remaining = set(urls)
+        self.pages = {}
+        self.error = None
+        self.done = threading.Event()
+
+    def resolve(self, url: str, page: dict = None):
+        if url in self.remaining:
+            self.remaining.discard(url)
+            if page is not None:
+                self.pages[url] = page
+            if not self.remaining:
+                self.done.set()
+
+    def fail(self, error: Exception):
+        self.error = self.error or error
+        self.remaining.clear()
+        self.done.set()
+
+
+class BatchScraper:
+    """Collects page requests into Firecrawl batch-scrape jobs, per API key"""
+
+    def __init__(self, base_url: str = None, window: float = BATCH_WINDOW):
+        self.base_url = (base_url or FIRECRAWL_URL).rstrip("/")
+        self.window = window
+        self._lock = threading.Lock()
+        self._pending = {}       # api key -> [_Waiter]
+        self._semaphores = {}    # api key -> BoundedSemaphore(MAX_CONCURRENT_JOBS)
+        self._budgets = {}       # api key -> CreditBudget
+
+    def budget(self, key: str) -> CreditBudget:
+        with self._lock:
+            return self._budgets.setdefault(key, CreditBudget(CREDITS_PER_HOUR))
+
+    def scrape(self, urls: list, key: str, timeout: float) -> dict:
+        """
+        Scrape urls, from the page cache where possible, waiting at most timeout seconds.
+        Returns: {url: page} for the pages available by then ({'markdown', 'status'}).
+        Raises the batch job's error when it failed and no page was scraped.
+        """
+        pages = {}
+        for url in urls:
+            cached, _ = page_cache.get("firecrawl", url)
+            if cached:
+                pages[url] = cached[0]
+        metrics.inc("jobstream_firecrawl_pages_total", len(pages), outcome="cached")
+        missing = [url for url in urls if url not in pages]
+        if not missing:
+            return pages
+
+        waiter = _Waiter(missing)
+        with self._lock:
+            queue = self._pending.setdefault(key, [])
+            queue.append(waiter)
+            if len(queue) == 1:
+                # First request of a new batch: submit after the collection window
+                timer = threading.Timer(self.window, self._run_batch, args=(key,))
+                timer.daemon = True
+                timer.start()
+        waiter.done.wait(timeout)
+        with self._lock:
+            pages.update(waiter.pages)
+        if waiter.error is not None and len(pages) == len(urls) - len(missing):
+            raise waiter.error
+        return pages
+
+    def _run_batch(self, key: str):
+        with self._lock:
+            waiters = self._pending.pop(key, [])
+            semaphore = self._semaphores.setdefault(key, threading.BoundedSemaphore(MAX_CONCURRENT_JOBS))
+        urls = list(dict.fromkeys(url for waiter in waiters for url in waiter.remaining))
+        if not urls:
+            return
+
+        budget = self.budget(key)
+        granted = budget.reserve(len(urls))
+        if granted < len(urls):
+            logger.warning(f"Firecrawl credit budget reached; skipping {len(urls) - granted} of {len(urls)} pages")
+            metrics.inc("jobstream_firecrawl_pages_total", len(urls) - granted, outcome="over_budget")
+            for url in urls[granted:]:
+                self._dispatch(waiters, url, None)
+            urls = urls[:granted]
+            if not urls:
+                return
+
+        started = time.monotonic()
+        credits_used = granted
+        try:
+            with semaphore:
+                credits_used = self._run_job(urls, key, waiters)
+        except Exception as e:
+            logger.warning(f"Firecrawl batch of {len(urls)} pages failed: {e}")
+            metrics.inc("jobstream_firecrawl_pages_total", len(urls), outcome="failed")
+            with self._lock:
+                for waiter in waiters:
+                    waiter.fail(e)
+        finally:
+            budget.settle(granted, credits_used)
+            metrics.inc("jobstream_firecrawl_credits_total", credits_used)
+            metrics.observe("firecrawl_batch", time.monotonic() - started, trace_to=None)
+            # Pages the job never returned are given up on
+            for url in urls:
+                self._dispatch(waiters, url, None)
+
+    def _run_job(self, urls: list, key: str, waiters: list) -> int:
+        """Submit one batch job and poll it until done. Returns: credits used"""
+        import http_client
+
+        headers = {'Authorization': f"Bearer {key}", 'Content-Type': 'application/json'}
+        response = http_client.request(
+            "POST", f"{self.base_url}/v1/batch/scrape", timeout=10, headers=headers,
+            json={'urls': urls, 'formats': ['markdown'], 'onlyMainContent': True, 'maxConcurrency': PAGE_CONCURRENCY},
+        )
+        response.raise_for_status()
+        submitted = response.json()
+        if not submitted.get('success', True) or not submitted.get('id'):
+            raise RuntimeError(f"batch scrape rejected: {submitted.get('error', submitted)}")
+        status_url = f"{self.base_url}/v1/batch/scrape/{submitted['id']}"
+        logger.info(f"Firecrawl batch {submitted['id']} submitted ({len(urls)} pages)")
+
+        by_url = {url.rstrip("/"): url for url in urls}
+        delivered = set()
+        delay = POLL_INTERVAL
+        deadline = time.monotonic() + JOB_TIMEOUT
+        while True:
+            time.sleep(delay)
+            delay = min(delay * 1.5, MAX_POLL_INTERVAL)
+            try:
+                status = http_client.get(status_url, timeout=10, headers=headers, check_robots=False)
+            except politeness.Throttled:
+                # The API asked us to slow down (429); poll again later, within the job timeout
+                if time.monotonic() <= deadline:
+                    continue
+                raise
+            status.raise_for_status()
+            body = status.json()
+            data = body.get('data') or []
+            # Every poll returns all pages completed so far; only the new ones are handed out
+            for page in data:
+                metadata = page.get('metadata') or {}
+                source_url = by_url.get(str(metadata.get('sourceURL') or metadata.get('url') or "").rstrip("/"))
+                if source_url is None or source_url in delivered:
+                    continue
+                delivered.add(source_url)
+                scraped = {'markdown': page.get('markdown') or "", 'status': metadata.get('statusCode', 200)}
+                if scraped['status'] < 400:
+                    page_cache.put("firecrawl", source_url, [scraped], PAGE_TTL)
+                    metrics.inc("jobstream_firecrawl_pages_total", outcome="scraped")
+                else:
+                    metrics.inc("jobstream_firecrawl_pages_total", outcome="failed")
+                self._dispatch(waiters, source_url, scraped if scraped['status'] < 400 else None)
+
+            if body.get('status') in ('completed', 'failed', 'cancelled'):
+                if body.get('status') != 'completed':
+                    raise RuntimeError(f"batch job {submitted['id']} {body.get('status')}")
+                return int(body.get('creditsUsed', len(urls)))
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"batch job {submitted['id']} still running after {JOB_TIMEOUT}s")
+
+    def _dispatch(self, waiters: list, url: str, page: dict):
+        with self._lock:
+            for waiter in waiters:
+                waiter.resolve(url, page)
+
+
+scraper = BatchScraper()
+
+
+def fetch_jobs(query: str, wait: float, key: str = None) -> list:
+    """
+    Jobs from every board's search page for query, scraped through Firecrawl with key (default: api_key()).
+    Returns what arrived within wait seconds; the remaining pages are still cached when they complete.
+    """
+    urls = search_urls(query)
+    pages = scraper.scrape(list(urls), key or api_key(), timeout=wait)
+    jobs = []
+    for url, platform in urls.items():
+        if url in pages:
+            jobs.extend(parse_jobs(pages[url]['markdown'], url, platform))
+    return jobs
+
+
+def stats() -> dict:
+    """Whether a key is configured, its credits left this hour and the page cache counters"""
+    key = api_key()
+    return {
+        'configured': bool(key),
+        'credits_remaining': scraper.budget(key).remaining() if key else 0,
+        'page_cache': page_cache.stats(),
+    }
+
+
+metrics.describe("jobstream_firecrawl_pages_total", "Firecrawl pages by outcome (cached, scraped, failed, over_budget)")
+metrics.describe("jobstream_firecrawl_credits_total", "Firecrawl credits spent")
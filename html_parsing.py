@@ -0,0 +1,174 @@
+"""
+Pluggable HTML parsing for the job board scrapers.
+
+Each scraper describes the fields it wants from a search results page once, as
+precompiled selectors, and a backend extracts them:
+
+- selectolax (if installed) and lxml parse the page in C and run the selectors
+  against the job cards only;
+- bs4 is the fallback and only builds the job card subtrees (SoupStrainer).
+
+Pages without a single job card marker (captchas, blocks, empty results) are
+rejected before any parsing. The backend is chosen with JOBSTREAM_HTML_PARSER
+(auto | selectolax | lxml | bs4); auto picks the fastest one available.
+"""
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Indeed search results: one card per div[data-job-id]
+# field -> (tag, class token); the text of the first matching descendant
+INDEED_CARD_ATTR = "data-job-id"
+INDEED_FIELDS = {
+    'title': ('h2', 'jobTitle'),
+    'company': ('span', 'companyName'),
+    'location': ('div', 'companyLocation'),
+    'salary': ('div', 'salary-snippet-container'),
+    'snippet': ('div', 'job-snippet'),
+}
+INDEED_LINK = ('a', 'jcs-JobTitle')
+
+
+def _card_record(job_id: str, href, texts: dict) -> dict:
+    return {'job_id': job_id or '', 'href': href or '', **texts}
+
+
+def _has_marker(html: bytes, attr: str) -> bool:
+    return attr.encode() in html if isinstance(html, bytes) else attr in html
+
+
+class LxmlBackend:
+    """lxml.html parse with precompiled XPath selectors"""
+
+    name = "lxml"
+
+    def __init__(self, card_attr: str, fields: dict, link: tuple):
+        from lxml import etree
+
+        def by_class(tag, cls):
+            return etree.XPath(f".//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')][1]")
+
+        self._cards = etree.XPath(f"//div[@{card_attr}]")
+        self._card_attr = card_attr
+        self._fields = {field: by_class(tag, cls) for field, (tag, cls) in fields.items()}
+        self._link = by_class(*link)
+        self._text = etree.XPath("descendant-or-self::text()")
+
+    def _get_text(self, elem) -> str:
+        # Same as BeautifulSoup's get_text(strip=True)
+        return "".join(s.strip() for s in self._text(elem))
+
+    def parse_cards(self, html, limit: int = None) -> list:
+        import lxml.html
+
+        root = lxml.html.fromstring(html)
+        records = []
+        for card in self._cards(root)[:limit]:
+            texts = {}
+            for field, xpath in self._fields.items():
+                found = xpath(card)
+                texts[field] = self._get_text(found[0]) if found else None
+            link = self._link(card)
+            records.append(_card_record(card.get(self._card_attr), link[0].get('href') if link else None, texts))
+        return records
+
+
+class SelectolaxBackend:
+    """selectolax (Lexbor) parse with CSS selectors"""
+
+    name = "selectolax"
+
+    def __init__(self, card_attr: str, fields: dict, link: tuple):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+        self._card_attr = card_attr
+        self._cards = f"div[{card_attr}]"
+        self._fields = {field: f"{tag}.{cls}" for field, (tag, cls) in fields.items()}
+        self._link = "{}.{}".format(*link)
+
+    def parse_cards(self, html, limit: int = None) -> list:
+        tree = self._parser(html)
+        records = []
+        for card in tree.css(self._cards)[:limit]:
+            texts = {}
+            for field, selector in self._fields.items():
+                found = card.css_first(selector)
+                texts[field] = found.text(deep=True, separator="", strip=True) if found else None
+            link = card.css_first(self._link)
+            records.append(_card_record(card.attributes.get(self._card_attr),
+                                        link.attributes.get('href') if link else None, texts))
+        return records
+
+
+class SoupBackend:
+    """BeautifulSoup restricted to the job card subtrees with a SoupStrainer"""
+
+    name = "bs4"
+
+    def __init__(self, card_attr: str, fields: dict, link: tuple):
+        from bs4 import SoupStrainer
+        self._card_attr = card_attr
+        self._strainer = SoupStrainer('div', attrs={card_attr: True})
+        self._fields = fields
+        self._link = link
+        try:
+            import lxml  # noqa: F401
+            self._builder = 'lxml'
+        except ImportError:
+            self._builder = 'html.parser'
+
+    def parse_cards(self, html, limit: int = None) -> list:
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(html, self._builder, parse_only=self._strainer)
+        records = []
+        for card in soup.find_all('div', attrs={self._card_attr: True}, limit=limit):
+            texts = {}
+            for field, (tag, cls) in self._fields.items():
+                found = card.find(tag, class_=cls)
+                texts[field] = found.get_text(strip=True) if found else None
+            link = card.find(self._link[0], class_=self._link[1])
+            records.append(_card_record(card.get(self._card_attr), link.get('href') if link else None, texts))
+        return records
+
+
+BACKENDS = {'selectolax': SelectolaxBackend, 'lxml': LxmlBackend, 'bs4': SoupBackend}
+HTML_PARSER = os.getenv("JOBSTREAM_HTML_PARSER", "auto").strip().lower()
+
+_backends = {}
+
+
+def get_backend(name: str = None, card_attr: str = INDEED_CARD_ATTR, fields: dict = None, link: tuple = INDEED_LINK):
+    """
+    Backend instance for a card layout (Indeed by default), created once per process.
+    name: selectolax | lxml | bs4 | auto (the fastest one installed).
+    """
+    name = (name or HTML_PARSER).lower()
+    fields = fields or INDEED_FIELDS
+    key = (name, card_attr, tuple(fields.items()), link)
+    backend = _backends.get(key)
+    if backend is None:
+        if name != "auto" and name not in BACKENDS:
+            raise ValueError(f"Unknown HTML parser backend: {name}")
+        for candidate in list(BACKENDS) if name == "auto" else [name]:
+            try:
+                backend = BACKENDS[candidate](card_attr, fields, link)
+                break
+            except ImportError:
+                logger.info(f"HTML parser backend {candidate} not installed")
+        if backend is None:
+            raise ImportError(f"No HTML parser backend available for {name}")
+        _backends[key] = backend
+    return backend
+
+
+def parse_indeed_cards(html, limit: int = None, backend: str = None) -> list:
+    """
+    Extract job cards from an Indeed search results page.
+    Returns: [{'job_id', 'href', 'title', 'company', 'location', 'salary', 'snippet'}]
+    (a field is None when the card does not have it)
+    """
+    if not html or not _has_marker(html, INDEED_CARD_ATTR):
+        return []
+    return get_backend(backend).parse_cards(html, limit)
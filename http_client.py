@@ -0,0 +1,228 @@
+"""
+Shared HTTP client for all job scrapers.
+
+Every scraper should fetch through `get()` / `request()` instead of calling
+`requests` directly. The client keeps one pooled keep-alive Session per host,
+decodes gzip/brotli responses, retries 5xx with exponential backoff, limits
+concurrent requests per host and records latency and connection-reuse
+statistics (see `get_stats()`). Requests also go through the per-host adaptive
+rate limit, fair request queue and robots.txt check of politeness.py; 429s are
+not retried but slow the host down.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+import metrics
+import politeness
+
+logger = logging.getLogger(__name__)
+
+# Set requests headers to avoid blocking.
+# ACCEPT_ENCODING includes "br" when a brotli decoder is installed.
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+}
+
+DEFAULT_TIMEOUT = 8           # seconds
+DEFAULT_HOST_LIMIT = 4        # concurrent requests per host
+POOL_SIZE = 10                # keep-alive connections kept per host
+RETRY_STATUSES = (500, 502, 503, 504)   # 429 is left to the adaptive rate limit
+LATENCY_WINDOW = 500          # latency samples kept per host for percentiles
+
+_lock = threading.Lock()
+_sessions = {}
+_host_limits = {}
+_semaphores = {}
+_stats = {}
+
+
+def _host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def _new_session() -> requests.Session:
+    """Create a pooled Session with retry/backoff on 5xx (429s are left to politeness.py)"""
+    retry = Retry(
+        total=2,
+        connect=2,
+        read=1,
+        status=2,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=False,  # a long Retry-After would stall the search
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session(url_or_host: str) -> requests.Session:
+    """Return the shared Session for a host (created on first use)"""
+    host = _host_of(url_or_host) if "://" in url_or_host else url_or_host.lower()
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _sessions[host] = _new_session()
+            _stats[host] = {
+                'requests': 0,
+                'errors': 0,
+                'status_counts': {},
+                'latencies': deque(maxlen=LATENCY_WINDOW),
+            }
+        return session
+
+
+def set_host_limit(host: str, limit: int):
+    """Set the maximum number of concurrent requests for a host"""
+    with _lock:
+        _host_limits[host.lower()] = limit
+        _semaphores.pop(host.lower(), None)
+
+
+def _semaphore_for(host: str) -> threading.BoundedSemaphore:
+    with _lock:
+        sem = _semaphores.get(host)
+        if sem is None:
+            sem = _semaphores[host] = threading.BoundedSemaphore(_host_limits.get(host, DEFAULT_HOST_LIMIT))
+        return sem
+
+
+def set_host_rate(host: str, rate: float, burst: int = None):
+    """Set the requests per second allowed for a host (None: unlimited); 429s still slow it down below that"""
+    politeness.limiter.configure(host, rate, burst)
+
+
+def _fetch_robots(url: str) -> tuple:
+    response = get_session(url).get(url, timeout=5)
+    return response.status_code, response.text if response.status_code < 400 else ""
+
+
+def request(method: str, url: str, timeout: float = DEFAULT_TIMEOUT, check_robots: bool = None,
+            **kwargs) -> requests.Response:
+    """
+    Send a request through the host's pooled Session, honouring the per-host concurrency and rate limits.
+    GET requests are checked against robots.txt unless check_robots is False (e.g. for APIs).
+    Raises politeness.Throttled or politeness.RobotsDisallowed without sending the request.
+    """
+    host = _host_of(url)
+    session = get_session(host)
+    if check_robots is None:
+        check_robots = method.upper() in ("GET", "HEAD") and politeness.RESPECT_ROBOTS
+    # robots.txt is read for the User-Agent this request is actually sent with
+    agent = (kwargs.get('headers') or {}).get('User-Agent') or session.headers.get('User-Agent', USER_AGENT)
+    if check_robots and not politeness.robots.allowed(url, _fetch_robots, agent):
+        raise politeness.RobotsDisallowed(f"robots.txt of {host} disallows {url}")
+    politeness.limiter.acquire(host)
+    with _lock:
+        stats = _stats.get(host)
+    started = time.perf_counter()
+    try:
+        with _semaphore_for(host):
+            response = session.request(method, url, timeout=timeout, **kwargs)
+    except Exception:
+        with _lock:
+            # Not recorded when close() reset the statistics while this request was in flight
+            if stats is not None and _stats.get(host) is stats:
+                stats['requests'] += 1
+                stats['errors'] += 1
+        raise
+    politeness.limiter.feedback(host, response.status_code, response.headers.get('Retry-After'))
+
+    elapsed = time.perf_counter() - started
+    with _lock:
+        if stats is not None and _stats.get(host) is stats:
+            stats['requests'] += 1
+            stats['latencies'].append(elapsed)
+            stats['status_counts'][response.status_code] = stats['status_counts'].get(response.status_code, 0) + 1
+            if response.status_code >= 400:
+                stats['errors'] += 1
+    if not kwargs.get('stream'):
+        # Bytes read off the wire (before gzip/brotli decoding) when urllib3 can tell
+        try:
+            downloaded = response.raw.tell()
+        except (AttributeError, OSError, ValueError):
+            downloaded = 0
+        metrics.inc("jobstream_http_bytes_total", downloaded or len(response.content), host=host)
+    return response
+
+
+def get(url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> requests.Response:
+    """GET a URL through the shared client"""
+    return request("GET", url, timeout=timeout, **kwargs)
+
+
+def _percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _connection_counts(session: requests.Session) -> tuple:
+    """Return (new connections opened, requests sent) from the urllib3 pools behind a Session"""
+    opened = sent = 0
+    # The same adapter is mounted for http:// and https://
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        for key in list(adapter.poolmanager.pools.keys()):
+            pool = adapter.poolmanager.pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+                sent += pool.num_requests
+    return opened, sent
+
+
+def get_stats() -> dict:
+    """
+    Per-host client statistics.
+    Returns: {host: {'requests', 'errors', 'status_counts', 'connections_opened',
+                     'connections_reused', 'reuse_ratio', 'latency_p50_ms', 'latency_p95_ms', 'rate_limit'}}
+    """
+    with _lock:
+        snapshot = {host: (dict(stats, latencies=list(stats['latencies'])), _sessions[host])
+                    for host, stats in _stats.items()}
+
+    limits = politeness.limiter.stats()
+    report = {}
+    for host, (stats, session) in snapshot.items():
+        opened, sent = _connection_counts(session)
+        reused = max(0, sent - opened)
+        report[host] = {
+            'requests': stats['requests'],
+            'errors': stats['errors'],
+            'status_counts': dict(stats['status_counts']),
+            'connections_opened': opened,
+            'connections_reused': reused,
+            'reuse_ratio': round(reused / sent, 3) if sent else 0.0,
+            'latency_p50_ms': round(_percentile(stats['latencies'], 50) * 1000, 1),
+            'latency_p95_ms': round(_percentile(stats['latencies'], 95) * 1000, 1),
+            'rate_limit': limits.get(host),
+        }
+    return report
+
+
+def close():
+    """Close all pooled sessions and reset statistics, adapted rate limits and cached robots.txt files"""
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+        _semaphores.clear()
+        _stats.clear()
+    politeness.limiter.reset()
+    politeness.robots.clear()
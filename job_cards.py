@@ -0,0 +1,80 @@
+"""
+Pre-rendered HTML for job result cards.
+
+Each card is rendered once to an HTML fragment and cached (process-wide) by the
+fields it displays, so a rerun only concatenates the fragments of the visible
+page and sends them as a single markdown element.
+"""
+from functools import lru_cache
+from html import escape
+from urllib.parse import urlsplit
+
+CARD_CACHE_SIZE = 4096
+LINK_SCHEMES = ("http", "https")
+
+
+def safe_url(url: str) -> str:
+    """url if it is an http(s) link, else "#" (card URLs come from scraped pages and third-party feeds)"""
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return "#"
+    return url if parts.scheme.lower() in LINK_SCHEMES and parts.netloc else "#"
+
+
+@lru_cache(maxsize=CARD_CACHE_SIZE)
+def _card_html(title, company, location, salary, job_type, posted_date, description, url, platform, cv_match) -> str:
+    match_html = f'<span class="match-pill">{cv_match}% Match</span>' if cv_match else ''
+    if description:
+        preview = description[:200] + ("..." if len(description) > 200 else "")
+        description_html = f'<div class="meta-muted small">{escape(preview)}</div>'
+    else:
+        description_html = ''
+    href = safe_url(url) if url else "#"
+    apply_html = (
+        f'<a class="apply-btn" href="{escape(href, quote=True)}" target="_blank" rel="noopener">'
+        f'Apply Now - {escape(platform)}</a>'
+    ) if href != "#" else ''
+
+    return (
+        '<div class="card job-card">'
+        '<div class="job-top">'
+        '<div class="job-left">'
+        f'<span class="job-title">🎯 {escape(title)}</span>'
+        f'<span class="company">🏢 {escape(company)} · 📍 {escape(location)}</span>'
+        '</div>'
+        f'<div class="job-meta">{match_html}<span class="skill-badge">{escape(platform)}</span></div>'
+        '</div>'
+        f'<div class="meta-muted">💰 {escape(salary)} · 💼 {escape(job_type)} · 📅 {escape(posted_date)}</div>'
+        f'{description_html}'
+        f'<div>{apply_html}</div>'
+        '</div>'
+    )
+
+
+def render_job_card(job: dict) -> str:
+    """HTML fragment for one job card (cached by the displayed fields)"""
+    return _card_html(
+        str(job.get('title', 'Job Opening')),
+        str(job.get('company', 'Not Specified')),
+        str(job.get('location', 'Remote')),
+        str(job.get('salary', 'Competitive')),
+        str(job.get('job_type', 'Full-time')),
+        str(job.get('posted_date', 'Recently')),
+        str(job.get('description', '') or ''),
+        str(job.get('url', '') or ''),
+        str(job.get('platform', 'Job Board')),
+        job.get('cv_match') or 0,
+    )
+
+
+def render_job_cards(jobs: list) -> str:
+    """HTML for a page of job cards"""
+    return "".join(render_job_card(job) for job in jobs)
+
+
+def cache_stats() -> dict:
+    """Hit/miss counters of the card fragment cache"""
+    info = _card_html.cache_info()
+    return {'entries': info.currsize, 'hits': info.hits, 'misses': info.misses}
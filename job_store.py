@@ -0,0 +1,382 @@
+"""
+Persistent local index of every job the sources have returned.
+
+Jobs are stored in SQLite, keyed by canonical URL (see dedup.py), with an FTS5
+full-text index over title, company, location, description and skills. Every
+successful source fetch upserts its jobs and records the (source, query) pair
+with the jobs it returned, in order; while that record is younger than the
+source's TTL the search answers the pair with exactly those jobs instead of
+scraping. Only pairs the index does not cover yet are fetched live. The
+full-text search (BM25 relevance over every job a source ever returned) only
+fills gaps: pairs whose source cannot be asked right now. Both can be narrowed
+in SQL to jobs requiring at least one of a set of skills (see has_skill() for
+the same filter over jobs fetched live).
+
+User-facing searches also record their queries, with a popularity score that
+decays over time; the background crawler (prewarm.py) reads it to keep the
+hottest queries fetched. Postings not seen again within MAX_AGE are expired. The index is opt-in:
+set JOBSTREAM_JOB_DB to a database path (e.g. jobstream_jobs.sqlite3), or to
+":memory:" to keep it for the process only.
+"""
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import metrics
+import skill_matcher
+from dedup import canonical_url
+from result_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+MAX_AGE = float(os.getenv("JOBSTREAM_JOB_MAX_AGE", str(7 * 24 * 3600)))   # seconds since a job was last seen
+EXPIRE_INTERVAL = 15 * 60         # seconds between expiry passes
+RESULT_LIMIT = 50                 # jobs returned per gap-filling search
+POPULARITY_HALF_LIFE = 24 * 3600  # seconds for a query's search count to lose half its weight
+# bm25() column weights: title, company, location, description, skills
+BM25_WEIGHTS = (10.0, 2.0, 1.0, 1.0, 5.0)
+
+_QUERY_TOKEN = re.compile(r"\w[\w+#.]*")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    title TEXT, company TEXT, location TEXT, description TEXT, skills TEXT,
+    payload TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs (last_seen);
+CREATE INDEX IF NOT EXISTS jobs_source ON jobs (source);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5 (
+    title, company, location, description, skills,
+    content='jobs', content_rowid='id', tokenize='porter unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts (rowid, title, company, location, description, skills)
+    VALUES (new.id, new.title, new.company, new.location, new.description, new.skills);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, description, skills)
+    VALUES ('delete', old.id, old.title, old.company, old.location, old.description, old.skills);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE ON jobs BEGIN
+    INSERT INTO jobs_fts (jobs_fts, rowid, title, company, location, description, skills)
+    VALUES ('delete', old.id, old.title, old.company, old.location, old.description, old.skills);
+    INSERT INTO jobs_fts (rowid, title, company, location, description, skills)
+    VALUES (new.id, new.title, new.company, new.location, new.description, new.skills);
+END;
+CREATE TABLE IF NOT EXISTS fetches (
+    source TEXT NOT NULL,
+    query TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    ttl REAL NOT NULL,
+    PRIMARY KEY (source, query)
+);
+-- The jobs of each recorded fetch as the source returned them (template cards share URLs, so the
+-- payload is kept per fetch rather than looked up in jobs); skills as ",python,sql," for filtering
+CREATE TABLE IF NOT EXISTS fetch_jobs (
+    source TEXT NOT NULL,
+    query TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    skills TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (source, query, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS query_popularity (
+    query TEXT PRIMARY KEY,
+    score REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def fts_query(query: str) -> str:
+    """
+    FTS5 MATCH expression for a free-text search query.
+    Every word is quoted (so operators and punctuation are literal) and the words are OR-ed;
+    BM25 ranks jobs matching more and rarer words first. Returns '' for a query without words.
+    """
+    words = dict.fromkeys(t.lower() for t in _QUERY_TOKEN.findall(query))
+    return " OR ".join('"' + w.replace('"', '""') + '"' for w in words)
+
+
+def _text(value) -> str:
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(v) for v in value)
+    return str(value or "")
+
+
+def job_skills(job: dict) -> list:
+    """Skills a job asks for (from its title, description and requirements), as indexed"""
+    return skill_matcher.extract_skills(
+        f"{job.get('title', '')} {_text(job.get('description'))} {_text(job.get('requirements'))}")
+
+
+def _skill_tags(skills) -> str:
+    # ",python,sql," so one skill is matched with instr(tags, ',python,')
+    return "," + ",".join(s.lower() for s in skills) + "," if skills else ""
+
+
+def has_skill(job: dict, skills: list) -> bool:
+    """Whether job requires at least one of skills; the filter the index applies in SQL"""
+    wanted = {s.lower() for s in skills}
+    return any(s.lower() in wanted for s in job_skills(job))
+
+
+def _skill_clause(column: str, skills: list) -> tuple:
+    """SQL condition (and its parameters) for rows whose skill tags in column include one of skills"""
+    tags = list(dict.fromkeys(f",{s.lower()}," for s in skills))
+    return "(" + " OR ".join(f"instr({column}, ?) > 0" for _ in tags) + ")", tags
+
+
+class JobStore:
+    """SQLite job index with full-text search; safe to share between threads"""
+
+    def __init__(self, db_path: str = None, max_age: float = MAX_AGE):
+        self.db_path = db_path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._last_expiry = 0.0
+        self.hits = self.gaps = 0
+        self._db = None
+        if not db_path:
+            return
+        try:
+            db = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+            if db_path != ":memory:":
+                # Readers never block the writer; batch worker processes share the file
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+            columns = [row[1] for row in db.execute("PRAGMA table_info(fetch_jobs)")]
+            if "skills" not in columns:
+                # Indexes written before fetch_jobs kept skills; their rows only match unfiltered lookups
+                db.execute("ALTER TABLE fetch_jobs ADD COLUMN skills TEXT NOT NULL DEFAULT ''")
+            db.commit()
+            self._db = db
+        except sqlite3.Error as e:
+            logger.warning(f"Job index unavailable ({db_path}): {e}")
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    def covers(self, source: str, query: str) -> bool:
+        """Whether source was fetched for query within its TTL, so fetched_jobs() can answer for it"""
+        if self._db is None:
+            return False
+        record = self.fetch_record(source, query)
+        covered = record is not None and time.time() - record[0] < record[1]
+        with self._lock:
+            if covered:
+                self.hits += 1
+            else:
+                self.gaps += 1
+        metrics.inc("jobstream_job_index_lookups_total", state="hit" if covered else "gap")
+        return covered
+
+    def upsert(self, source: str, query: str, jobs: list, ttl: float):
+        """
+        Insert or refresh jobs (keyed by canonical URL) and record the (source, query) fetch with its jobs.
+        Empty results are not recorded, so the pair is fetched live again next time.
+        """
+        if self._db is None or not jobs:
+            return
+        now = time.time()
+        key = normalize_query(query)
+        rows = []
+        fetched = []
+        for position, job in enumerate(jobs):
+            skills = job_skills(job)
+            fetched.append((source, key, position, json.dumps(job), _skill_tags(skills)))
+            url = canonical_url(job.get('url', ''))
+            if not url:
+                continue
+            description = _text(job.get('description'))
+            requirements = _text(job.get('requirements'))
+            rows.append((url, source, _text(job.get('title')), _text(job.get('company')),
+                         _text(job.get('location')), f"{description} {requirements}".strip(),
+                         _skill_tags(skills), json.dumps(job), now))
+        with metrics.timer("index_write"), self._lock:
+            try:
+                with self._db:
+                    for row in rows:
+                        self._db.execute(
+                            "INSERT INTO jobs (url, source, title, company, location, description, skills, "
+                            "payload, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                            "ON CONFLICT (url) DO UPDATE SET source = excluded.source, title = excluded.title, "
+                            "company = excluded.company, location = excluded.location, "
+                            "description = excluded.description, skills = excluded.skills, "
+                            "payload = excluded.payload, last_seen = excluded.last_seen",
+                            (*row, now),
+                        )
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO fetches (source, query, fetched_at, ttl) VALUES (?, ?, ?, ?)",
+                        (source, key, now, ttl),
+                    )
+                    self._db.execute("DELETE FROM fetch_jobs WHERE source = ? AND query = ?", (source, key))
+                    self._db.executemany(
+                        "INSERT INTO fetch_jobs (source, query, position, payload, skills) VALUES (?, ?, ?, ?, ?)",
+                        fetched,
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"Job index write failed: {e}")
+                return
+        if now - self._last_expiry > EXPIRE_INTERVAL:
+            self.expire()
+
+    def fetch_record(self, source: str, query: str) -> tuple:
+        """Returns: (fetched_at, ttl) of the last recorded fetch of query from source, or None"""
+        if self._db is None:
+            return None
+        with self._lock:
+            row = self._db.execute(
+                "SELECT fetched_at, ttl FROM fetches WHERE source = ? AND query = ?",
+                (source, normalize_query(query)),
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def record_queries(self, queries: list):
+        """Count one search for each query; earlier counts decay with POPULARITY_HALF_LIFE"""
+        if self._db is None or not queries:
+            return
+        now = time.time()
+        keys = list(dict.fromkeys(normalize_query(q) for q in queries))
+        with self._lock:
+            try:
+                with self._db:
+                    for key in keys:
+                        row = self._db.execute("SELECT score, updated_at FROM query_popularity WHERE query = ?",
+                                               (key,)).fetchone()
+                        score = 1.0 + (row[0] * 0.5 ** ((now - row[1]) / POPULARITY_HALF_LIFE) if row else 0.0)
+                        self._db.execute("INSERT OR REPLACE INTO query_popularity (query, score, updated_at) "
+                                         "VALUES (?, ?, ?)", (key, score, now))
+            except sqlite3.Error as e:
+                logger.warning(f"Job index write failed: {e}")
+
+    def popular_queries(self, limit: int = 20) -> list:
+        """Returns: [(normalized query, decayed score)] of the most searched queries, hottest first"""
+        if self._db is None:
+            return []
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute("SELECT query, score, updated_at FROM query_popularity").fetchall()
+        scored = [(query, score * 0.5 ** ((now - updated_at) / POPULARITY_HALF_LIFE))
+                  for query, score, updated_at in rows]
+        return sorted(scored, key=lambda qs: -qs[1])[:limit]
+
+    def fetched_jobs(self, source: str, query: str, skills: list = None) -> list:
+        """
+        Returns: the jobs of the last recorded fetch of query from source, in source order ([] if none),
+        narrowed to jobs requiring at least one of skills if given.
+        """
+        if self._db is None:
+            return []
+        sql = "SELECT payload FROM fetch_jobs WHERE source = ? AND query = ?"
+        params = [source, normalize_query(query)]
+        if skills:
+            clause, tags = _skill_clause("skills", skills)
+            sql += f" AND {clause}"
+            params.extend(tags)
+        sql += " ORDER BY position"
+        with metrics.timer("index_lookup"), self._lock:
+            try:
+                rows = self._db.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"Job index lookup failed for '{query}': {e}")
+                return []
+        return [json.loads(payload) for payload, in rows]
+
+    def search(self, query: str, sources: list = None, skills: list = None, limit: int = RESULT_LIMIT) -> list:
+        """
+        Indexed jobs matching any word of query, best BM25 match first (for filling gaps; a
+        fetched pair is answered by fetched_jobs()). sources limits the result to jobs last
+        returned by those sources, skills to jobs requiring at least one of them.
+        Returns job dicts as the sources produced them.
+        """
+        match = fts_query(query)
+        if self._db is None or not match:
+            return []
+        sql = ("SELECT jobs.payload FROM jobs_fts JOIN jobs ON jobs.id = jobs_fts.rowid "
+               "WHERE jobs_fts MATCH ?")
+        params = [match]
+        if sources:
+            sql += f" AND jobs.source IN ({', '.join('?' * len(sources))})"
+            params.extend(sources)
+        if skills:
+            clause, tags = _skill_clause("jobs.skills", skills)
+            sql += f" AND {clause}"
+            params.extend(tags)
+        sql += f" ORDER BY bm25(jobs_fts, {', '.join(str(w) for w in BM25_WEIGHTS)}) LIMIT ?"
+        params.append(limit)
+        with metrics.timer("index_lookup"), self._lock:
+            try:
+                rows = self._db.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"Job index search failed for '{query}': {e}")
+                return []
+        return [json.loads(payload) for payload, in rows]
+
+    def expire(self) -> int:
+        """Delete jobs not seen within max_age and outdated fetch records. Returns: jobs deleted"""
+        if self._db is None:
+            return 0
+        now = time.time()
+        with self._lock:
+            self._last_expiry = now
+            try:
+                with self._db:
+                    deleted = self._db.execute("DELETE FROM jobs WHERE last_seen < ?",
+                                               (now - self.max_age,)).rowcount
+                    self._db.execute("DELETE FROM fetches WHERE fetched_at + ttl < ?", (now,))
+                    self._db.execute("DELETE FROM fetch_jobs WHERE NOT EXISTS (SELECT 1 FROM fetches WHERE "
+                                     "fetches.source = fetch_jobs.source AND fetches.query = fetch_jobs.query)")
+                    # Queries not searched for ten half-lives weigh under 0.1% of a fresh search
+                    self._db.execute("DELETE FROM query_popularity WHERE updated_at < ?",
+                                     (now - 10 * POPULARITY_HALF_LIFE,))
+            except sqlite3.Error as e:
+                logger.warning(f"Job index expiry failed: {e}")
+                return 0
+        if deleted:
+            logger.info(f"Expired {deleted} jobs from the index")
+        return deleted
+
+    def stats(self) -> dict:
+        """Indexed jobs, covered (source, query) pairs and lookup outcomes"""
+        if self._db is None:
+            return {'enabled': False}
+        with self._lock:
+            jobs = self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            fetches = self._db.execute("SELECT COUNT(*) FROM fetches WHERE fetched_at + ttl >= ?",
+                                       (time.time(),)).fetchone()[0]
+            lookups = self.hits + self.gaps
+            return {
+                'enabled': True,
+                'jobs': jobs,
+                'covered_queries': fetches,
+                'hits': self.hits,
+                'gaps': self.gaps,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Drop every indexed job and fetch record"""
+        if self._db is None:
+            return
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM jobs")
+            self._db.execute("DELETE FROM fetches")
+            self._db.execute("DELETE FROM fetch_jobs")
+
+
+metrics.describe("jobstream_job_index_lookups_total", "Job index coverage lookups by outcome (hit or gap)")
+
+# Shared by every session in this process (and, through the file, by other processes)
+job_store = JobStore(os.getenv("JOBSTREAM_JOB_DB") or None)
@@ -0,0 +1,217 @@
+"""
+Lightweight pipeline instrumentation (stdlib only).
+
+Stages are timed with `timer()` / `@timed()` or reported with `observe()`;
+counts with `inc()`. Every measurement goes to three places (gauges, set with
+`gauge()`, only to the first):
+
+- process-wide counters, gauges and histograms, exported in the Prometheus text
+  format by `render_prometheus()` (served on the API's /metrics);
+- the current `Trace`, if one is active, which collects the stage breakdown
+  and counts of a single search (shown in the app's performance panel);
+- a structured (JSON) debug log line on the "jobstream.metrics" logger.
+
+Traces follow the context of the code that opened them; work submitted to a
+thread pool must be run with `contextvars.copy_context().run` to report to it.
+"""
+import contextvars
+import functools
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("jobstream.metrics")
+
+STAGE_SECONDS = "jobstream_stage_seconds"
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_lock = threading.Lock()
+_counters = {}     # (name, labels) -> value
+_gauges = {}       # (name, labels) -> value
+_histograms = {}   # (name, labels) -> [bucket counts..., count, sum]
+_help = {}
+
+_current_trace = contextvars.ContextVar("jobstream_trace", default=None)
+
+
+def _labels_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Trace:
+    """Stage timings and counts of one operation (e.g. a search)"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.time()
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+        self.stages = {}   # stage -> {'seconds', 'calls'}
+        self.spans = []    # (stage, seconds, labels) in completion order
+        self.counts = {}
+
+    def add(self, stage: str, seconds: float, labels: dict = None):
+        # Labelled stages are broken down per label value, e.g. "source_fetch (Indeed)"
+        key = f"{stage} ({', '.join(str(v) for v in labels.values())})" if labels else stage
+        with self._lock:
+            entry = self.stages.setdefault(key, {'seconds': 0.0, 'calls': 0})
+            entry['seconds'] += seconds
+            entry['calls'] += 1
+            self.spans.append((stage, seconds, labels or {}))
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + value
+
+    def summary(self) -> dict:
+        """{'name', 'seconds', 'stages': {stage: {'seconds', 'calls'}}, 'counts'}"""
+        with self._lock:
+            return {
+                'name': self.name,
+                'seconds': round(self.seconds, 4),
+                'stages': {stage: {'seconds': round(e['seconds'], 4), 'calls': e['calls']}
+                           for stage, e in sorted(self.stages.items(), key=lambda kv: -kv[1]['seconds'])},
+                'counts': dict(self.counts),
+            }
+
+
+def current_trace() -> Trace:
+    return _current_trace.get()
+
+
+@contextmanager
+def trace(name: str):
+    """Collect every stage timed inside the block into a new Trace"""
+    t = Trace(name)
+    token = _current_trace.set(t)
+    started = time.perf_counter()
+    try:
+        yield t
+    finally:
+        t.seconds = time.perf_counter() - started
+        _current_trace.reset(token)
+        observe(name, t.seconds, trace_to=None)
+        logger.debug(json.dumps({'event': 'trace', **t.summary()}))
+
+
+def observe(stage: str, seconds: float, trace_to: Trace = "current", **labels):
+    """Record a stage duration (seconds) in the stage histogram, the current trace and the log"""
+    key = (STAGE_SECONDS, _labels_key({'stage': stage, **labels}))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram[i] += 1
+        histogram[-2] += 1
+        histogram[-1] += seconds
+    target = current_trace() if trace_to == "current" else trace_to
+    if target is not None:
+        target.add(stage, seconds, labels)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(json.dumps({'event': 'stage', 'stage': stage, 'seconds': round(seconds, 6), **labels}))
+
+
+def inc(name: str, value: float = 1, **labels):
+    """Increase a counter (and the current trace's count of the same name)"""
+    key = (name, _labels_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+    t = current_trace()
+    if t is not None:
+        t.count(name if not labels else f"{name}{{{','.join(f'{k}={v}' for k, v in key[1])}}}", value)
+
+
+def gauge(name: str, value: float, **labels):
+    """Set a gauge to its current value (exported only, not added to traces)"""
+    with _lock:
+        _gauges[(name, _labels_key(labels))] = value
+
+
+@contextmanager
+def timer(stage: str, trace_to: Trace = "current", **labels):
+    """Time the block as one call of stage"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started, trace_to=trace_to, **labels)
+
+
+def timed(stage: str):
+    """Decorator timing every call of a function as stage"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def describe(name: str, help_text: str):
+    """HELP text for a metric in the Prometheus output"""
+    _help[name] = help_text
+
+
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def render_prometheus() -> str:
+    """All counters, gauges and histograms in the Prometheus text exposition format"""
+    with _lock:
+        counters = dict(_counters)
+        gauges = dict(_gauges)
+        histograms = {key: list(values) for key, values in _histograms.items()}
+
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# HELP {name} {_help.get(name, name)}")
+        lines.append(f"# TYPE {name} counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+    for name in sorted({name for name, _ in gauges}):
+        lines.append(f"# HELP {name} {_help.get(name, name)}")
+        lines.append(f"# TYPE {name} gauge")
+        for (metric, labels), value in sorted(gauges.items()):
+            if metric == name:
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f"# HELP {name} {_help.get(name, name)}")
+        lines.append(f"# TYPE {name} histogram")
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(BUCKETS, values):
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {values[-2]}")
+            lines.append(f"{name}_count{_format_labels(labels)} {values[-2]}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {values[-1]:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Drop all recorded metrics"""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
+
+
+describe(STAGE_SECONDS, "Time spent per pipeline stage in seconds")
+describe("jobstream_jobs_total", "Jobs passing through each pipeline step")
+describe("jobstream_result_cache_lookups_total", "Job result cache lookups by outcome")
+describe("jobstream_cv_cache_lookups_total", "CV extraction cache lookups by outcome")
+describe("jobstream_http_bytes_total", "Response bytes downloaded per host")
+describe("jobstream_source_fetches_total", "Job source fetches by outcome")
+describe("jobstream_cv_pages_total", "PDF pages extracted from uploaded CVs")
@@ -0,0 +1,327 @@
+"""
+Politeness for outbound scraping: per-host adaptive rate limits, a fair request
+queue and robots.txt.
+
+Every request http_client sends first takes a token from its host's bucket
+(HOST_RATE requests per second, bursts of HOST_BURST). The rate adapts like
+TCP congestion control: a 429 (or a 503 with Retry-After) halves it and pauses
+the host for the Retry-After period, and every successful response raises it
+again by a hundredth of the ceiling. The ceiling is HOST_RATE (or the rate set
+with HostLimiter.configure()), or the robots.txt Crawl-delay when that is
+slower; both survive reset() and configure().
+
+Requests waiting for a host's tokens are served by priority (interactive
+searches before background work such as the prewarm crawler), then fairly
+across clients (Streamlit sessions, API callers): each client's requests are
+spaced out in virtual time, so a session firing many queries cannot starve the
+others. A request that could not get a token before its deadline (the search's
+deadline, at most MAX_QUEUE_WAIT) fails at once with Throttled instead of
+hitting a host that is already refusing us.
+
+robots.txt is fetched once per origin per ROBOTS_TTL and read for the
+User-Agent the requests are sent with; disallowed URLs raise RobotsDisallowed
+(set JOBSTREAM_RESPECT_ROBOTS=0 to skip the check).
+"""
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import metrics
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+HOST_RATE = float(os.getenv("JOBSTREAM_HOST_RATE", "2"))   # requests per second per host; 0 disables the limit
+HOST_BURST = 5
+MIN_RATE = 0.05                  # requests per second a host is never slowed below (unless its ceiling is lower)
+DECREASE = 0.5                   # rate multiplier on 429
+INCREASE = 0.01                  # share of the ceiling added back per successful response
+MAX_PAUSE = 5 * 60               # seconds a Retry-After may pause a host
+MAX_QUEUE_WAIT = 3.0             # seconds a request may wait for a token
+RESPECT_ROBOTS = os.getenv("JOBSTREAM_RESPECT_ROBOTS", "1") != "0"
+ROBOTS_TTL = 24 * 3600
+ROBOTS_ERROR_TTL = 10 * 60       # unreachable robots.txt: allow everything, ask again after this
+
+INTERACTIVE, BACKGROUND = 1, 0   # request priorities; higher is served first
+
+
+class Throttled(Exception):
+    """A request gave up waiting for its host's rate limit (no request was sent)"""
+
+
+class RobotsDisallowed(Exception):
+    """robots.txt of the host disallows the URL"""
+
+
+# Who is asking and how urgently; set with scope(), inherited by copied contexts (fetch workers)
+_scope = contextvars.ContextVar("politeness_scope", default={'client': "default", 'priority': INTERACTIVE,
+                                                              'deadline': None})
+
+
+@contextlib.contextmanager
+def scope(client: str = None, priority: int = None, deadline: float = None):
+    """Requests sent inside the block belong to client, with priority and a time.monotonic() deadline"""
+    current = _scope.get()
+    token = _scope.set({
+        'client': current['client'] if client is None else client,
+        'priority': current['priority'] if priority is None else priority,
+        'deadline': current['deadline'] if deadline is None else deadline,
+    })
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def retry_after_seconds(value: str) -> float:
+    """Seconds from a Retry-After header (delta seconds or an HTTP date), None if absent or invalid"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _HostState:
+    def __init__(self, lock: threading.Lock, rate: float, burst: int):
+        self.ceiling = self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.ready = threading.Condition(lock)
+        self.queue = []             # heap of [-priority, virtual finish, seq, client]
+        self.virtual_time = 0.0
+        self.finish = {}            # client -> virtual finish time of its last request
+        self.granted = self.throttled = self.backoffs = 0
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (refills the bucket)"""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.paused_until > now:
+            return self.paused_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class HostLimiter:
+    """Adaptive token bucket and fair priority queue per host"""
+
+    def __init__(self, rate: float = HOST_RATE, burst: int = HOST_BURST, max_wait: float = MAX_QUEUE_WAIT):
+        self.rate = rate
+        self.burst = burst
+        self.max_wait = max_wait
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._limits = {}           # host -> (rate or None, burst) set with configure()
+        self._caps = {}             # host -> requests per second allowed by robots.txt (slow_to())
+        self._seq = itertools.count()
+
+    def configure(self, host: str, rate: float = None, burst: int = None):
+        """Set a host's ceiling in requests per second (None or 0: unlimited) and burst (robots.txt caps still apply)"""
+        host = host.lower()
+        with self._lock:
+            self._limits[host] = (rate or None, burst or self.burst)
+            state = self._hosts.pop(host, None)
+            if state is not None:
+                state.ready.notify_all()
+
+    def _ceiling(self, host: str) -> tuple:
+        """(ceiling, burst) of host from its configured rate and robots.txt cap; (None, None) if unlimited"""
+        rate, burst = self._limits.get(host, (self.rate or None, self.burst))
+        if rate is None:
+            return None, None
+        cap = self._caps.get(host)
+        return (cap, 1) if cap is not None and cap < rate else (rate, burst)
+
+    def _state(self, host: str) -> _HostState:
+        """The host's state, None when it is not limited (lock held)"""
+        state = self._hosts.get(host)
+        if state is None:
+            rate, burst = self._ceiling(host)
+            if rate is None:
+                return None
+            state = self._hosts[host] = _HostState(self._lock, rate, burst)
+        return state
+
+    def acquire(self, host: str) -> float:
+        """
+        Wait for a token of host, in priority and fair-share order (see scope()).
+        Returns: seconds waited. Raises Throttled when no token is available before the deadline.
+        """
+        settings = _scope.get()
+        started = time.monotonic()
+        deadline = started + self.max_wait
+        if settings['deadline'] is not None:
+            deadline = min(deadline, settings['deadline'])
+        with self._lock:
+            state = self._state(host)
+            if state is None:
+                return 0.0
+            client = settings['client']
+            finish = max(state.virtual_time, state.finish.get(client, 0.0)) + 1
+            state.finish[client] = finish
+            entry = [-settings['priority'], finish, next(self._seq), client]
+            heapq.heappush(state.queue, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = state.wait_time(now) if state.queue[0] is entry else None
+                    if wait is not None and wait <= 0:
+                        heapq.heappop(state.queue)
+                        state.tokens -= 1
+                        state.granted += 1
+                        state.virtual_time = finish
+                        if not state.queue:
+                            state.finish.clear()   # nobody waiting: fair shares start over
+                        state.ready.notify_all()
+                        waited = now - started
+                        break
+                    remaining = deadline - now
+                    if remaining <= 0 or (wait is not None and wait > remaining):
+                        state.throttled += 1
+                        raise Throttled(f"{host} rate limited ({state.rate:.2f}/s); "
+                                        f"next request possible in {wait if wait is not None else remaining:.1f}s")
+                    state.ready.wait(remaining if wait is None else wait)
+            except BaseException:
+                if entry in state.queue:
+                    state.queue.remove(entry)
+                    heapq.heapify(state.queue)
+                    state.ready.notify_all()
+                raise
+        metrics.observe("rate_limit_wait", waited, host=host)
+        return waited
+
+    def feedback(self, host: str, status: int, retry_after: str = None):
+        """Adapt host's rate to a response status (429, or 503 with Retry-After, slows it down)"""
+        with self._lock:
+            state = self._state(host)
+            if state is None:
+                return
+            pause = retry_after_seconds(retry_after)
+            if status == 429 or (status == 503 and pause is not None):
+                # MIN_RATE yields to a lower ceiling (a robots.txt Crawl-delay over 1 / MIN_RATE seconds)
+                state.rate = min(state.ceiling, max(MIN_RATE, state.rate * DECREASE))
+                pause = min(MAX_PAUSE, pause if pause is not None else 1 / state.rate)
+                state.paused_until = max(state.paused_until, time.monotonic() + pause)
+                state.tokens = 0.0
+                state.backoffs += 1
+                state.ready.notify_all()
+                rate = state.rate
+            elif status < 400:
+                state.rate = min(state.ceiling, state.rate + state.ceiling * INCREASE)
+                return
+            else:
+                return
+        metrics.inc("jobstream_host_backoffs_total", host=host, status=str(status))
+        logger.warning(f"{host} answered {status}; slowing to {rate:.2f} requests/s and pausing {pause:.0f}s")
+
+    def slow_to(self, host: str, rate: float = None):
+        """
+        Cap host's ceiling at rate requests per second (a robots.txt Crawl-delay; None removes the cap).
+        The cap is kept when the host's state is reset or reconfigured.
+        """
+        host = host.lower()
+        with self._lock:
+            if rate is None:
+                self._caps.pop(host, None)
+            else:
+                self._caps[host] = rate
+            state = self._hosts.get(host)
+            if state is not None:
+                state.ceiling, state.burst = self._ceiling(host)
+                state.rate = min(state.rate, state.ceiling)
+                state.tokens = min(state.tokens, state.burst)
+
+    def stats(self) -> dict:
+        """{host: {'rate', 'ceiling', 'tokens', 'waiting', 'paused_s', 'granted', 'throttled', 'backoffs'}}"""
+        now = time.monotonic()
+        with self._lock:
+            return {host: {'rate': round(state.rate, 3), 'ceiling': round(state.ceiling, 3),
+                           'tokens': round(min(state.burst, state.tokens + (now - state.updated) * state.rate), 2),
+                           'waiting': len(state.queue), 'paused_s': round(max(0.0, state.paused_until - now), 1),
+                           'granted': state.granted, 'throttled': state.throttled, 'backoffs': state.backoffs}
+                    for host, state in self._hosts.items()}
+
+    def reset(self):
+        """Forget every host's adapted rate, pause and counters (configured ceilings and robots.txt caps stay)"""
+        with self._lock:
+            for state in self._hosts.values():
+                state.ready.notify_all()
+            self._hosts.clear()
+
+
+class RobotsCache:
+    """Parsed robots.txt per origin, downloaded once per ROBOTS_TTL (concurrent checks share the download)"""
+
+    def __init__(self, limiter: HostLimiter):
+        self.limiter = limiter
+        self._lock = threading.Lock()
+        self._entries = {}          # origin -> (RobotFileParser or None for "allow all", expires_at)
+        self._flights = SingleFlight("robots")
+        self.disallowed = 0
+
+    def allowed(self, url: str, fetch, agent: str) -> bool:
+        """
+        Whether agent (the User-Agent the request is sent with) may fetch url.
+        fetch(robots_url) -> (status, text) downloads robots.txt. A missing (4xx) or unreachable
+        robots.txt allows everything.
+        """
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}".lower()
+        with self._lock:
+            entry = self._entries.get(origin)
+        if entry is None or entry[1] <= time.time():
+            entry = self._flights.do(origin, lambda: self._load(origin, parts.netloc.lower(), fetch, agent))
+        parser = entry[0]
+        if parser is None or parser.can_fetch(agent, url):
+            return True
+        with self._lock:
+            self.disallowed += 1
+        return False
+
+    def _load(self, origin: str, host: str, fetch, agent: str) -> tuple:
+        parser, ttl, delay = None, ROBOTS_TTL, None
+        try:
+            status, text = fetch(f"{origin}/robots.txt")
+        except Exception as e:
+            logger.info(f"robots.txt of {origin} unavailable ({e}); allowing all")
+            ttl = ROBOTS_ERROR_TTL
+        else:
+            if status >= 500:
+                ttl = ROBOTS_ERROR_TTL
+            elif status < 400:
+                parser = RobotFileParser()
+                parser.parse(text.splitlines())
+                delay = parser.crawl_delay(agent)
+        if ttl == ROBOTS_TTL:
+            # A fresh robots.txt sets (or lifts) the Crawl-delay cap; an unreachable one leaves it alone
+            self.limiter.slow_to(host, 1 / float(delay) if delay else None)
+        entry = (parser, time.time() + ttl)
+        with self._lock:
+            self._entries[origin] = entry
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+metrics.describe("jobstream_host_backoffs_total", "Responses (429, 503 with Retry-After) that slowed a host down")
+
+# Shared by every session in this process (see http_client.request)
+limiter = HostLimiter()
+robots = RobotsCache(limiter)
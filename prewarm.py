@@ -0,0 +1,164 @@
+"""
+Background crawler that keeps the most searched queries warm.
+
+User-facing searches record their queries in the job index (job_store.py), and
+generate_search_queries() only produces a small set of them ("{skill}
+Developer", "{skill} Engineer"), so the hot ones are known in advance. Every
+INTERVAL seconds the crawler takes the TOP_QUERIES hottest queries and
+re-fetches each (query, source) pair that is missing from the index or would
+expire before the next round, so searches are answered from warm data.
+
+Each source gets a budget per round: BUDGET_SHARE of its per-minute rate limit
+(the app process keeps the rest), or MAX_FETCHES_PER_SOURCE for sources
+without one. When a budget runs out, the hotter queries have been fetched
+first. Open circuit breakers and the hosts' adaptive rate limits (politeness.py)
+are respected, and its requests are sent at background priority.
+
+The crawler runs in its own process so it never competes with Streamlit's
+script threads:
+
+    python prewarm.py [--interval 600] [--top 20] [--once]
+
+or is started by the app when JOBSTREAM_PREWARM=1 (see start_in_background).
+It needs a file-backed job index (JOBSTREAM_JOB_DB) shared with the app; the
+result cache is fed too when JOBSTREAM_CACHE_DB is set.
+"""
+import argparse
+import atexit
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+# Before the project modules, which read their JOBSTREAM_* settings on import
+load_dotenv()
+
+import engine
+import metrics
+from job_store import job_store
+from result_cache import job_cache
+
+logger = logging.getLogger(__name__)
+
+INTERVAL = float(os.getenv("JOBSTREAM_PREWARM_INTERVAL", "600"))   # seconds between rounds
+TOP_QUERIES = int(os.getenv("JOBSTREAM_PREWARM_TOP", "20"))
+BUDGET_SHARE = 0.5                # share of a source's per-minute rate limit one round may use
+MAX_FETCHES_PER_SOURCE = 20       # per round, for sources without a rate limit
+MIN_INTERVAL = 60                 # rounds are at least a minute apart, so budgets hold per minute
+
+
+def source_budget(source) -> int:
+    """Fetches the crawler may spend on source in one round"""
+    if source.rate_limit:
+        return min(MAX_FETCHES_PER_SOURCE, int(source.rate_limit * BUDGET_SHARE))
+    return MAX_FETCHES_PER_SOURCE
+
+
+def plan_round(queries: list, sources: list, interval: float, now: float = None) -> list:
+    """
+    (query, source) pairs to fetch this round, hottest query first.
+    A pair is due when the index has no fetch of it or that fetch expires before the next round.
+    """
+    now = time.time() if now is None else now
+    budgets = {source.name: source_budget(source) for source in sources}
+    due = []
+    for query in queries:
+        for source in sources:
+            if budgets[source.name] <= 0:
+                continue
+            record = job_store.fetch_record(source.name, query)
+            if record is None or record[0] + record[1] < now + interval:
+                due.append((query, source))
+                budgets[source.name] -= 1
+    return due
+
+
+def run_round(top: int = TOP_QUERIES, interval: float = INTERVAL) -> dict:
+    """Fetch every due pair of the top hottest queries. Returns summary counts."""
+    started = time.monotonic()
+    queries = [query for query, _ in job_store.popular_queries(top)]
+    due = plan_round(queries, engine.JOB_SOURCES.sources(), interval)
+    summary = {'queries': len(queries), 'due': len(due), 'fetched': 0, 'jobs': 0, 'failed': 0, 'skipped': 0}
+
+    def fetch(query, source):
+        jobs = engine.fetch_source_low_priority(source, query)
+        job_cache.put(source.name, query, jobs, source.ttl)
+        return jobs
+
+    with ThreadPoolExecutor(max_workers=engine.MAX_FETCH_WORKERS, thread_name_prefix="prewarm") as pool:
+        futures = {}
+        for query, source in due:
+            if source.allow():
+                futures[pool.submit(fetch, query, source)] = (query, source.name)
+            else:
+                summary['skipped'] += 1
+        for future, (query, name) in futures.items():
+            try:
+                summary['jobs'] += len(future.result())
+                summary['fetched'] += 1
+            except Exception as e:
+                summary['failed'] += 1
+                logger.warning(f"Prewarm of {name} for '{query}' failed: {e}")
+
+    summary['seconds'] = round(time.monotonic() - started, 2)
+    metrics.observe("prewarm_round", summary['seconds'])
+    logger.info(f"Prewarm round: {summary}")
+    return summary
+
+
+def run_forever(top: int = TOP_QUERIES, interval: float = INTERVAL):
+    """Run a round every interval seconds until interrupted"""
+    interval = max(MIN_INTERVAL, interval)
+    while True:
+        round_started = time.monotonic()
+        try:
+            run_round(top, interval)
+        except Exception as e:
+            logger.error(f"Prewarm round failed: {e}")
+        time.sleep(max(0.0, interval - (time.monotonic() - round_started)))
+
+
+def start_in_background(top: int = TOP_QUERIES, interval: float = INTERVAL):
+    """
+    Start the crawler in a separate process that is stopped when this one exits.
+    Returns: the subprocess.Popen, or None when the job index is not file-backed.
+    """
+    if not job_store.enabled or job_store.db_path == ":memory:":
+        logger.warning("Prewarm crawler needs a file-backed job index (JOBSTREAM_JOB_DB); not started")
+        return None
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--top", str(top), "--interval", str(interval)],
+        env={**os.environ, 'JOBSTREAM_JOB_DB': os.path.abspath(job_store.db_path)},
+    )
+    atexit.register(process.terminate)
+    logger.info(f"Prewarm crawler started (pid {process.pid}, top {top} queries every {interval:g}s)")
+    return process
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Keep the most searched job queries warm in the job index")
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="seconds between rounds (min 60)")
+    parser.add_argument("--top", type=int, default=TOP_QUERIES, help="hottest queries kept warm")
+    parser.add_argument("--once", action="store_true", help="run a single round and exit")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if not job_store.enabled:
+        print("❌ The job index is disabled (JOBSTREAM_JOB_DB)", file=sys.stderr)
+        return 1
+    if args.once:
+        run_round(args.top, args.interval)
+        return 0
+    try:
+        run_forever(args.top, args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Batch CV-to-job ranking.
+
+Instead of checking every (skill, job) pair in Python, all job texts are
+lowercased once and joined into a single corpus. Each CV skill is then located
+with one C-level substring scan of that corpus, giving a skill x job incidence
+matrix from which scores, matched and missing skills for the whole result set
+are computed with NumPy. Results are identical to the per-job
+`calculate_cv_job_match` in app.py.
+
+Sidebar preferences (job types, experience range) are applied as a separate
+re-scoring stage: per-job features are extracted once per result set, and a
+preference change only recomputes their weighted sum and the ordering.
+"""
+import re
+from bisect import bisect_right
+from itertools import accumulate
+
+import numpy as np
+
+from result_index import parse_salary
+
+# Separates job texts in the corpus; never part of a skill, so matches cannot span two jobs
+_SEPARATOR = "\x00"
+
+
+def build_match_reasons(job: dict, matched_skills: list, match_percent: float) -> list:
+    """Human-readable reasons for a job's match score"""
+    job_title = job.get('title', '').lower()
+    reasons = []
+
+    if matched_skills:
+        reasons.append(f"✅ Your skills match: {', '.join(matched_skills[:3])}")
+
+    if 'remote' in job.get('job_type', '').lower():
+        reasons.append("✅ Remote-friendly position")
+
+    if 'startup' in job.get('company', '').lower() or 'equity' in job.get('description', '').lower():
+        reasons.append("✅ Startup opportunity with growth potential")
+
+    if 'senior' in job_title and len(matched_skills) >= 3:
+        reasons.append("✅ Matches your expertise level")
+    elif 'entry' in job_title or 'junior' in job_title:
+        reasons.append("✅ Good for career progression")
+
+    salary = job.get('salary', '').lower()
+    if 'k' in salary or '$' in salary:
+        reasons.append(f"✅ Salary: {job.get('salary', 'Competitive')}")
+
+    if match_percent >= 70:
+        reasons.append("⭐ Highly relevant position")
+    elif match_percent >= 50:
+        reasons.append("👍 Good opportunity to expand skills")
+
+    return reasons
+
+
+def _job_text(job: dict) -> str:
+    # Same text calculate_cv_job_match searches: title, then description + requirements
+    description = f"{job.get('description', '')} {job.get('requirements', '')}"
+    return f"{job.get('title', '')}{_SEPARATOR}{description}".lower()
+
+
+def skill_incidence(jobs: list, skills: list) -> np.ndarray:
+    """
+    Boolean matrix M where M[i, j] is True if skills[i] occurs (as a substring) in job j.
+    """
+    incidence = np.zeros((len(skills), len(jobs)), dtype=bool)
+    if not jobs or not skills:
+        return incidence
+
+    texts = [_job_text(job) for job in jobs]
+    # starts[j] is the corpus offset of job j; the extra entry marks the end of the corpus
+    starts = list(accumulate((len(t) + 1 for t in texts), initial=0))
+    corpus = _SEPARATOR.join(texts)
+
+    for row, skill in enumerate(skills):
+        needle = skill.lower()
+        if not needle:
+            incidence[row, :] = True
+            continue
+        hits = []
+        pos = corpus.find(needle)
+        while pos != -1:
+            job_idx = bisect_right(starts, pos) - 1
+            hits.append(job_idx)
+            # Job already matched; continue the scan at the next job
+            pos = corpus.find(needle, starts[job_idx + 1])
+        incidence[row, hits] = True
+    return incidence
+
+
+def score_jobs(jobs: list, cv_skills: list) -> tuple:
+    """
+    Vectorized match scores.
+    Returns: (incidence matrix over cv_skills x jobs, int match percents per job)
+    """
+    unique_skills = list(dict.fromkeys(cv_skills))
+    unique_incidence = skill_incidence(jobs, unique_skills)
+    # Expand back to one row per cv_skills entry so duplicates count like the per-job loop
+    row_of = {skill: i for i, skill in enumerate(unique_skills)}
+    incidence = unique_incidence[[row_of[s] for s in cv_skills]] if cv_skills else unique_incidence
+
+    if not cv_skills:
+        percents = np.full(len(jobs), 50, dtype=np.int64)  # Base score if no skills detected
+    else:
+        matched_counts = incidence.sum(axis=0)
+        percents = np.minimum(100, (matched_counts / len(cv_skills)) * 100).astype(np.int64)
+    return incidence, percents
+
+
+def rank_order(percents: np.ndarray, top_k: int = None) -> np.ndarray:
+    """
+    Job indices by score, highest first; ties keep their original order.
+    With top_k only the best k are selected (argpartition) and sorted.
+    """
+    n = len(percents)
+    if top_k is None or top_k >= n:
+        return np.argsort(-percents, kind='stable')
+    if top_k <= 0:
+        return np.array([], dtype=np.int64)
+    # Unique composite key (score desc, position asc) keeps ties stable across the partition
+    keys = (100 - percents.astype(np.int64)) * n + np.arange(n, dtype=np.int64)
+    best = np.argpartition(keys, top_k - 1)[:top_k]
+    return best[np.argsort(keys[best])]
+
+
+def rank_jobs(jobs: list, cv_skills: list, top_k: int = None) -> list:
+    """
+    Score all jobs in one vectorized pass, add match data to each returned job
+    and return them sorted by match percentage (highest first).
+    """
+    if not jobs:
+        return []
+    incidence, percents = score_jobs(jobs, cv_skills)
+    order = rank_order(percents, top_k)
+
+    # Jobs with the same hit pattern share matched/missing lists; build each pattern once
+    patterns = np.packbits(incidence, axis=0).T
+    split_cache = {}
+
+    ranked = []
+    for j in order:
+        job = jobs[j]
+        key = patterns[j].tobytes()
+        split = split_cache.get(key)
+        if split is None:
+            hits = incidence[:, j]
+            split = split_cache[key] = (
+                [skill for skill, hit in zip(cv_skills, hits) if hit],
+                [skill for skill, hit in zip(cv_skills, hits) if not hit],
+            )
+        matched_skills, missing_skills = list(split[0]), list(split[1])
+        match_percent = int(percents[j])
+        job['cv_match'] = match_percent
+        job['matched_skills'] = matched_skills
+        job['missing_skills'] = missing_skills
+        job['match_reasons'] = build_match_reasons(job, matched_skills, match_percent)
+        ranked.append(job)
+    return ranked
+
+
+# --- Preference re-scoring ---
+JOB_TYPES = ["Full-time", "Part-time", "Contract", "Remote", "Freelance"]
+EXPERIENCE_LEVELS = ["Entry-level", "Mid-level", "Senior", "Lead"]
+
+# Weight of each feature in the preference score; CV skill match stays dominant
+PREFERENCE_WEIGHTS = {'skills': 1.0, 'job_type': 0.25, 'experience': 0.25, 'salary': 0.1}
+
+_JOB_TYPE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"full[\s-]?time|permanent",
+    r"part[\s-]?time",
+    r"contract",
+    r"remote|anywhere|distributed",
+    r"freelanc|gig\b",
+)]
+_LEVEL_PATTERNS = [re.compile(p, re.IGNORECASE) for p in (
+    r"\b(?:entry|junior|jr\.?|graduate|intern(?:ship)?|trainee)\b",
+    r"\b(?:mid|intermediate)\b",
+    r"\b(?:senior|sr\.?)\b",
+    r"\b(?:lead|principal|staff|head|director|architect)\b",
+)]
+
+
+class PreferenceFeatures:
+    """
+    Per-job feature vectors for one result set: CV skill match, job type flags,
+    seniority flags and annual salary. Built once; score() and order() only combine them.
+    """
+
+    def __init__(self, jobs: list, salaries: list = None):
+        self.jobs = jobs
+        n = len(jobs)
+        self.skill_match = np.array([job.get('cv_match') or 0 for job in jobs], dtype=np.float64) / 100
+        self.job_types = np.zeros((n, len(JOB_TYPES)), dtype=bool)
+        self.levels = np.zeros((n, len(EXPERIENCE_LEVELS)), dtype=bool)
+        if salaries is None:
+            salaries = [parse_salary(str(job.get('salary', '') or '')) for job in jobs]
+        salary = np.array([(s[0] + s[1]) / 2 if s else 0.0 for s in salaries], dtype=np.float64)
+
+        for j, job in enumerate(jobs):
+            type_text = f"{job.get('job_type', '')} {job.get('location', '')} {job.get('title', '')}"
+            self.job_types[j] = [bool(p.search(type_text)) for p in _JOB_TYPE_PATTERNS]
+            level_text = f"{job.get('title', '')} {job.get('job_type', '')}"
+            self.levels[j] = [bool(p.search(level_text)) for p in _LEVEL_PATTERNS]
+
+        # Salary relative to the best-paid job in the set, 0 when unknown
+        self.salary = salary / salary.max() if n and salary.max() > 0 else salary
+        self._typed = self.job_types.any(axis=1)
+        self._leveled = self.levels.any(axis=1)
+
+    def score(self, job_types=(), experience_range=None, weights: dict = None) -> np.ndarray:
+        """
+        Weighted preference score per job.
+        Jobs that state no type or level get half credit for that feature.
+        """
+        weights = weights or PREFERENCE_WEIGHTS
+        total = weights['skills'] * self.skill_match + weights['salary'] * self.salary
+
+        wanted = np.array([t in job_types for t in JOB_TYPES], dtype=bool)
+        if wanted.any():
+            type_hit = (self.job_types & wanted).any(axis=1)
+            total += weights['job_type'] * np.where(self._typed, type_hit, 0.5)
+
+        if experience_range:
+            low, high = (EXPERIENCE_LEVELS.index(level) for level in experience_range)
+            in_range = np.zeros(len(EXPERIENCE_LEVELS), dtype=bool)
+            in_range[low:high + 1] = True
+            level_hit = (self.levels & in_range).any(axis=1)
+            total += weights['experience'] * np.where(self._leveled, level_hit, 0.5)
+        return total
+
+    def order(self, job_types=(), experience_range=None, weights: dict = None) -> list:
+        """Job positions by preference score, best first; ties keep the CV-match order"""
+        return np.argsort(-self.score(job_types, experience_range, weights), kind='stable').tolist()
@@ -0,0 +1,188 @@
+"""
+Process-wide TTL cache for job search results.
+
+Entries are keyed by (source, normalized query) and shared by every Streamlit
+session in the process. Each entry has a per-source TTL; once it expires it is
+still served for a grace period (stale-while-revalidate) while a background
+refresh runs. The in-memory store is an LRU bounded by the size of the
+serialized results, and an optional SQLite file keeps the cache warm across
+restarts (set JOBSTREAM_CACHE_DB to enable it). With a shared cache backend
+(shared_cache.py) misses and expired entries read through to it (the newer
+entry wins) and writes go to it, so replicas of a multi-worker deployment
+share their results.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import shared_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 15 * 60                 # seconds an entry is fresh
+STALE_GRACE = 60 * 60                 # seconds an expired entry may still be served
+MAX_MEMORY_BYTES = 32 * 1024 * 1024   # serialized size of all in-memory entries
+
+FRESH, STALE, MISS = "fresh", "stale", "miss"
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so equivalent queries share a cache entry"""
+    return " ".join(query.lower().split())
+
+
+class ResultCache:
+    """LRU + TTL cache of job lists with stale-while-revalidate, optional SQLite persistence and sharing"""
+
+    def __init__(self, max_bytes: int = MAX_MEMORY_BYTES, stale_grace: float = STALE_GRACE, db_path: str = None,
+                 shared: shared_cache.SharedCache = None):
+        self.max_bytes = max_bytes
+        self.stale_grace = stale_grace
+        self._entries = OrderedDict()   # key -> (payload json, stored_at, ttl)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+        self.hits = self.stale_hits = self.misses = 0
+        self.shared = shared
+
+        self._db = None
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS results "
+                    "(key TEXT PRIMARY KEY, payload TEXT, stored_at REAL, ttl REAL)"
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Result cache DB unavailable ({db_path}): {e}")
+                self._db = None
+
+    @staticmethod
+    def _key(source: str, query: str) -> str:
+        return f"{source}|{normalize_query(query)}"
+
+    def _store(self, key: str, payload: str, stored_at: float, ttl: float):
+        """Insert into the in-memory LRU and evict until under the byte budget (lock held)"""
+        old = self._entries.pop(key, None)
+        if old:
+            self._bytes -= len(old[0])
+        self._entries[key] = (payload, stored_at, ttl)
+        self._bytes += len(payload)
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (evicted, _, _) = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def get(self, source: str, query: str) -> tuple:
+        """
+        Look up cached jobs.
+        Returns: (jobs or None, state) where state is FRESH, STALE or MISS.
+        Every call returns a fresh copy, so callers may mutate the jobs.
+        """
+        key = self._key(source, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT payload, stored_at, ttl FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    entry = tuple(row)
+                    self._store(key, *entry)
+        now = time.time()
+        if self.shared is not None and (entry is None or now - entry[1] >= entry[2]):
+            # Another replica may have fetched it since ours went stale; network I/O, so outside the lock
+            shared = self.shared.get(key)
+            if shared is not None and (entry is None or shared[1] > entry[1]):
+                jobs, stored_at, ttl = shared
+                entry = (json.dumps(jobs), stored_at, ttl)
+                with self._lock:
+                    self._store(key, *entry)
+        with self._lock:
+            if entry is not None:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                payload, stored_at, ttl = entry
+                age = now - stored_at
+                if age < ttl:
+                    self.hits += 1
+                    return json.loads(payload), FRESH
+                if age < ttl + self.stale_grace:
+                    self.stale_hits += 1
+                    return json.loads(payload), STALE
+            self.misses += 1
+            return None, MISS
+
+    def put(self, source: str, query: str, jobs: list, ttl: float = DEFAULT_TTL):
+        """Cache a non-empty job list (empty results usually mean the source failed)"""
+        if not jobs:
+            return
+        key = self._key(source, query)
+        payload = json.dumps(jobs)
+        stored_at = time.time()
+        with self._lock:
+            self._store(key, payload, stored_at, ttl)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO results (key, payload, stored_at, ttl) VALUES (?, ?, ?, ?)",
+                        (key, payload, stored_at, ttl),
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Result cache DB write failed: {e}")
+        if self.shared is not None:
+            self.shared.put(key, [jobs, stored_at, ttl], ttl + self.stale_grace)
+
+    def refresh_in_background(self, source: str, query: str, fetch, ttl: float = DEFAULT_TTL):
+        """Re-run fetch() in the background and store its result; duplicate refreshes are skipped"""
+        key = self._key(source, query)
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _refresh():
+            try:
+                self.put(source, query, fetch(), ttl)
+            except Exception as e:
+                logger.warning(f"Background refresh of {source} for '{query}' failed: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(_refresh)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and memory usage"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Drop all entries (memory, disk and the shared backend)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+        if self.shared is not None:
+            self.shared.clear()
+
+
+# Shared by every session in this process
+job_cache = ResultCache(db_path=os.getenv("JOBSTREAM_CACHE_DB") or None, shared=shared_cache.results)
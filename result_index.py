@@ -0,0 +1,143 @@
+"""
+Per-search index over a result set for sorting and platform filtering.
+
+Built once after a search: salary strings are parsed into numeric annual
+ranges, posting dates into "days ago", jobs are bucketed by platform and every
+bucket is presorted for each sort option. A sort/filter combination then merges
+the presorted buckets lazily, so showing k results costs O(k log p) for p
+selected platforms instead of re-filtering and re-sorting the whole list on
+every widget interaction.
+"""
+import heapq
+import math
+import re
+from datetime import date, datetime
+from itertools import islice
+
+SORT_OPTIONS = ["Most Relevant", "Newest First", "Salary (High to Low)", "Platform"]
+
+_SALARY_NUMBER = re.compile(r"(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*([km])?\b", re.IGNORECASE)
+_HOURLY = re.compile(r"/\s*(?:hour|hr)|per\s+hour|hourly", re.IGNORECASE)
+_RELATIVE_AGE = re.compile(r"(\d+)\+?\s*(minute|hour|day|week|month)s?", re.IGNORECASE)
+_LEADING_SYMBOLS = re.compile(r"^\W+")
+_HOURS_PER_YEAR = 2080
+
+# Fuzzy posting dates used by the job boards, in days ago
+_DATE_PHRASES = [
+    ('real-time', 0), ('just posted', 0), ('today', 0), ('yesterday', 1), ('daily', 1), ('fresh', 1),
+    ('recently', 3), ('regularly', 7), ('weekly', 7), ('monthly', 30), ('ongoing', 14),
+]
+_DAYS_PER_UNIT = {'minute': 1 / 1440, 'hour': 1 / 24, 'day': 1, 'week': 7, 'month': 30}
+
+
+def parse_salary(salary: str) -> tuple:
+    """
+    Parse a salary string into an annual (low, high) range.
+    "$120K - $200K+" -> (120000, 200000); "$25 - $300+/hour" -> (52000, 624000).
+    Returns None when the string has no amounts ("Not specified", "Competitive").
+    """
+    if not salary:
+        return None
+    amounts = []
+    for number, suffix in _SALARY_NUMBER.findall(salary):
+        value = float(number.replace(',', ''))
+        if suffix:
+            value *= 1_000 if suffix.lower() == 'k' else 1_000_000
+        amounts.append(value)
+    if not amounts:
+        return None
+    if _HOURLY.search(salary):
+        amounts = [a * _HOURS_PER_YEAR for a in amounts]
+    return min(amounts), max(amounts)
+
+
+def parse_posted_age(posted: str, today: date = None) -> float:
+    """
+    Normalize a posted-date string to "days ago" (smaller is newer).
+    Understands ISO dates, "3 days ago"-style ages and the boards' fuzzy phrases; unknown -> inf.
+    """
+    if not posted:
+        return math.inf
+    text = posted.strip().lower()
+    try:
+        posted_day = datetime.fromisoformat(text[:10]).date()
+        return max(0, ((today or date.today()) - posted_day).days)
+    except ValueError:
+        pass
+    m = _RELATIVE_AGE.search(text)
+    if m:
+        return int(m.group(1)) * _DAYS_PER_UNIT[m.group(2).lower()]
+    for phrase, days in _DATE_PHRASES:
+        if phrase in text:
+            return days
+    return math.inf
+
+
+class ResultIndex:
+    """Sort keys, platform buckets and presorted orderings for one result set"""
+
+    def __init__(self, jobs: list):
+        self.jobs = jobs
+        self.salaries = [parse_salary(str(job.get('salary', '') or '')) for job in jobs]
+        self.ages = [parse_posted_age(str(job.get('posted_date', '') or '')) for job in jobs]
+
+        # Platforms in first-seen order -> job positions
+        self.buckets = {}
+        for pos, job in enumerate(jobs):
+            self.buckets.setdefault(job.get('platform', 'Unknown'), []).append(pos)
+
+        # rank[sort][pos] = position of job pos in the global ordering for that sort (stable)
+        positions = range(len(jobs))
+        orderings = {
+            "Most Relevant": list(positions),  # jobs arrive ranked by CV match
+            "Newest First": sorted(positions, key=lambda p: self.ages[p]),
+            "Salary (High to Low)": sorted(
+                positions, key=lambda p: (-self.salaries[p][1], -self.salaries[p][0]) if self.salaries[p] else (math.inf, math.inf)
+            ),
+            # Platform names start with an emoji; sort on the name itself
+            "Platform": sorted(positions, key=lambda p: _LEADING_SYMBOLS.sub('', str(jobs[p].get('platform', 'Unknown'))).lower()),
+        }
+        self.rank = {}
+        for sort_by, order in orderings.items():
+            rank = [0] * len(jobs)
+            for r, pos in enumerate(order):
+                rank[pos] = r
+            self.rank[sort_by] = rank
+
+        # Every platform bucket presorted for every sort option
+        self.sorted_buckets = {
+            sort_by: {platform: sorted(bucket, key=rank.__getitem__) for platform, bucket in self.buckets.items()}
+            for sort_by, rank in self.rank.items()
+        }
+
+    def set_order(self, sort_by: str, order: list):
+        """Replace the ordering of one sort option (e.g. "Most Relevant" after a preference change)"""
+        rank = [0] * len(self.jobs)
+        for r, pos in enumerate(order):
+            rank[pos] = r
+        self.rank[sort_by] = rank
+        self.sorted_buckets[sort_by] = {platform: sorted(bucket, key=rank.__getitem__)
+                                        for platform, bucket in self.buckets.items()}
+
+    @property
+    def platforms(self) -> list:
+        return list(self.buckets)
+
+    def _selected(self, platforms) -> list:
+        # No platform selected means no filter
+        return [p for p in platforms if p in self.buckets] if platforms else self.platforms
+
+    def count(self, platforms=None, exclude=()) -> int:
+        """Number of jobs on the selected platforms, minus excluded positions"""
+        selected = set(self._selected(platforms))
+        total = sum(len(self.buckets[p]) for p in selected)
+        return total - sum(1 for pos in exclude if 0 <= pos < len(self.jobs)
+                           and self.jobs[pos].get('platform', 'Unknown') in selected)
+
+    def select(self, sort_by: str = "Most Relevant", platforms=None, limit: int = None, exclude=()) -> list:
+        """The first `limit` jobs on the selected platforms in the requested order"""
+        rank = self.rank.get(sort_by, self.rank["Most Relevant"])
+        buckets = self.sorted_buckets.get(sort_by, self.sorted_buckets["Most Relevant"])
+        merged = heapq.merge(*(buckets[p] for p in self._selected(platforms)), key=rank.__getitem__)
+        positions = (pos for pos in merged if pos not in exclude)
+        return [self.jobs[pos] for pos in islice(positions, limit)]
@@ -0,0 +1,373 @@
+"""
+Cache shared by every replica of a multi-worker deployment.
+
+The in-process caches (result_cache.py for search results, cv_parser for
+parsed CVs) live in one process, so each replica behind a load balancer would
+re-scrape and re-parse on its own. With JOBSTREAM_SHARED_CACHE set they read
+through to a shared backend and write to it:
+
+    redis://[:password@]host:6379/0     any Redis-protocol server (built-in RESP client, no redis-py)
+    sqlite:///path/to/shared.sqlite3    an SQLite file in WAL mode, for replicas on one host or volume
+
+Values are serialized with msgpack when it is installed (JSON otherwise) and
+values of COMPRESS_MIN_BYTES or more are compressed with zstd when zstandard
+is installed. A two-byte header records both, so replicas with different
+optional packages still read each other's entries; an entry a replica cannot
+decode counts as a miss.
+
+The shared backend is only a cache: a failing backend logs a warning, lookups
+count as misses and it is left alone for RETRY_AFTER seconds.
+"""
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+import metrics
+
+try:
+    import msgpack  # optional: compact binary serialization
+except ImportError:
+    msgpack = None
+try:
+    import zstandard  # optional: compression of large values
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_URL = os.getenv("JOBSTREAM_SHARED_CACHE", "")
+KEY_PREFIX = "jobstream:"
+COMPRESS_MIN_BYTES = 1024
+TIMEOUT = 2.0          # seconds per backend call
+RETRY_AFTER = 30       # seconds a failed backend is skipped
+MAX_IDLE_CONNECTIONS = 8
+
+_JSON, _MSGPACK = b"j", b"m"
+_PLAIN, _ZSTD = b"-", b"z"
+
+
+def encode(value) -> bytes:
+    """Serialize a JSON-compatible value: format byte, compression byte, payload"""
+    if msgpack is not None:
+        fmt, data = _MSGPACK, msgpack.packb(value, use_bin_type=True)
+    else:
+        fmt, data = _JSON, json.dumps(value, separators=(",", ":")).encode("utf-8")
+    if zstandard is not None and len(data) >= COMPRESS_MIN_BYTES:
+        return fmt + _ZSTD + zstandard.ZstdCompressor(level=3).compress(data)
+    return fmt + _PLAIN + data
+
+
+def decode(blob: bytes):
+    """Value from encode(). Raises ValueError for entries this process cannot read."""
+    fmt, compression, data = blob[:1], blob[1:2], blob[2:]
+    if compression == _ZSTD:
+        if zstandard is None:
+            raise ValueError("zstd-compressed entry but zstandard is not installed")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif compression != _PLAIN:
+        raise ValueError(f"Unknown compression {compression!r}")
+    if fmt == _MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack entry but msgpack is not installed")
+        return msgpack.unpackb(data, raw=False)
+    if fmt == _JSON:
+        return json.loads(data)
+    raise ValueError(f"Unknown format {fmt!r}")
+
+
+class RedisError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+
+class RedisBackend:
+    """Minimal RESP2 client (GET, SET PX, SCAN, DEL) over a small pool of persistent connections"""
+
+    name = "redis"
+
+    def __init__(self, url: str, timeout: float = TIMEOUT):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 6379
+        self.username = unquote(parts.username) if parts.username else None
+        self.password = unquote(parts.password) if parts.password else None
+        self.db = int(parts.path.strip("/") or 0)
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = []   # (socket, reader) pairs
+
+    @staticmethod
+    def _pack(args) -> bytes:
+        out = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode("utf-8")
+            out.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        return b"".join(out)
+
+    def _read(self, reader):
+        line = reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by the server")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RedisError(rest.decode())
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size < 0:
+                return None
+            data = reader.read(size + 2)
+            if len(data) != size + 2:
+                raise ConnectionError("Connection closed by the server")
+            return data[:-2]
+        if kind == b"*":
+            size = int(rest)
+            return None if size < 0 else [self._read(reader) for _ in range(size)]
+        raise ConnectionError(f"Unexpected reply: {line[:40]!r}")
+
+    def _call(self, connection, *args):
+        connection[0].sendall(self._pack(args))
+        return self._read(connection[1])
+
+    def _connect(self) -> tuple:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection = (sock, sock.makefile("rb"))
+        try:
+            if self.password:
+                self._call(connection, "AUTH", *([self.username] if self.username else []), self.password)
+            if self.db:
+                self._call(connection, "SELECT", self.db)
+        except Exception:
+            self._close(connection)
+            raise
+        return connection
+
+    @staticmethod
+    def _close(connection):
+        for part in reversed(connection):
+            try:
+                part.close()
+            except OSError:
+                pass
+
+    def execute(self, *args):
+        """Run one command on a pooled connection. Raises RedisError for error replies."""
+        with self._lock:
+            connection = self._idle.pop() if self._idle else None
+        if connection is None:
+            connection = self._connect()
+        try:
+            reply = self._call(connection, *args)
+        except RedisError:
+            self._release(connection)   # the whole reply was read; the connection is still usable
+            raise
+        except Exception:
+            self._close(connection)
+            raise
+        self._release(connection)
+        return reply
+
+    def _release(self, connection):
+        with self._lock:
+            if len(self._idle) < MAX_IDLE_CONNECTIONS:
+                self._idle.append(connection)
+                return
+        self._close(connection)
+
+    def get(self, key: str) -> bytes:
+        return self.execute("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.execute("SET", key, value, "PX", max(1, int(ttl * 1000)))
+
+    def delete_prefix(self, prefix: str) -> int:
+        deleted, cursor = 0, b"0"
+        while True:
+            cursor, keys = self.execute("SCAN", cursor, "MATCH", f"{prefix}*", "COUNT", 500)
+            if keys:
+                deleted += self.execute("DEL", *keys)
+            if cursor in (b"0", "0"):
+                return deleted
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self._close(connection)
+
+
+class SQLiteBackend:
+    """Key/value table in an SQLite file in WAL mode, so replicas read while one of them writes"""
+
+    name = "sqlite"
+    PURGE_EVERY = 500   # writes between deletions of expired rows
+
+    def __init__(self, url: str, timeout: float = TIMEOUT):
+        # sqlite:///relative/path or sqlite:////absolute/path, as in SQLAlchemy URLs
+        self.path = url.split(":///", 1)[1] if ":///" in url else ""
+        if not self.path or self.path == ":memory:":
+            raise ValueError(f"Shared SQLite cache needs a file path, got {url!r}")
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=timeout, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS shared_cache "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> bytes:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM shared_cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO shared_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, now + ttl),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._db.execute("DELETE FROM shared_cache WHERE expires_at <= ?", (now,))
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            return self._db.execute(
+                "DELETE FROM shared_cache WHERE substr(key, 1, ?) = ?", (len(prefix), prefix)
+            ).rowcount
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+BACKENDS = {'redis': RedisBackend, 'sqlite': SQLiteBackend}
+
+
+def open_backend(url: str):
+    """Backend for a JOBSTREAM_SHARED_CACHE URL, or None for an empty URL"""
+    if not url:
+        return None
+    scheme = urlsplit(url).scheme.lower()
+    if scheme not in BACKENDS:
+        raise ValueError(f"Unknown shared cache backend {scheme!r} (expected one of {', '.join(BACKENDS)})")
+    return BACKENDS[scheme](url)
+
+
+class SharedCache:
+    """One namespace of the shared backend with hit/miss counters; every call is a no-op without a backend"""
+
+    def __init__(self, namespace: str, backend=None):
+        self.namespace = namespace
+        self.backend = backend
+        self._prefix = f"{KEY_PREFIX}{namespace}:"
+        self._lock = threading.Lock()
+        self._skip_until = 0.0
+        self.hits = self.misses = self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def _usable(self) -> bool:
+        return self.backend is not None and time.monotonic() >= self._skip_until
+
+    def _failed(self, action: str, error: Exception):
+        with self._lock:
+            self.errors += 1
+            self._skip_until = time.monotonic() + RETRY_AFTER
+        metrics.inc("jobstream_shared_cache_errors_total", namespace=self.namespace)
+        logger.warning(f"Shared cache {action} failed ({self.backend.name}): {error}; "
+                       f"skipping it for {RETRY_AFTER}s")
+
+    def get(self, key: str):
+        """Returns: the cached value, or None on a miss or while the backend is unavailable"""
+        if not self._usable():
+            return None
+        try:
+            with metrics.timer("shared_cache_get", backend=self.backend.name):
+                blob = self.backend.get(self._prefix + key)
+        except Exception as e:
+            self._failed("read", e)
+            return None
+        value = None
+        if blob is not None:
+            try:
+                value = decode(blob)
+            except Exception as e:
+                logger.info(f"Unreadable shared cache entry {self.namespace}:{key}: {e}")
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        metrics.inc("jobstream_shared_cache_lookups_total", namespace=self.namespace,
+                    result="miss" if value is None else "hit")
+        return value
+
+    def put(self, key: str, value, ttl: float):
+        """Store value for ttl seconds"""
+        if not self._usable():
+            return
+        try:
+            self.backend.set(self._prefix + key, encode(value), ttl)
+        except Exception as e:
+            self._failed("write", e)
+
+    def clear(self):
+        """Drop every entry of this namespace (for all replicas)"""
+        if not self._usable():
+            return
+        try:
+            self.backend.delete_prefix(self._prefix)
+        except Exception as e:
+            self._failed("clear", e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.backend.name if self.backend else None,
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+metrics.describe("jobstream_shared_cache_lookups_total", "Shared (cross-replica) cache lookups by namespace and result")
+metrics.describe("jobstream_shared_cache_errors_total", "Failed shared cache backend calls")
+
+try:
+    backend = open_backend(SHARED_CACHE_URL)
+except (ValueError, OSError, sqlite3.Error) as e:
+    logger.warning(f"Shared cache unavailable ({SHARED_CACHE_URL}): {e}")
+    backend = None
+
+# Namespaces shared by every replica (no-ops while JOBSTREAM_SHARED_CACHE is unset)
+results = SharedCache("results", backend)       # job lists per (source, query), see result_cache.py
+pages = SharedCache("pages", backend)           # scraped Firecrawl pages
+cvs = SharedCache("cvs", backend)               # parsed CVs by SHA-256
+rankings = SharedCache("rankings", backend)     # ranked result sets per (queries, CV skills)
+
+
+def stats() -> dict:
+    """Backend name and counters per namespace ({} without a backend)"""
+    if backend is None:
+        return {}
+    return {'backend': backend.name,
+            **{cache.namespace: cache.stats() for cache in (results, pages, cvs, rankings)}}
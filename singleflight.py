@@ -0,0 +1,103 @@
+"""
+Single-flight request coalescing.
+
+Concurrent calls with the same key share one execution: the first caller (the
+leader) runs the function, later callers (followers) wait for its result
+instead of starting their own. Used by the engine to fetch each (source,
+normalized query) pair at most once at a time across every Streamlit session
+and API request in the process.
+
+A follower waits at most its own timeout and then gives up (TimeoutError)
+without affecting the leader, whose result still reaches the other followers.
+The leader's exception is raised in every follower, except the types passed
+as retry_on: those belong to the leader alone (e.g. it ran out of its own
+deadline), so each follower tries again, leading a new call if nobody else
+has started one. Once the call finishes the key is free again; results are
+not kept (that is the result cache's job).
+"""
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+import metrics
+
+LEADER, FOLLOWER = "leader", "follower"
+
+
+class SingleFlight:
+    """In-flight calls by key, with leader/follower/timeout counters"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}    # key -> Future of the running call
+        self.leaders = self.followers = self.timeouts = 0
+
+    def in_flight(self, key) -> bool:
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key, fn, timeout: float = None, retry_on: tuple = ()):
+        """
+        Run fn() unless a call with key is already running, in which case wait up to timeout
+        seconds for its result. Every caller gets the same result object, so copy it before
+        mutating it. A follower that gets one of the retry_on exceptions from the leader tries
+        again within its timeout. Raises TimeoutError when a follower's wait times out.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                future = self._calls.get(key)
+                leader = future is None
+                if leader:
+                    future = self._calls[key] = Future()
+                    self.leaders += 1
+                else:
+                    self.followers += 1
+            self._record(LEADER if leader else FOLLOWER)
+            if leader:
+                break
+            try:
+                return future.result(None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                with self._lock:
+                    self.timeouts += 1
+                metrics.inc("jobstream_singleflight_timeouts_total", flight=self.name)
+                raise TimeoutError(f"{self.name} call {key!r} still running after {timeout}s") from None
+            except retry_on:
+                # The leader's own failure; this caller may still succeed before its deadline
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def _record(self, role: str):
+        metrics.inc("jobstream_singleflight_calls_total", flight=self.name, role=role)
+        metrics.gauge("jobstream_singleflight_coalescing_ratio", self.coalescing_ratio(), flight=self.name)
+
+    def coalescing_ratio(self) -> float:
+        """Share of calls that were served by another caller's request"""
+        with self._lock:
+            calls = self.leaders + self.followers
+            return round(self.followers / calls, 4) if calls else 0.0
+
+    def stats(self) -> dict:
+        ratio = self.coalescing_ratio()
+        with self._lock:
+            return {'in_flight': len(self._calls), 'leaders': self.leaders, 'followers': self.followers,
+                    'timeouts': self.timeouts, 'coalescing_ratio': ratio}
+
+
+metrics.describe("jobstream_singleflight_calls_total", "Coalesced calls by role (leader ran it, follower shared it)")
+metrics.describe("jobstream_singleflight_timeouts_total", "Followers that stopped waiting for an in-flight call")
+metrics.describe("jobstream_singleflight_coalescing_ratio", "Share of calls served by an in-flight call of another caller")
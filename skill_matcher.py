@@ -0,0 +1,135 @@
+"""
+Single-pass skill matcher.
+
+The skill vocabulary (skills.txt, one skill per line with optional "|"-separated
+synonyms) is compiled once into a single trie-shaped regex. Matching a CV is one
+scan of the text regardless of how many skills and synonyms the vocabulary holds,
+and reports every skill found with its match positions and count.
+"""
+import logging
+import os
+import re
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+SKILLS_FILE = os.getenv(
+    "JOBSTREAM_SKILLS_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills.txt"),
+)
+
+_WORD_CHAR = re.compile(r"\w")
+
+
+def load_vocabulary(path: str = SKILLS_FILE) -> dict:
+    """
+    Read a vocabulary file.
+    Returns: {lowercase term or synonym: canonical skill name}
+    """
+    vocabulary = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            names = [name.strip() for name in line.split("|") if name.strip()]
+            for name in names:
+                vocabulary.setdefault(name.lower(), names[0])
+    return vocabulary
+
+
+def _trie_regex(terms) -> str:
+    """Build a regex that matches any of the terms, shaped as a character trie so the engine branches once per character"""
+    trie = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def emit(node) -> str:
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A term ends here: the greedy optional tries the longer term first, then falls back to this one
+        return "(?:" + body + ")?" if "" in node else body
+
+    return emit(trie)
+
+
+def _ends_at_boundary(term: str, end: int) -> bool:
+    return end == len(term) or not _WORD_CHAR.match(term[end])
+
+
+class SkillMatcher:
+    """Compiled skill vocabulary that finds all skills in one pass over the text"""
+
+    def __init__(self, vocabulary: dict):
+        self.vocabulary = vocabulary
+        self.skills = sorted(set(vocabulary.values()))
+        # Lookahead so every start position is tried, including starts inside a longer match
+        # (e.g. "BI" inside "Power BI"); skills must not touch other word characters.
+        self._pattern = re.compile(
+            r"(?<!\w)(?=(" + _trie_regex(vocabulary) + r")(?!\w))", re.IGNORECASE
+        ) if vocabulary else None
+        # The regex reports only the longest term at each start; remember shorter terms
+        # that start at the same place ("Spring" inside "Spring Boot").
+        self._nested = {}
+        for term in vocabulary:
+            nested = [term[:end] for end in range(1, len(term))
+                      if term[:end] in vocabulary and _ends_at_boundary(term, end)]
+            if nested:
+                self._nested[term] = nested
+
+    def match(self, text: str) -> dict:
+        """
+        Find all skills in text.
+        Returns: {skill: {'count': n, 'positions': [start offsets]}}
+        """
+        if not text or self._pattern is None:
+            return {}
+        positions = {}
+        for m in self._pattern.finditer(text):
+            term = m.group(1).lower()
+            start = m.start(1)
+            for matched in [term] + self._nested.get(term, []):
+                skill_positions = positions.setdefault(self.vocabulary[matched], [])
+                # A skill and its synonym can both match at the same start
+                if not skill_positions or skill_positions[-1] != start:
+                    skill_positions.append(start)
+        return {skill: {'count': len(p), 'positions': p} for skill, p in positions.items()}
+
+    def extract(self, text: str) -> list:
+        """Return the sorted list of skills present in text"""
+        return sorted(self.match(text))
+
+    def iter_new_skills(self, chunks):
+        """
+        Consume text chunks (e.g. PDF pages) as they arrive and yield, per chunk,
+        the sorted skills not seen in earlier chunks. Chunks are matched independently,
+        so they should be split at non-word characters (page breaks, newlines).
+        """
+        seen = set()
+        for chunk in chunks:
+            new_skills = set(self.match(chunk)) - seen
+            seen |= new_skills
+            yield sorted(new_skills)
+
+
+@lru_cache(maxsize=None)
+def get_matcher(path: str = SKILLS_FILE) -> SkillMatcher:
+    """Load and compile a vocabulary file once per process"""
+    vocabulary = load_vocabulary(path)
+    logger.info(f"Compiled skill matcher with {len(vocabulary)} terms from {path}")
+    return SkillMatcher(vocabulary)
+
+
+def extract_skills(text: str) -> list:
+    """Extract skills from text using the default vocabulary"""
+    return get_matcher().extract(text)
+
+
+def match_skills(text: str) -> dict:
+    """Skills in text with their match positions and counts, using the default vocabulary"""
+    return get_matcher().match(text)
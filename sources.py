@@ -0,0 +1,193 @@
+"""
+Registry of job sources with per-source health and circuit breakers.
+
+Each fetch function registers itself with its metadata:
+
+    @job_sources.register("LinkedIn", timeout=5, ttl=6 * 3600)
+    def fetch_linkedin_detailed_jobs(query): ...
+
+The search asks every source for permission before fetching it. A source that
+fails (raises or answers slower than its timeout) FAILURE_THRESHOLD times in a
+row is skipped for a cool-down period. After the cool-down one probe request is
+let through: success closes the breaker, failure reopens it with a doubled
+cool-down (up to MAX_COOLDOWN). An optional rate limit caps calls per minute,
+and an optional `available` callable takes a source out of the search while it
+cannot run (e.g. its API key is not configured).
+Error rate and latency percentiles are available from `health()`.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+FAILURE_THRESHOLD = int(os.getenv("JOBSTREAM_BREAKER_FAILURES", "3"))
+COOLDOWN = float(os.getenv("JOBSTREAM_BREAKER_COOLDOWN", "60"))    # seconds
+MAX_COOLDOWN = 15 * 60
+HEALTH_WINDOW = 200             # recent calls kept per source for error rate and percentiles
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+
+def _percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Source:
+    """One registered job source: fetch function, metadata, breaker and health window"""
+
+    def __init__(self, name: str, fetch, timeout: float, ttl: float, priority: int = 0, rate_limit: int = None,
+                 available=None):
+        self.name = name
+        self.fetch = fetch
+        self.timeout = timeout          # per-search deadline; slower answers count as failures
+        self.ttl = ttl                  # result cache TTL
+        self.priority = priority        # higher is queried (and listed) first
+        self.rate_limit = rate_limit    # max calls per minute, None for unlimited
+        self.available = available      # callable; False while the source cannot run (e.g. no API key)
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0              # consecutive
+        self._cooldown = COOLDOWN
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._recent_calls = deque()    # start times within the last minute, for the rate limit
+        self._results = deque(maxlen=HEALTH_WINDOW)   # (ok, latency seconds)
+        self._skipped = 0
+        self._trips = 0
+
+    def allow(self) -> bool:
+        """Whether a fetch may start now (source available, breaker closed or probing, rate limit not exceeded)"""
+        if self.available is not None and not self.available():
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if self._state == OPEN:
+                if now - self._opened_at < self._cooldown:
+                    self._skipped += 1
+                    return False
+                self._state = HALF_OPEN
+            if self._state == HALF_OPEN:
+                # A probe that never reported back (cancelled, deduplicated) expires after its timeout
+                if self._probing and now - self._probe_started < self.timeout:
+                    self._skipped += 1
+                    return False
+                self._probing = True
+                self._probe_started = now
+            if self.rate_limit:
+                while self._recent_calls and now - self._recent_calls[0] > 60:
+                    self._recent_calls.popleft()
+                if len(self._recent_calls) >= self.rate_limit:
+                    self._skipped += 1
+                    self._probing = False
+                    return False
+                self._recent_calls.append(now)
+            return True
+
+    def record(self, ok: bool, latency: float):
+        """Record the outcome of a fetch; answers slower than the timeout are failures"""
+        ok = ok and latency <= self.timeout
+        with self._lock:
+            self._results.append((ok, latency))
+            was_probe = self._state == HALF_OPEN
+            self._probing = False
+            if ok:
+                self._failures = 0
+                if was_probe:
+                    logger.info(f"{self.name} recovered; circuit closed")
+                self._state = CLOSED
+                self._cooldown = COOLDOWN
+                return
+            self._failures += 1
+            if was_probe:
+                self._cooldown = min(self._cooldown * 2, MAX_COOLDOWN)
+            elif self._state == OPEN or self._failures < FAILURE_THRESHOLD:
+                return
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+            self._trips += 1
+            logger.warning(f"{self.name} failed {self._failures} times in a row; "
+                           f"skipping it for {self._cooldown:.0f}s")
+
+    def health(self) -> dict:
+        with self._lock:
+            results = list(self._results)
+            state = self._state
+            retry_in = max(0.0, self._cooldown - (time.monotonic() - self._opened_at)) if state == OPEN else 0.0
+            failures, skipped, trips = self._failures, self._skipped, self._trips
+        latencies = [latency for _, latency in results]
+        errors = sum(1 for ok, _ in results if not ok)
+        return {
+            'state': state,
+            'available': self.available is None or bool(self.available()),
+            'calls': len(results),
+            'error_rate': round(errors / len(results), 3) if results else 0.0,
+            'consecutive_failures': failures,
+            'latency_p50_ms': round(_percentile(latencies, 50) * 1000, 1),
+            'latency_p95_ms': round(_percentile(latencies, 95) * 1000, 1),
+            'skipped': skipped,
+            'trips': trips,
+            'retry_in_s': round(retry_in, 1),
+        }
+
+    def reset(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._cooldown = COOLDOWN
+            self._probing = False
+            self._recent_calls.clear()
+            self._results.clear()
+            self._skipped = self._trips = 0
+
+
+class SourceRegistry:
+    """Registered sources, ordered by priority (then registration order)"""
+
+    def __init__(self):
+        self._sources = {}
+
+    def register(self, name: str, timeout: float, ttl: float, priority: int = 0, rate_limit: int = None,
+                 available=None):
+        """Decorator registering a fetch function (query -> list of jobs) as a source"""
+        def decorator(fetch):
+            self.add(Source(name, fetch, timeout, ttl, priority, rate_limit, available))
+            return fetch
+        return decorator
+
+    def add(self, source: Source) -> Source:
+        self._sources[source.name] = source
+        return source
+
+    def get(self, name: str) -> Source:
+        return self._sources[name]
+
+    def sources(self) -> list:
+        order = {name: i for i, name in enumerate(self._sources)}
+        return sorted(self._sources.values(), key=lambda s: (-s.priority, order[s.name]))
+
+    def __iter__(self):
+        return iter(self.sources())
+
+    def __len__(self):
+        return len(self._sources)
+
+    def health(self) -> dict:
+        """{source name: health stats}"""
+        return {source.name: source.health() for source in self.sources()}
+
+    def reset(self):
+        """Close every breaker and clear health history"""
+        for source in self._sources.values():
+            source.reset()
+
+
+# Process-wide registry the scrapers in engine.py register with
+job_sources = SourceRegistry()